@@ -0,0 +1,18 @@
+# gunicorn.conf.py
+#
+# Used by default when gunicorn is started from the project root:
+#   PYTHONPATH=src gunicorn src.app.application:app
+
+bind = "127.0.0.1:8005"
+workers = 3
+
+# Load the application (camera table, catalog index, IERS table...) once in the master
+# process; forked workers share those pages copy-on-write and boot without loading them.
+preload_app = True
+
+
+def post_fork(server, worker):
+    # The application is already loaded (preload_app); give the worker its own state
+    from src.app.application import init_worker
+
+    init_worker(server.app.wsgi())
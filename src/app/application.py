@@ -1,16 +1,37 @@
-import os
+from typing import Any, Optional
+
 from flask import Flask
 
+from app.db.camera_db import open_camera_database
 from app.routes.route_initializer import initialize_routes
-from app.utils.astro_utils import get_object_data, count_dso
+from app.search.catalog_index import CatalogIndex
+from app.search.catalog_stats import CatalogStats
+from app.search.coordinate_table import get_coordinate_table
+from app.search.visibility_table import load_visibility_tables, site_visibility
+from app.utils.astro_utils import get_object_data, warm_up
 from app.utils.calculations import (
     calculate_camera_fov,
     calculate_max_shooting_time,
     calculate_number_of_shoots,
+    shot_timeline,
+)
+from app.utils.cache import LRUCache, SQLiteCache, create_cache
+from app.utils.http_cache import ResponseCache
+from app.utils.iers_data import configure_iers
+from app.utils.initialize import (
+    init_limiter,
+    init_logging,
+    init_metrics,
+    init_recording,
+    init_talisman,
 )
-from app.utils.camera_utils import load_cameras_from_json
-from app.utils.initialize import init_limiter, init_logging, init_talisman
+from app.utils.jobs import JobRunner
+from app.utils.metrics import MetricsStore, metrics
+from app.utils.night_window import night_window_cache
+from app.utils.planning import configure_planning_workers
+from app.utils.recording import RequestRecorder
 from app.utils.settings import load_config
+from app.utils.tonight import visibility_cache
 from flask_wtf.csrf import CSRFProtect
 
 
@@ -28,45 +49,162 @@ def format_float(value, format_spec=".2f"):
     return format(value, format_spec)
 
 
-config = load_config()
+def load_shared_data(visibility_directory: Optional[str] = None) -> dict[str, Any]:
+    """
+    Load the read-only data every worker uses.
 
-ROUTE = config["route"]
-SECRET_KEY = config["SECRET_KEY"]
-STATIC_URL_PATH = config["STATIC_URL_PATH"]
-DEBUG = config["DEBUG"]
+    Nothing here holds a connection or a lock, so it can be loaded once before gunicorn
+    forks its workers (preload_app) and shared by all of them copy-on-write.
 
-app = Flask(
-    __name__,
-    static_url_path=STATIC_URL_PATH,
-    static_folder="static",
-    template_folder="templates",
-)
-app.config["SECRET_KEY"] = SECRET_KEY
-app.config["DEBUG"] = DEBUG
+    Parameters:
+        visibility_directory (str, optional): The directory of the precomputed visibility
+            tables, if any.
+
+    Returns:
+        dict: The camera database, the catalog index and statistics, the coordinate
+        table and the visibility tables.
+    """
+    # Compiled from db/cameras-all.csv on first use (see app.db.camera_db). Not read
+    # here: the /cameras autocomplete queries the memory-mapped file
+    return {
+        "camera_database": open_camera_database(),
+        "catalog_index": CatalogIndex.from_database(),
+        "catalog_stats": CatalogStats.from_database(),
+        "coordinate_table": get_coordinate_table(),
+        "visibility_tables": load_visibility_tables(visibility_directory),
+    }
+
+
+def create_app(shared_data: Optional[dict[str, Any]] = None) -> Flask:
+    """
+    Create and configure the Flask application.
+
+    Parameters:
+        shared_data (dict, optional): The result of load_shared_data, to reuse it between
+            applications. Loaded when not given.
 
-CSRFProtect(app)  # Initialize CSRF protection here
+    Returns:
+        Flask: The application.
+    """
+    config = load_config()
+
+    app = Flask(
+        __name__,
+        static_url_path=config["STATIC_URL_PATH"],
+        static_folder="static",
+        template_folder="templates",
+    )
+    app.config["SECRET_KEY"] = config["SECRET_KEY"]
+    app.config["DEBUG"] = config["DEBUG"]
+    app.config["RATELIMIT_ENABLED"] = config["RATELIMIT_ENABLED"]
+
+    CSRFProtect(app)
+
+    init_logging(app, **config["LOGGING"])
+    init_limiter(app)
+    init_talisman(app)
+
+    metrics_store = None
+    if config["METRICS"]["enabled"]:
+        if config["METRICS"]["path"]:
+            # Every worker publishes its metrics here so /metrics reports all of them
+            metrics_store = MetricsStore(config["METRICS"]["path"])
+        init_metrics(app, metrics_store, config["METRICS"]["server_timing"])
+
+    recording = config["RECORDING"]
+    if recording["enabled"]:
+        init_recording(
+            app,
+            RequestRecorder(
+                recording["path"],
+                recording["sample_rate"],
+                recording["max_bytes"],
+                recording["backup_count"],
+            ),
+        )
+
+    app.jinja_env.filters["format_float"] = format_float
+
+    if shared_data is None:
+        shared_data = load_shared_data(config["VISIBILITY"]["directory"])
+
+    # Consulted by get_alt_az_at_degrees before scanning a night
+    site_visibility.tables = shared_data.get("visibility_tables", [])
+
+    # Before the first transform, so astropy never tries to download its tables
+    configure_iers(config["IERS"]["mode"], config["IERS"]["data_dir"])
+
+    if config["WARMUP"]:
+        # Pay astropy's first-use cost at boot (before forking) instead of on a request
+        warm_up()
+
+    result_cache = create_cache(**config["RESULT_CACHE"])
+
+    if config["SHARED_CACHE"]["path"]:
+        # Workers share night windows and catalog visibility through one SQLite file
+        shared_cache = SQLiteCache(**config["SHARED_CACHE"])
+        night_window_cache.shared = shared_cache
+        visibility_cache.shared = shared_cache
+
+    # Plan workers are started by a fork server: they get this configuration explicitly
+    configure_planning_workers(
+        config["IERS"]["mode"],
+        config["IERS"]["data_dir"],
+        config["SHARED_CACHE"] if config["SHARED_CACHE"]["path"] else None,
+        config["WARMUP"],
+    )
+
+    api = config["API"]
+    if api["job_path"]:
+        job_store = SQLiteCache(api["job_path"], maxsize=4096, ttl=api["job_ttl"])
+    else:
+        job_store = LRUCache(maxsize=1024, ttl=api["job_ttl"])
+    job_runner = JobRunner(api["workers"], api["queue_size"], job_store)
+
+    initialize_routes(
+        app,
+        config["route"],
+        calculate_camera_fov=calculate_camera_fov,
+        calculate_max_shooting_time=calculate_max_shooting_time,
+        calculate_number_of_shoots=calculate_number_of_shoots,
+        shot_timeline=shot_timeline,
+        get_object_data=get_object_data,
+        catalog_stats=shared_data.get("catalog_stats") or CatalogStats.from_database(),
+        camera_database=shared_data["camera_database"],
+        catalog_index=shared_data["catalog_index"],
+        coordinate_table=shared_data["coordinate_table"],
+        result_cache=result_cache,
+        iers_max_age_days=config["IERS"]["max_age_days"],
+        planning=config["PLANNING"],
+        job_runner=job_runner,
+        api_wait_seconds=api["wait_seconds"],
+        metrics_enabled=config["METRICS"]["enabled"],
+        metrics_store=metrics_store,
+        response_cache=ResponseCache(**config["HTTP_CACHE"]),
+    )
+
+    return app
+
+
+def init_worker(app: Flask) -> None:
+    """
+    Reset the per-process state of an application loaded before forking.
 
-init_logging(app)
-init_limiter(app)
-init_talisman(app)
+    Gunicorn calls it from post_fork (see gunicorn.conf.py). SQLite connections reopen
+    themselves in each process; the rate limiter counters are cleared so each worker
+    starts from its own empty storage, and the metrics from zero so what the master
+    counted while booting (see warm_up) is not reported once per worker.
 
-app.jinja_env.filters["format_float"] = format_float
+    Parameters:
+        app (Flask): The application created by create_app.
+    """
+    for limiter in app.extensions.get("limiter", ()):
+        limiter.reset()
 
-current_directory = os.path.dirname(os.path.abspath(__file__))
-json_path = os.path.join(current_directory, "db", "cameras-all.json")
+    metrics.clear()
 
-cameras = load_cameras_from_json(json_path)
 
-initialize_routes(
-    app,
-    ROUTE,
-    calculate_camera_fov,
-    calculate_max_shooting_time,
-    calculate_number_of_shoots,
-    get_object_data,
-    count_dso,
-    cameras,
-)
+app = create_app()
 
 if __name__ == "__main__":
     app.run()
@@ -21,6 +21,23 @@ class Camera:
         crop_factor (str): The crop factor of the camera.
     """
 
+    # Thousands of cameras are kept in every worker: slots drop the per-instance __dict__
+    __slots__ = (
+        "sensor_size_w",
+        "sensor_size_h",
+        "sensor_px_w",
+        "sensor_px_h",
+        "url",
+        "image_url",
+        "brand",
+        "model",
+        "iso",
+        "also_known_as",
+        "year",
+        "max_aperture",
+        "crop_factor",
+    )
+
     def __init__(
         self,
         sensor_size_w: float,
@@ -0,0 +1,327 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from typing import Any, Optional
+
+from app.db.Camera import Camera
+from app.db.db_convert import DEFAULT_CSV_PATH, read_cameras_csv
+from app.utils.camera_utils import camera_from_dict
+
+# Bump when the schema below changes so stale files are rebuilt
+DATABASE_FORMAT_VERSION = 2
+
+# Bytes of the file read through a shared memory map instead of read() copies
+MMAP_SIZE = 64 * 1024 * 1024
+
+# The Camera attributes, in constructor order, and their column types
+CAMERA_COLUMNS = (
+    ("sensor_size_w", "REAL"),
+    ("sensor_size_h", "REAL"),
+    ("sensor_px_w", "INTEGER"),
+    ("sensor_px_h", "INTEGER"),
+    ("url", "TEXT"),
+    ("image_url", "TEXT"),
+    ("brand", "TEXT"),
+    ("model", "TEXT"),
+    ("iso", "TEXT"),
+    ("also_known_as", "TEXT"),
+    ("year", "TEXT"),
+    ("max_aperture", "TEXT"),
+    ("crop_factor", "TEXT"),
+)
+
+# ISO values are stored joined; none of them contains a comma
+_ISO_SEPARATOR = ","
+
+DEFAULT_LIMIT = 50
+
+# Queries shorter than this are not searched (the autocomplete waits for more input)
+MIN_QUERY_LENGTH = 3
+
+_SCHEMA = f"""
+CREATE TABLE cameras (
+    id INTEGER PRIMARY KEY,
+    {", ".join(f"{name} {column_type}" for name, column_type in CAMERA_COLUMNS)},
+    suggestion TEXT
+);
+CREATE VIRTUAL TABLE camera_search USING fts5(
+    brand, model, also_known_as, tokenize='trigram', content=''
+);
+CREATE INDEX cameras_order ON cameras (brand, model, year);
+CREATE INDEX cameras_model ON cameras (model COLLATE NOCASE);
+CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def camera_suggestion(camera: Camera) -> dict[str, Any]:
+    """
+    Build the autocomplete suggestion of a camera.
+
+    Args:
+        camera (Camera): The camera.
+
+    Returns:
+        dict: The camera fields the object form fills in, plus the text and value shown in
+        the autocomplete list.
+    """
+    return {
+        "brand": camera.brand,
+        "model": camera.model,
+        "also_known_as": camera.also_known_as,
+        "url": camera.url,
+        "image_url": camera.image_url,
+        "sensor_width_mm": camera.sensor_size_w,
+        "sensor_height_mm": camera.sensor_size_h,
+        "number_of_pixels_in_width": camera.sensor_px_w,
+        "number_of_pixels_in_height": camera.sensor_px_h,
+        "year": camera.year,
+        "text": f"<strong>{camera.model}</strong> ({camera.brand})",
+        "value": camera.model,
+    }
+
+
+def serialized_suggestion(camera: Camera) -> str:
+    """
+    The suggestion of a camera serialized like jsonify does, so responses can be
+    assembled by joining strings.
+    """
+    return json.dumps(camera_suggestion(camera), sort_keys=True, separators=(",", ":"))
+
+
+def camera_sort_key(camera: Camera) -> tuple:
+    """
+    The order of the autocomplete results: brand, model and year.
+    """
+    return (camera.brand or "", camera.model or "", camera.year or "")
+
+
+def source_digest(csv_path: str = DEFAULT_CSV_PATH) -> str:
+    """
+    Returns a short hash of the CSV export, used to version the compiled database.
+    """
+    digest = hashlib.sha256()
+    with open(csv_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def database_path(csv_path: str = DEFAULT_CSV_PATH) -> str:
+    """
+    Returns the path of the compiled database for the current CSV export.
+    """
+    return os.path.join(
+        os.path.dirname(os.path.abspath(csv_path)),
+        f"cameras-v{DATABASE_FORMAT_VERSION}-{source_digest(csv_path)}.sqlite",
+    )
+
+
+def _row_values(item: dict) -> tuple:
+    iso = item.get("iso")
+    values = {name: item.get(name) for name, _ in CAMERA_COLUMNS if name != "iso"}
+    values["iso"] = _ISO_SEPARATOR.join(iso) if iso is not None else None
+    return tuple(values[name] for name, _ in CAMERA_COLUMNS)
+
+
+def build_camera_database(csv_path: str, path: str) -> int:
+    """
+    Compiles the camera CSV export into an indexed SQLite database.
+
+    The file is written under a temporary name and renamed, so workers building it at the
+    same time never open a partial file.
+
+    Args:
+        csv_path (str): The camera CSV export.
+        path (str): The destination of the database.
+
+    Returns:
+        int: The number of cameras written.
+    """
+    # Stored sorted, so the ids give the order of the autocomplete results
+    cameras = sorted(
+        read_cameras_csv(csv_path),
+        key=lambda item: camera_sort_key(camera_from_dict(item)),
+    )
+    columns = [name for name, _ in CAMERA_COLUMNS]
+
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(temporary_path):
+        os.remove(temporary_path)
+
+    with closing(sqlite3.connect(temporary_path)) as connection:
+        connection.executescript(_SCHEMA)
+        connection.executemany(
+            f"INSERT INTO cameras (id, {', '.join(columns)}, suggestion) "
+            f"VALUES (?, {', '.join('?' for _ in columns)}, ?)",
+            [
+                (
+                    camera_id,
+                    *_row_values(item),
+                    serialized_suggestion(camera_from_dict(item)),
+                )
+                for camera_id, item in enumerate(cameras, 1)
+            ],
+        )
+        connection.executemany(
+            "INSERT INTO camera_search (rowid, brand, model, also_known_as) "
+            "VALUES (?, ?, ?, ?)",
+            [
+                (
+                    camera_id,
+                    item.get("brand"),
+                    item.get("model"),
+                    item.get("also_known_as"),
+                )
+                for camera_id, item in enumerate(cameras, 1)
+            ],
+        )
+        connection.executemany(
+            "INSERT INTO metadata (key, value) VALUES (?, ?)",
+            [
+                ("format_version", str(DATABASE_FORMAT_VERSION)),
+                ("source_digest", source_digest(csv_path)),
+            ],
+        )
+        connection.commit()
+        connection.execute("VACUUM")
+    os.replace(temporary_path, path)
+
+    return len(cameras)
+
+
+def _camera_from_row(row: tuple) -> Camera:
+    values = dict(zip((name for name, _ in CAMERA_COLUMNS), row))
+    if values["iso"] is not None:
+        values["iso"] = values["iso"].split(_ISO_SEPARATOR)
+    return camera_from_dict(values)
+
+
+class CameraDatabase:
+    """
+    Read-only access to the compiled camera database.
+
+    The file is opened on first use, read-only and memory-mapped, so every worker shares
+    its pages through the OS cache and nothing is loaded at startup: the /cameras
+    autocomplete is answered by search_json from a trigram full-text index, with the
+    suggestions stored already serialized. Connections are kept per process and thread,
+    so a database opened before gunicorn forks its workers is reopened in each of them.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initializes the database without opening it.
+
+        Args:
+            path (str): The compiled SQLite file.
+        """
+        self.path = path
+        self._local = threading.local()
+
+    @property
+    def version(self) -> str:
+        """
+        The version of the data: the file name, which holds the digest of the CSV export.
+        """
+        return os.path.splitext(os.path.basename(self.path))[0]
+
+    def _connection(self) -> sqlite3.Connection:
+        connection, pid = getattr(self._local, "connection", (None, None))
+        if connection is None or pid != os.getpid():
+            connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+            connection.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+            self._local.connection = (connection, os.getpid())
+        return connection
+
+    def close(self) -> None:
+        """
+        Closes the connection of the current thread, if any. It is reopened on next use.
+        """
+        connection, pid = getattr(self._local, "connection", (None, None))
+        if connection is not None and pid == os.getpid():
+            connection.close()
+        self._local.connection = (None, None)
+
+    def _select(self, where: str = "", parameters: tuple = ()) -> list[Camera]:
+        columns = ", ".join(name for name, _ in CAMERA_COLUMNS)
+        rows = self._connection().execute(
+            f"SELECT {columns} FROM cameras {where} ORDER BY brand, model, year",
+            parameters,
+        )
+        return [_camera_from_row(row) for row in rows]
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM cameras").fetchone()[0]
+
+    def all(self) -> list[Camera]:
+        """
+        Reads every camera, sorted by brand, model and year.
+        """
+        return self._select()
+
+    def get(self, model: str) -> Optional[Camera]:
+        """
+        Finds a camera by its model name, ignoring case.
+
+        Args:
+            model (str): The model name (ex.: 'EOS 6D').
+
+        Returns:
+            Camera: The first matching camera, or None.
+        """
+        cameras = self._select("WHERE model = ? COLLATE NOCASE", (model,))
+        return cameras[0] if cameras else None
+
+    def search_json(self, query: str, limit: int = DEFAULT_LIMIT) -> str:
+        """
+        Searches cameras whose brand, model or alias contains the query.
+
+        Args:
+            query (str): The text typed by the user, in any case.
+            limit (int, optional): The maximum number of results. Defaults to DEFAULT_LIMIT.
+
+        Returns:
+            str: The suggestions as a JSON array, sorted by brand, model and year.
+        """
+        # SQLite strings end at a NUL; no camera name contains one
+        if len(query) < MIN_QUERY_LENGTH or "\x00" in query or limit <= 0:
+            return "[]"
+
+        # A quoted phrase: with the trigram tokenizer, a case-insensitive substring match
+        phrase = '"' + query.replace('"', '""') + '"'
+        rows = self._connection().execute(
+            "SELECT cameras.suggestion FROM camera_search "
+            "JOIN cameras ON cameras.id = camera_search.rowid "
+            "WHERE camera_search MATCH ? ORDER BY cameras.id LIMIT ?",
+            (phrase, limit),
+        )
+        return "[" + ",".join(suggestion for (suggestion,) in rows) + "]"
+
+
+def open_camera_database(
+    path: Optional[str] = None, csv_path: str = DEFAULT_CSV_PATH
+) -> CameraDatabase:
+    """
+    Returns the compiled camera database, compiling it first if the file is missing.
+
+    Args:
+        path (str, optional): The SQLite file. Defaults to database_path(csv_path).
+        csv_path (str, optional): The CSV export it is compiled from.
+
+    Returns:
+        CameraDatabase: The database, not opened yet.
+    """
+    path = path or database_path(csv_path)
+
+    if not os.path.exists(path):
+        build_camera_database(csv_path, path)
+
+    return CameraDatabase(path)
+
+
+if __name__ == "__main__":
+    destination = database_path()
+    count = build_camera_database(DEFAULT_CSV_PATH, destination)
+    print(f"Wrote {count} cameras to {os.path.normpath(destination)}")
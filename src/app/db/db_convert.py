@@ -1,24 +1,33 @@
 import csv
 import json
+import os
 import re
 from html import unescape
 
-"""
-Converts a CSV file to a JSON file.
+DEFAULT_CSV_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "cameras-all.csv"
+)
 
-Args:
-    csv_file_path (str): The path to the CSV file.
-    json_file_path (str): The path to the JSON file.
 
-Returns:
-    None
-"""
+def read_cameras_csv(csv_file_path):
+    """
+    Reads the camera CSV export and normalizes its rows.
 
+    Column names are lower-cased with underscores, HTML entities are unescaped, the sensor
+    size and resolution are parsed into numbers, ISO values are split into a list and
+    Yes/No values become booleans.
 
-def csv_to_json(csv_file_path, json_file_path):
+    Args:
+        csv_file_path (str): The path to the CSV file.
+
+    Returns:
+        list[dict]: One dictionary per camera.
+    """
     json_data = []
 
-    with open(csv_file_path, mode="r", encoding="utf-8") as csvfile:
+    # utf-8-sig drops the byte order mark the export starts with, which would otherwise
+    # end up in the name of the first column ("url")
+    with open(csv_file_path, mode="r", encoding="utf-8-sig") as csvfile:
         csvreader = csv.DictReader(csvfile, delimiter=";")
 
         fieldnames = [field.lower().replace(" ", "_") for field in csvreader.fieldnames]
@@ -68,9 +77,28 @@ def csv_to_json(csv_file_path, json_file_path):
 
             json_data.append(new_row)
 
+    return json_data
+
+
+def csv_to_json(csv_file_path, json_file_path):
+    """
+    Converts a CSV file to a JSON file.
+
+    Args:
+        csv_file_path (str): The path to the CSV file.
+        json_file_path (str): The path to the JSON file.
+
+    Returns:
+        None
+    """
+    json_data = read_cameras_csv(csv_file_path)
+
     with open(json_file_path, "w", encoding="utf-8") as jsonfile:
         json.dump(json_data, jsonfile, ensure_ascii=False, indent=4)
 
 
-# Example usage
-csv_to_json("cameras-all.csv", "cameras-all.json")
+if __name__ == "__main__":
+    csv_to_json(
+        DEFAULT_CSV_PATH,
+        os.path.join(os.path.dirname(DEFAULT_CSV_PATH), "cameras-all.json"),
+    )
@@ -6,12 +6,12 @@ from wtforms import (
     SubmitField,
     HiddenField,
     DateField,
+    SelectField,
 )
 from wtforms.validators import DataRequired, NumberRange, InputRequired, Optional
 
 
-class ObjectForm(FlaskForm):
-    object_name = StringField("Object Name", validators=[DataRequired()])
+class SessionForm(FlaskForm):
     latitude = FloatField(
         "Latitude", validators=[InputRequired(), NumberRange(-90, 90)]
     )
@@ -53,7 +53,51 @@ class ObjectForm(FlaskForm):
         default=5,
     )
     altitude = IntegerField("Altitude", validators=[Optional(), NumberRange(0, 9999)])
+
+
+class ObjectForm(SessionForm):
+    object_name = StringField("Object Name", validators=[DataRequired()])
     object_id = HiddenField()
     camera = StringField("Select Camera", validators=[Optional()])
 
     submit = SubmitField("Submit")
+
+
+class TonightForm(SessionForm):
+    class Meta:
+        csrf = False
+
+    sort = SelectField(
+        "Sort",
+        choices=["visible_at", "num_shoots", "name"],
+        default="visible_at",
+        validators=[Optional()],
+    )
+    page = IntegerField("Page", validators=[Optional(), NumberRange(1)], default=1)
+    per_page = IntegerField(
+        "Per page", validators=[Optional(), NumberRange(1, 100)], default=50
+    )
+
+
+class CalculationForm(SessionForm):
+    """
+    The calculation of ObjectForm for API clients: the object is given by its ID and
+    there is no CSRF token.
+    """
+
+    class Meta:
+        csrf = False
+
+    object_id = StringField("Object", validators=[DataRequired()])
+
+
+class TimelineForm(CalculationForm):
+    format = SelectField(
+        "Format", choices=["ndjson", "csv"], default="ndjson", validators=[Optional()]
+    )
+
+
+class PlanForm(CalculationForm):
+    nights = IntegerField(
+        "Nights", validators=[Optional(), NumberRange(1, 31)], default=30
+    )
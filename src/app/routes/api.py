@@ -0,0 +1,136 @@
+from concurrent.futures import TimeoutError
+from typing import Any, Callable, Optional
+
+from flask import Blueprint, jsonify, request, url_for
+from werkzeug.datastructures import MultiDict
+
+from app.forms.forms import CalculationForm
+from app.utils.calculation_service import perform_astro_calculations
+from app.utils.jobs import FAILED_JOB, JobQueueFull, JobRunner
+from app.utils.logger import log_exceptions
+
+# Seconds a request waits for its calculation before answering with a job to poll
+DEFAULT_WAIT_SECONDS = 5
+
+# Only meaningful to the HTML result page
+_HTML_RESULT_FIELDS = ("observation_data", "route")
+
+
+def api_result(result: dict[str, Any]) -> dict[str, Any]:
+    """
+    The JSON body of a finished calculation: its "result", or its "error".
+    """
+    if result.get("error"):
+        return {"status": "done", "error": result["error"]}
+    return {
+        "status": "done",
+        "result": {
+            name: value
+            for name, value in result.items()
+            if name not in _HTML_RESULT_FIELDS and name != "error"
+        },
+    }
+
+
+def create_api_blueprint(
+    app,
+    route: str,
+    calculate_camera_fov: Callable,
+    get_object_data: Callable,
+    calculate_max_shooting_time: Callable,
+    calculate_number_of_shoots: Callable,
+    job_runner: JobRunner,
+    result_cache: Optional[Any] = None,
+    wait_seconds: float = DEFAULT_WAIT_SECONDS,
+) -> Blueprint:
+    api_bp: Blueprint = Blueprint("api", __name__)
+
+    def pending(job_id: str):
+        poll_url = url_for("api.job", job_id=job_id)
+        return (
+            jsonify({"job_id": job_id, "status": "pending", "poll": poll_url}),
+            202,
+            {"Location": poll_url},
+        )
+
+    def finished(job_id: str, result: dict[str, Any]):
+        # A result with an error (object not found or never visible) is a 422
+        body = {"job_id": job_id, **api_result(result)}
+        return jsonify(body), 422 if result.get("error") else 200
+
+    def failed(job_id: str):
+        # The job runner has logged the exception; the client only learns it failed
+        return jsonify({"job_id": job_id, **FAILED_JOB}), 500
+
+    @api_bp.route(f"{route}/api/calculate", methods=["POST"])
+    @log_exceptions(app)
+    def calculate():
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict):
+            return jsonify({"error": "The body must be a JSON object."}), 400
+
+        # Validated and converted exactly like the HTML form
+        form = CalculationForm(
+            formdata=MultiDict(
+                {
+                    name: str(value)
+                    for name, value in payload.items()
+                    if value is not None
+                }
+            )
+        )
+        if not form.validate():
+            return jsonify({"errors": form.errors}), 400
+
+        form_data = {
+            field_name: getattr(form, field_name).data for field_name in form._fields
+        }
+
+        try:
+            job_id, future = job_runner.submit(
+                lambda: perform_astro_calculations(
+                    form_data,
+                    calculate_camera_fov,
+                    get_object_data,
+                    calculate_max_shooting_time,
+                    calculate_number_of_shoots,
+                    route,
+                    result_cache,
+                )
+            )
+        except JobQueueFull as exc:
+            return jsonify({"error": str(exc)}), 503, {"Retry-After": "5"}
+
+        if request.args.get("mode") == "async":
+            return pending(job_id)
+
+        try:
+            result = future.result(timeout=wait_seconds)
+        except TimeoutError:
+            return pending(job_id)
+        except Exception:
+            return failed(job_id)
+
+        return finished(job_id, result)
+
+    @api_bp.route(f"{route}/api/jobs/<job_id>", methods=["GET"])
+    @log_exceptions(app)
+    def job(job_id):
+        state = job_runner.status(job_id)
+        if state is None:
+            return jsonify({"error": "Unknown or expired job."}), 404
+
+        if state["status"] == "pending":
+            return pending(job_id)
+
+        if state["status"] == "failed":
+            return failed(job_id)
+
+        return finished(job_id, state["result"])
+
+    # JSON clients send no CSRF token, and the API uses no session or cookie
+    csrf = app.extensions.get("csrf")
+    if csrf is not None:
+        csrf.exempt(api_bp)
+
+    return api_bp
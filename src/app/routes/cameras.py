@@ -1,47 +1,38 @@
-from operator import itemgetter
+from typing import Optional
 
 from flask import Blueprint, jsonify, request
 
+from app.db.camera_db import DEFAULT_LIMIT, MIN_QUERY_LENGTH, CameraDatabase
+from app.utils.http_cache import ResponseCache
 from app.utils.logger import log_exceptions
 
 
-def create_camera_blueprint(app, route, cameras):
+def create_camera_blueprint(
+    app,
+    route,
+    camera_database: CameraDatabase,
+    response_cache: Optional[ResponseCache] = None,
+):
     camera_bp = Blueprint("camera", __name__)
+    response_cache = response_cache if response_cache is not None else ResponseCache()
 
-    @log_exceptions(app)
     @camera_bp.route(f"{route}/cameras", methods=["GET"])
+    @log_exceptions(app)
     def cameras_list():
         query = request.args.get("q", "").lower()
 
-        if len(query) < 3:
+        if len(query) < MIN_QUERY_LENGTH:
             return jsonify([])
 
-        filtered_cameras = [
-            {
-                "brand": camera.brand,
-                "model": camera.model,
-                "also_known_as": camera.also_known_as,
-                "url": camera.url,
-                "image_url": camera.image_url,
-                "sensor_width_mm": camera.sensor_size_w,
-                "sensor_height_mm": camera.sensor_size_h,
-                "number_of_pixels_in_width": camera.sensor_px_w,
-                "number_of_pixels_in_height": camera.sensor_px_h,
-                "year": camera.year,
-                "text": f"<strong>{camera.model}</strong> ({camera.brand})",
-                "value": camera.model,
-            }
-            for camera in cameras
-            if query in (camera.brand if camera.brand else "").lower()
-            or query in (camera.model if camera.model else "").lower()
-            or query in (camera.also_known_as if camera.also_known_as else "").lower()
-        ]
-
-        # Sort filtered_cameras by brand, model, and year
-        sorted_filtered_cameras = sorted(
-            filtered_cameras, key=itemgetter("brand", "model", "year")
-        )
+        limit = min(request.args.get("limit", DEFAULT_LIMIT, type=int), DEFAULT_LIMIT)
 
-        return jsonify(sorted_filtered_cameras)
+        # Trigram lookup in the camera database, with the suggestions already
+        # serialized and sorted
+        return response_cache.respond(
+            "cameras",
+            camera_database.version,
+            (query, limit),
+            lambda: camera_database.search_json(query, limit=limit),
+        )
 
     return camera_bp
@@ -0,0 +1,23 @@
+from flask import Blueprint, jsonify, request
+
+from app.search.catalog_stats import CatalogStats
+from app.utils.logger import log_exceptions
+
+# The statistics only change with the catalog version, which the ETag follows
+CACHE_CONTROL = "public, max-age=3600, must-revalidate"
+
+
+def create_catalog_blueprint(app, route: str, catalog_stats: CatalogStats) -> Blueprint:
+    catalog_bp: Blueprint = Blueprint("catalog", __name__)
+
+    @catalog_bp.route(f"{route}/catalog/stats", methods=["GET"])
+    @log_exceptions(app)
+    def stats():
+        response = jsonify(catalog_stats.to_dict())
+        response.set_etag(catalog_stats.etag)
+        response.headers["Cache-Control"] = CACHE_CONTROL
+
+        # Answers 304 Not Modified when the client already has this version
+        return response.make_conditional(request)
+
+    return catalog_bp
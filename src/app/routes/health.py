@@ -0,0 +1,20 @@
+from flask import Blueprint, jsonify
+
+from app.utils.iers_data import DEFAULT_MAX_AGE_DAYS, iers_status
+from app.utils.logger import log_exceptions
+
+
+def create_health_blueprint(
+    app, route: str, iers_max_age_days: float = DEFAULT_MAX_AGE_DAYS
+) -> Blueprint:
+    health_bp: Blueprint = Blueprint("health", __name__)
+
+    @health_bp.route(f"{route}/health", methods=["GET"])
+    @log_exceptions(app)
+    def health():
+        # Stale tables still give usable results, so the status is reported, not failed
+        iers = iers_status(iers_max_age_days)
+
+        return jsonify({"status": "stale" if iers["stale"] else "ok", "iers": iers})
+
+    return health_bp
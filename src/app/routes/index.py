@@ -1,10 +1,12 @@
-from typing import Callable
+from typing import Any, Callable, Optional
 
 from flask import Blueprint, render_template, request
 
 from app.forms.forms import ObjectForm
+from app.search.catalog_stats import CatalogStats
 from app.utils.calculation_service import perform_astro_calculations
 from app.utils.logger import log_exceptions
+from app.utils.metrics import metrics
 
 
 def create_index_blueprint(
@@ -14,12 +16,13 @@ def create_index_blueprint(
     get_object_data: Callable,
     calculate_max_shooting_time: Callable,
     calculate_number_of_shoots: Callable,
-    count_dso: Callable,
+    catalog_stats: CatalogStats,
+    result_cache: Optional[Any] = None,
 ) -> Blueprint:
     index_bp: Blueprint = Blueprint("index", __name__)
 
-    @log_exceptions(app)
     @index_bp.route(route, methods=["GET", "POST"])
+    @log_exceptions(app)
     def index():
         form = ObjectForm()
         if form.validate_on_submit():
@@ -28,8 +31,6 @@ def create_index_blueprint(
                 for field_name in form._fields
             }
 
-            print(form_data)
-
             result = perform_astro_calculations(
                 form_data,
                 calculate_camera_fov,
@@ -37,20 +38,22 @@ def create_index_blueprint(
                 calculate_max_shooting_time,
                 calculate_number_of_shoots,
                 route,
+                result_cache,
             )
 
             if result.get("error"):
                 error = result["error"]
                 return render_template("error.html", error=error)
 
-            return render_template("result.html", **result)
+            with metrics.stage("render"):
+                return render_template("result.html", **result)
 
         return render_template(
             "index.html",
             form=form,
             route=route,
             cookies=request.cookies,
-            db_num_objects=count_dso(),
+            db_num_objects=catalog_stats.total_without_duplicates,
         )  # Pass the form object
 
     return index_bp
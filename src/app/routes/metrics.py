@@ -0,0 +1,30 @@
+from typing import Optional
+
+from flask import Blueprint
+
+from app.utils.logger import log_exceptions
+from app.utils.metrics import MetricsStore, metrics, render_metrics
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def create_metrics_blueprint(
+    app, route: str, metrics_store: Optional[MetricsStore] = None
+) -> Blueprint:
+    metrics_bp: Blueprint = Blueprint("metrics", __name__)
+
+    @metrics_bp.route(f"{route}/metrics", methods=["GET"])
+    @log_exceptions(app)
+    def prometheus_metrics():
+        # Without a store only the worker answering the scrape is reported
+        if metrics_store is not None:
+            snapshot = metrics_store.collect(metrics)
+        else:
+            snapshot = metrics.snapshot()
+
+        return app.response_class(
+            render_metrics(snapshot, metrics.buckets),
+            content_type=PROMETHEUS_CONTENT_TYPE,
+        )
+
+    return metrics_bp
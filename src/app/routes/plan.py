@@ -0,0 +1,49 @@
+from typing import Any, Callable, Optional
+
+from flask import Blueprint, jsonify, request
+
+from app.forms.forms import PlanForm
+from app.utils.logger import log_exceptions
+from app.utils.planning import DEFAULT_TIMEOUT, DEFAULT_WORKERS, plan_nights
+
+
+def create_plan_blueprint(
+    app,
+    route: str,
+    calculate_camera_fov: Callable,
+    get_object_data: Callable,
+    calculate_max_shooting_time: Callable,
+    calculate_number_of_shoots: Callable,
+    result_cache: Optional[Any] = None,
+    workers: int = DEFAULT_WORKERS,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> Blueprint:
+    plan_bp: Blueprint = Blueprint("plan", __name__)
+
+    @plan_bp.route(f"{route}/plan", methods=["GET"])
+    @log_exceptions(app)
+    def plan():
+        form = PlanForm(formdata=request.args)
+        if not form.validate():
+            return jsonify({"errors": form.errors}), 400
+
+        form_data = {
+            field_name: getattr(form, field_name).data for field_name in form._fields
+        }
+
+        result = plan_nights(
+            form_data,
+            form_data["nights"] or 30,
+            calculate_camera_fov,
+            get_object_data,
+            calculate_max_shooting_time,
+            calculate_number_of_shoots,
+            result_cache,
+            workers=workers,
+            timeout=timeout,
+        )
+        result["object_id"] = form_data["object_id"]
+
+        return jsonify(result)
+
+    return plan_bp
@@ -1,22 +1,44 @@
 # route_initializer.py
 
-from flask_wtf.csrf import CSRFProtect
+from app.utils.http_cache import ResponseCache
+from app.utils.jobs import JobRunner
 
+from .api import create_api_blueprint
 from .cameras import create_camera_blueprint
+from .catalog import create_catalog_blueprint
+from .health import create_health_blueprint
 from .index import create_index_blueprint
+from .metrics import create_metrics_blueprint
+from .plan import create_plan_blueprint
 from .search_objects import create_search_objects_blueprint
+from .timeline import create_timeline_blueprint
+from .tonight import create_tonight_blueprint
 
 
 def initialize_routes(
     app,
     route,
+    *,
     calculate_camera_fov,
     calculate_max_shooting_time,
     calculate_number_of_shoots,
+    shot_timeline,
     get_object_data,
-    count_dso,
-    cameras,
+    catalog_stats,
+    camera_database,
+    catalog_index,
+    coordinate_table,
+    result_cache=None,
+    iers_max_age_days=30,
+    planning=None,
+    job_runner=None,
+    api_wait_seconds=5,
+    metrics_enabled=False,
+    metrics_store=None,
+    response_cache=None,
 ):
+    # Keyword-only: most of these objects would be accepted in any position, so a
+    # positional call would hand them to the wrong blueprint without an error
     index_bp = create_index_blueprint(
         app,
         route,
@@ -24,14 +46,72 @@ def initialize_routes(
         get_object_data,
         calculate_max_shooting_time,
         calculate_number_of_shoots,
-        count_dso,
+        catalog_stats,
+        result_cache,
     )
-    search_objects_bp = create_search_objects_blueprint(app, route)
+    # Autocomplete responses, cached per data version and normalized query
+    response_cache = response_cache if response_cache is not None else ResponseCache()
 
-    camera_bp = create_camera_blueprint(app, route, cameras)
+    search_objects_bp = create_search_objects_blueprint(
+        app, route, catalog_index, catalog_stats.version, response_cache
+    )
+
+    camera_bp = create_camera_blueprint(app, route, camera_database, response_cache)
+
+    tonight_bp = create_tonight_blueprint(
+        app,
+        route,
+        calculate_camera_fov,
+        calculate_max_shooting_time,
+        coordinate_table,
+    )
+
+    timeline_bp = create_timeline_blueprint(
+        app,
+        route,
+        calculate_camera_fov,
+        get_object_data,
+        calculate_max_shooting_time,
+        calculate_number_of_shoots,
+        shot_timeline,
+    )
+
+    plan_bp = create_plan_blueprint(
+        app,
+        route,
+        calculate_camera_fov,
+        get_object_data,
+        calculate_max_shooting_time,
+        calculate_number_of_shoots,
+        result_cache,
+        **(planning or {}),
+    )
+
+    api_bp = create_api_blueprint(
+        app,
+        route,
+        calculate_camera_fov,
+        get_object_data,
+        calculate_max_shooting_time,
+        calculate_number_of_shoots,
+        job_runner or JobRunner(),
+        result_cache,
+        api_wait_seconds,
+    )
+
+    catalog_bp = create_catalog_blueprint(app, route, catalog_stats)
+
+    health_bp = create_health_blueprint(app, route, iers_max_age_days)
 
     app.register_blueprint(index_bp)
     app.register_blueprint(search_objects_bp)
     app.register_blueprint(camera_bp)
-    csrf = CSRFProtect()
-    csrf.init_app(app)
+    app.register_blueprint(tonight_bp)
+    app.register_blueprint(timeline_bp)
+    app.register_blueprint(plan_bp)
+    app.register_blueprint(api_bp)
+    app.register_blueprint(catalog_bp)
+    app.register_blueprint(health_bp)
+
+    if metrics_enabled:
+        app.register_blueprint(create_metrics_blueprint(app, route, metrics_store))
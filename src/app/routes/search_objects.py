@@ -1,58 +1,60 @@
 import json
-from operator import itemgetter
-from typing import Any
+from typing import Optional
 
 from flask import Blueprint, request, jsonify
 
+from app.search.catalog_index import DEFAULT_LIMIT, CatalogIndex, normalize
 from app.search.dsosearcher import DsoSearcher
+from app.utils.http_cache import ResponseCache
 from app.utils.logger import log_exceptions
 
 
 def create_search_objects_blueprint(
     app,
     route,
+    catalog_index: Optional[CatalogIndex] = None,
+    catalog_version: str = "",
+    response_cache: Optional[ResponseCache] = None,
 ):
     search_objects_bp = Blueprint("search_objects", __name__)
+    response_cache = response_cache if response_cache is not None else ResponseCache()
+
+    def suggestions_json(query: str, limit: int) -> str:
+        if catalog_index is not None:
+            # Ranked lookup in the in-memory catalog index (best matches first)
+            records = catalog_index.search(query, limit=limit)
+        else:
+            records = DsoSearcher.search_records(query, limit=limit)
+
+        suggestions = [
+            {
+                "text": f"<strong>{record.name}</strong> - <em>{record.common_name}</em> <small>({record.type})</small>",
+                "value": record.name,
+                "type": record.type,
+                "object_id": record.name,
+            }
+            for record in records
+        ]
+
+        return json.dumps(suggestions, separators=(",", ":"))
 
-    @log_exceptions(app)
     @search_objects_bp.route(f"{route}/search_objects", methods=["GET", "POST"])
+    @log_exceptions(app)
     def search_objects():
         query = request.args.get("q")
         if not query:
             return jsonify([])
 
-        # Using DsoSearcher to perform the search (returns JSON strings)
-        results = DsoSearcher.search(partial_name=query)
-        if not results:  # Handling the case where no results are found
-            return jsonify([])
+        limit = min(request.args.get("limit", DEFAULT_LIMIT, type=int), DEFAULT_LIMIT)
+
+        # The index only sees the normalized query ("ngc 224" and "NGC0224" match alike)
+        key = (normalize(query) if catalog_index is not None else query.upper(), limit)
 
-        # Parsing the JSON strings into dictionaries
-        result: str
-        parsed_results: list[Any] = [json.loads(result) for result in results]
-
-        # Constructing the suggestions in the same structure as before
-        suggestions = []
-        for obj in parsed_results:
-            object_type = obj["type"]
-            other_identifiers = obj.get("other identifiers", {})
-            common_names = other_identifiers.get("common names")
-            if common_names:
-                common_name = f"{common_names[0]}"
-            else:
-                common_name = ""
-
-            suggestions.append(
-                {
-                    "text": f"<strong>{obj['name']}</strong> - <em>{common_name}</em> <small>({object_type})</small>",
-                    "value": obj["name"],
-                    "type": object_type,
-                    "object_id": obj["name"],
-                }
-            )
-
-        # Sort filtered_cameras by type and name
-        sorted_filtered_objects = sorted(suggestions, key=itemgetter("type", "value"))
-
-        return jsonify(sorted_filtered_objects)
+        return response_cache.respond(
+            "search_objects",
+            catalog_version,
+            key,
+            lambda: suggestions_json(query, limit),
+        )
 
     return search_objects_bp
@@ -0,0 +1,114 @@
+import csv
+import io
+import json
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+
+from flask import Blueprint, jsonify, request, stream_with_context
+
+from app.forms.forms import TimelineForm
+from app.utils.calculation_service import session_timeline
+from app.utils.calculations import TIMELINE_CHUNK_SIZE, TIMELINE_FIELDS
+from app.utils.logger import log_exceptions
+
+# Decimals of the streamed values: about 0.04 arcseconds and 0.0001 of the field of view
+TIMELINE_DECIMALS = {"alt": 5, "az": 5, "drift_alt": 4, "drift_az": 4, "fov_used": 4}
+
+
+def _rounded(shot: dict) -> dict:
+    for field, decimals in TIMELINE_DECIMALS.items():
+        shot[field] = round(shot[field], decimals)
+    return shot
+
+
+def _batches(shots: Iterable[dict]) -> Iterator[list]:
+    shots = iter(shots)
+    while batch := list(islice(shots, TIMELINE_CHUNK_SIZE)):
+        yield batch
+
+
+def ndjson_lines(shots: Iterable[dict]) -> Iterator[str]:
+    """
+    Serialize shots as newline-delimited JSON, one chunk of lines at a time.
+    """
+    for batch in _batches(shots):
+        yield "".join(json.dumps(_rounded(shot)) + "\n" for shot in batch)
+
+
+def csv_lines(shots: Iterable[dict]) -> Iterator[str]:
+    """
+    Serialize shots as CSV with a header row, one chunk of rows at a time.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=TIMELINE_FIELDS)
+    writer.writeheader()
+
+    for batch in _batches(shots):
+        writer.writerows(_rounded(shot) for shot in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    # Header only when there are no shots
+    if buffer.getvalue():
+        yield buffer.getvalue()
+
+
+def create_timeline_blueprint(
+    app,
+    route: str,
+    calculate_camera_fov: Callable,
+    get_object_data: Callable,
+    calculate_max_shooting_time: Callable,
+    calculate_number_of_shoots: Callable,
+    shot_timeline: Callable,
+) -> Blueprint:
+    timeline_bp: Blueprint = Blueprint("timeline", __name__)
+
+    @timeline_bp.route(f"{route}/timeline", methods=["GET"])
+    @log_exceptions(app)
+    def timeline():
+        form = TimelineForm(formdata=request.args)
+        if not form.validate():
+            return jsonify({"errors": form.errors}), 400
+
+        form_data = {
+            field_name: getattr(form, field_name).data for field_name in form._fields
+        }
+
+        result = session_timeline(
+            form_data,
+            calculate_camera_fov,
+            get_object_data,
+            calculate_max_shooting_time,
+            calculate_number_of_shoots,
+            shot_timeline,
+        )
+
+        if result["error"]:
+            return jsonify({"error": result["error"]}), 422
+
+        headers = {
+            "X-Number-Of-Shoots": str(result["num_shoots"]),
+            "X-Exposure-Time": str(result["exposure_time"]),
+        }
+
+        # The shots are computed while the response is sent, never all held in memory
+        if form_data["format"] == "csv":
+            filename = (
+                f"{form_data['object_id'].strip().replace(' ', '_')}-timeline.csv"
+            )
+            headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+            return app.response_class(
+                stream_with_context(csv_lines(result["shots"])),
+                mimetype="text/csv",
+                headers=headers,
+            )
+
+        return app.response_class(
+            stream_with_context(ndjson_lines(result["shots"])),
+            mimetype="application/x-ndjson",
+            headers=headers,
+        )
+
+    return timeline_bp
@@ -0,0 +1,79 @@
+from typing import Callable
+
+from flask import Blueprint, jsonify, request
+
+from app.forms.forms import TonightForm
+from app.search.coordinate_table import CoordinateTable
+from app.utils.calculation_service import build_location, observation_time_from_date
+from app.utils.logger import log_exceptions
+from app.utils.tonight import evaluate_catalog, rank_catalog
+
+
+def create_tonight_blueprint(
+    app,
+    route: str,
+    calculate_camera_fov: Callable,
+    calculate_max_shooting_time: Callable,
+    coordinate_table: CoordinateTable,
+) -> Blueprint:
+    tonight_bp: Blueprint = Blueprint("tonight", __name__)
+
+    @tonight_bp.route(f"{route}/tonight", methods=["GET"])
+    @log_exceptions(app)
+    def tonight():
+        form = TonightForm(formdata=request.args)
+        if not form.validate():
+            return jsonify({"errors": form.errors}), 400
+
+        form_data = {
+            field_name: getattr(form, field_name).data for field_name in form._fields
+        }
+
+        fov_width, fov_height, _, _ = calculate_camera_fov(
+            form_data["sensor_width_mm"],
+            form_data["sensor_height_mm"],
+            form_data["number_of_pixels_in_width"],
+            form_data["number_of_pixels_in_height"],
+            form_data["focal_length"],
+        )
+
+        max_shooting_time, real_max_shooting_time = calculate_max_shooting_time(
+            form_data["aperture"],
+            form_data["sensor_width_mm"],
+            form_data["number_of_pixels_in_width"],
+            form_data["focal_length"],
+        )
+
+        # One batched pass over the whole catalog
+        evaluation = evaluate_catalog(
+            coordinate_table,
+            build_location(form_data),
+            observation_time_from_date(form_data["observation_date"]),
+            fov_width,
+            fov_height,
+            max_shooting_time,
+            form_data["shoot_interval"],
+            form_data["camera_position"],
+            form_data["min_degrees"],
+        )
+
+        result = rank_catalog(
+            evaluation,
+            coordinate_table,
+            max_shooting_time,
+            form_data["shoot_interval"],
+            sort=form_data["sort"] or "visible_at",
+            page=form_data["page"] or 1,
+            per_page=form_data["per_page"] or 50,
+        )
+        result.update(
+            {
+                "max_shooting_time": max_shooting_time,
+                "real_max_shooting_time": real_max_shooting_time,
+                "min_degrees": form_data["min_degrees"],
+            }
+        )
+
+        return jsonify(result)
+
+    return tonight_bp
@@ -0,0 +1,169 @@
+import re
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Optional
+
+from app.search.dsosearcher import DsoSearcher
+from app.search.records import DsoRecord
+
+DEFAULT_LIMIT = 50
+
+# "NGC 0224", "ngc224" and "NGC0224" all normalize to "NGC224"
+_CATALOG_NUMBER = re.compile(r"^([A-Z]+)\s*0*(?=\d)(\d.*)$")
+
+# Separators that cannot appear in a normalized query
+_KEY_SEPARATOR = "\x00"
+_RECORD_SEPARATOR = "\x01"
+
+
+def normalize(text: str) -> str:
+    """
+    Normalize an object name or a search query for index lookups.
+
+    Args:
+        text (str): The name or query.
+
+    Returns:
+        str: The upper-cased text, with catalog numbers stripped of spaces and leading zeros.
+    """
+    text = text.strip().upper()
+    match = _CATALOG_NUMBER.match(text)
+    if match:
+        return f"{match.group(1)}{match.group(2)}"
+    return text
+
+
+def _record_keys(record: DsoRecord) -> list[str]:
+    """
+    Collect the normalized names an object can be found by.
+    """
+    names = [record.name, *record.ngc, *record.ic, *record.common_names]
+    if record.messier:
+        names.append(record.messier)
+
+    keys = []
+    for name in names:
+        key = normalize(name)
+        if key and key not in keys:
+            keys.append(key)
+    return keys
+
+
+class CatalogIndex:
+    """
+    An in-memory index of the catalog objects for autocomplete lookups.
+
+    Results are ranked in three tiers: names equal to the query, names starting with the
+    query (shorter names first) and names containing the query (catalog order).
+    """
+
+    def __init__(self, records: Iterable[DsoRecord]) -> None:
+        """
+        Builds the index.
+
+        Args:
+            records (Iterable[DsoRecord]): The catalog records to index.
+        """
+        self._records = tuple(records)
+        self._by_key: dict[str, tuple[int, ...]] = {}
+        self._keys_by_length: dict[int, list[str]] = {}
+
+        segments = []
+        self._offsets = []
+        offset = 0
+
+        for record_id, record in enumerate(self._records):
+            keys = _record_keys(record)
+            for key in keys:
+                self._by_key[key] = self._by_key.get(key, ()) + (record_id,)
+
+            segment = _KEY_SEPARATOR.join(keys) + _RECORD_SEPARATOR
+            segments.append(segment)
+            self._offsets.append(offset)
+            offset += len(segment)
+
+        for key in self._by_key:
+            self._keys_by_length.setdefault(len(key), []).append(key)
+        for keys in self._keys_by_length.values():
+            keys.sort()
+
+        self._lengths = sorted(self._keys_by_length)
+        self._haystack = "".join(segments)
+
+    @classmethod
+    def from_database(cls) -> "CatalogIndex":
+        """
+        Builds the index from every non-duplicate object of the PyOngc database.
+
+        Returns:
+            CatalogIndex: The populated index.
+        """
+        return cls(DsoSearcher.all_records())
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def get(self, name: str) -> Optional[DsoRecord]:
+        """
+        Retrieves a record by its name or any of its identifiers.
+
+        Args:
+            name (str): The name to look up (ex.: 'NGC0224', 'M31').
+
+        Returns:
+            DsoRecord: The matching record, or None if no object has that name.
+        """
+        record_ids = self._by_key.get(normalize(name))
+        if not record_ids:
+            return None
+
+        for record_id in record_ids:
+            if self._records[record_id].name == name:
+                return self._records[record_id]
+        return self._records[record_ids[0]]
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> list[DsoRecord]:
+        """
+        Searches for records whose names or common names contain the query.
+
+        Args:
+            query (str): The text typed by the user.
+            limit (int): The maximum number of records to return.
+
+        Returns:
+            list[DsoRecord]: The matching records, best matches first.
+        """
+        query = normalize(query)
+        if not query or limit <= 0:
+            return []
+
+        found: dict[int, None] = {}
+
+        def collect(record_ids: Iterable[int]) -> bool:
+            for record_id in record_ids:
+                found.setdefault(record_id)
+                if len(found) >= limit:
+                    return True
+            return False
+
+        if collect(self._by_key.get(query, ())):
+            return self._resolve(found)
+
+        for length in self._lengths[bisect_right(self._lengths, len(query)) :]:
+            keys = self._keys_by_length[length]
+            position = bisect_left(keys, query)
+            while position < len(keys) and keys[position].startswith(query):
+                if collect(self._by_key[keys[position]]):
+                    return self._resolve(found)
+                position += 1
+
+        position = self._haystack.find(query)
+        while position != -1:
+            record_id = bisect_right(self._offsets, position) - 1
+            if collect((record_id,)):
+                break
+            position = self._haystack.find(query, position + 1)
+
+        return self._resolve(found)
+
+    def _resolve(self, record_ids: Iterable[int]) -> list[DsoRecord]:
+        return [self._records[record_id] for record_id in record_ids]
@@ -0,0 +1,105 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.search.dsosearcher import DsoSearcher
+
+
+def catalog_version() -> str:
+    """
+    Returns the version of the installed catalog: the PyOngc release and its database date.
+    """
+    from importlib.metadata import version
+
+    from pyongc import DBDATE
+
+    return f"pyongc-{version('pyongc')}-{DBDATE}"
+
+
+@dataclass(frozen=True)
+class CatalogStats:
+    """
+    A snapshot of the statistics of the catalog, taken once when the application starts.
+
+    The catalog only changes when PyOngc is upgraded, which means a restart, so the index
+    page and the endpoints serve these numbers from memory instead of counting rows.
+
+    Attributes:
+        version (str): The catalog version (see catalog_version).
+        by_type (dict): The number of objects of each type code, duplicates ("Dup")
+            included.
+        type_names (dict): The description of each type code (ex.: 'G': 'Galaxy').
+    """
+
+    version: str
+    by_type: dict[str, int]
+    type_names: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_database(cls) -> "CatalogStats":
+        """
+        Takes the snapshot from the PyOngc database, with a single query.
+
+        Returns:
+            CatalogStats: The statistics of the installed catalog.
+        """
+        rows = DsoSearcher.count_by_type()
+
+        return cls(
+            version=catalog_version(),
+            by_type={code: count for code, _, count in rows},
+            type_names={code: description for code, description, _ in rows},
+        )
+
+    @property
+    def total(self) -> int:
+        """
+        The number of rows of the catalog, duplicates included.
+        """
+        return sum(self.by_type.values())
+
+    @property
+    def duplicates(self) -> int:
+        """
+        The number of duplicate entries, which point to another object.
+        """
+        return self.by_type.get("Dup", 0)
+
+    @property
+    def total_without_duplicates(self) -> int:
+        """
+        The number of distinct objects: what DsoSearcher.count_objects() counts.
+        """
+        return self.total - self.duplicates
+
+    @property
+    def etag(self) -> str:
+        """
+        An entity tag that changes with the catalog version or any count.
+        """
+        content = json.dumps([self.version, sorted(self.by_type.items())])
+        return hashlib.sha1(content.encode("utf-8")).hexdigest()[:16]
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Returns the statistics as a JSON-serializable dictionary.
+
+        It holds nothing the etag does not follow (such as when the snapshot was taken),
+        so the same tag always comes with the same body, across restarts too.
+        """
+        return {
+            "version": self.version,
+            "etag": self.etag,
+            "total": self.total,
+            "total_without_duplicates": self.total_without_duplicates,
+            "duplicates": self.duplicates,
+            "by_type": [
+                {
+                    "type": code,
+                    "description": self.type_names.get(code, code),
+                    "count": count,
+                }
+                for code, count in sorted(self.by_type.items())
+            ],
+        }
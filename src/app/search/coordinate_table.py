@@ -0,0 +1,191 @@
+import os
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from app.search.dsosearcher import DsoSearcher
+
+# Bump when the layout of COORDINATE_DTYPE changes so stale files are rebuilt
+TABLE_FORMAT_VERSION = 1
+
+COORDINATE_DTYPE = np.dtype(
+    [
+        ("name", "S16"),
+        ("label", "S48"),
+        ("ra_deg", "f8"),
+        ("dec_deg", "f8"),
+        ("major_axis", "f8"),
+        ("minor_axis", "f8"),
+        ("position_angle", "f8"),
+    ]
+)
+
+DEFAULT_TABLE_DIRECTORY = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "db"
+)
+
+
+class CoordinateRow(NamedTuple):
+    """
+    The precomputed data of one object. Missing values are None.
+    """
+
+    name: str
+    label: str
+    ra_deg: Optional[float]
+    dec_deg: Optional[float]
+    major_axis: Optional[float]
+    minor_axis: Optional[float]
+    position_angle: Optional[float]
+
+
+def _optional(value) -> Optional[float]:
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+class CoordinateTable:
+    """
+    Catalog coordinates and dimensions as a structured NumPy array sorted by name.
+
+    The array is usually memory-mapped from a .npy file, so every worker shares the same
+    pages and lookups never parse sexagesimal strings.
+    """
+
+    def __init__(self, data: np.ndarray) -> None:
+        """
+        Initializes the table.
+
+        Args:
+            data (np.ndarray): A COORDINATE_DTYPE array sorted by the name field.
+        """
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def position(self, name: str) -> Optional[int]:
+        """
+        Finds the row of an object.
+
+        Args:
+            name (str): The main name of the object (ex.: 'NGC0224').
+
+        Returns:
+            int: The row number, or None if the object is not in the table.
+        """
+        key = name.encode("utf-8")
+        position = int(np.searchsorted(self.data["name"], key))
+        if position < len(self.data) and self.data["name"][position] == key:
+            return position
+        return None
+
+    def get(self, name: str) -> Optional[CoordinateRow]:
+        """
+        Retrieves the precomputed data of an object.
+
+        Args:
+            name (str): The main name of the object (ex.: 'NGC0224').
+
+        Returns:
+            CoordinateRow: The data of the object, or None if it is not in the table.
+        """
+        position = self.position(name)
+        if position is None:
+            return None
+
+        row = self.data[position]
+        return CoordinateRow(
+            name=row["name"].decode("utf-8"),
+            label=row["label"].decode("utf-8", errors="ignore"),
+            ra_deg=_optional(row["ra_deg"]),
+            dec_deg=_optional(row["dec_deg"]),
+            major_axis=_optional(row["major_axis"]),
+            minor_axis=_optional(row["minor_axis"]),
+            position_angle=_optional(row["position_angle"]),
+        )
+
+
+def table_path(directory: str = DEFAULT_TABLE_DIRECTORY) -> str:
+    """
+    Returns the path of the table file for the installed PyOngc database version.
+    """
+    from pyongc import DBDATE
+
+    return os.path.join(
+        directory, f"catalog-coordinates-v{TABLE_FORMAT_VERSION}-{DBDATE}.npy"
+    )
+
+
+def build_coordinate_table(path: str) -> np.ndarray:
+    """
+    Builds the coordinate table from the PyOngc database and saves it as a .npy file.
+
+    The file is written under a temporary name and renamed, so workers building it at the
+    same time never read a partial file.
+
+    Args:
+        path (str): The destination of the .npy file.
+
+    Returns:
+        np.ndarray: The built table.
+    """
+    records = sorted(DsoSearcher.all_records(), key=lambda record: record.name)
+    data = np.zeros(len(records), dtype=COORDINATE_DTYPE)
+
+    for position, record in enumerate(records):
+        name = record.name.encode("utf-8")
+        label = (record.common_name or record.type).encode("utf-8")
+        if len(name) > COORDINATE_DTYPE["name"].itemsize:
+            raise ValueError(f"Object name {record.name} does not fit in the table")
+
+        data[position] = (
+            name,
+            label[: COORDINATE_DTYPE["label"].itemsize],
+            np.nan if record.ra_deg is None else record.ra_deg,
+            np.nan if record.dec_deg is None else record.dec_deg,
+            np.nan if record.major_axis is None else record.major_axis,
+            np.nan if record.minor_axis is None else record.minor_axis,
+            np.nan if record.position_angle is None else record.position_angle,
+        )
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as f:
+        np.save(f, data)
+    os.replace(temporary_path, path)
+
+    return data
+
+
+def load_coordinate_table(path: Optional[str] = None) -> CoordinateTable:
+    """
+    Opens the coordinate table memory-mapped, building it first if the file is missing.
+
+    Args:
+        path (str, optional): The .npy file. Defaults to table_path().
+
+    Returns:
+        CoordinateTable: The loaded table.
+    """
+    path = path or table_path()
+
+    if not os.path.exists(path):
+        build_coordinate_table(path)
+
+    return CoordinateTable(np.load(path, mmap_mode="r"))
+
+
+@lru_cache(maxsize=None)
+def get_coordinate_table() -> CoordinateTable:
+    """
+    Returns the process-wide coordinate table, loading it on first use.
+    """
+    return load_coordinate_table()
+
+
+if __name__ == "__main__":
+    destination = table_path()
+    table = build_coordinate_table(destination)
+    print(f"Wrote {len(table)} objects to {os.path.normpath(destination)}")
@@ -1,6 +1,13 @@
-from typing import List
+import sqlite3
+from contextlib import closing
+from typing import Iterable, List, Optional
 
-from pyongc.ongc import Dso, _queryFetchMany, _queryFetchOne
+from app.search.records import (
+    RECORD_COLUMNS,
+    RECORD_TABLES,
+    DsoRecord,
+    record_from_row,
+)
 
 
 class DsoSearcher:
@@ -32,6 +39,8 @@ class DsoSearcher:
             ngc_number = partial_name[3:].zfill(4)
             params += f' OR ((name LIKE "NGC{ngc_number}%" OR ngc LIKE "{ngc_number}%") AND type != "Dup")'
 
+        from pyongc.ongc import Dso, _queryFetchMany
+
         # Use the _queryFetchMany function to execute the query
         results = _queryFetchMany(cols, tables, params)
 
@@ -40,6 +49,134 @@ class DsoSearcher:
 
         return dso_objects
 
+    @staticmethod
+    def all_records() -> list[DsoRecord]:
+        """
+        Retrieves every non-duplicate object as a DsoRecord, in catalog order.
+
+        Returns:
+            list[DsoRecord]: The records of the objects table.
+        """
+        from pyongc.ongc import _queryFetchMany
+
+        results = _queryFetchMany(
+            RECORD_COLUMNS, RECORD_TABLES, 'objects.type != "Dup"', order="objects.id"
+        )
+
+        return [record_from_row(result) for result in results]
+
+    @staticmethod
+    def count_by_type() -> list[tuple[str, str, int]]:
+        """
+        Counts the objects of each type, duplicates included, with a single query.
+
+        Returns:
+            list[tuple]: The type code, its description and the number of objects, by code.
+        """
+        return _fetch_all(
+            f"SELECT objects.type, objTypes.typedesc, COUNT(*) FROM {RECORD_TABLES} "
+            "GROUP BY objects.type ORDER BY objects.type",
+            (),
+        )
+
+    @staticmethod
+    def search_records(
+        partial_name: str, limit: Optional[int] = None
+    ) -> list[DsoRecord]:
+        """
+        Searches for objects based on a partial name and returns them as DsoRecords.
+
+        Matches the same objects as `search`, but with a single parameterized query and
+        without building a Dso (and its extra query) for every row.
+
+        Args:
+            partial_name (str): The partial name to search for.
+            limit (int, optional): The maximum number of records to return.
+
+        Returns:
+            list[DsoRecord]: The matching records, in catalog order.
+        """
+        partial_name = partial_name.upper()
+        pattern = f"%{_escape_like(partial_name)}%"
+
+        conditions = [
+            "objects.name LIKE ? ESCAPE '\\'",
+            "objects.commonnames LIKE ? ESCAPE '\\'",
+        ]
+        parameters = [pattern, pattern]
+
+        # If the partial name is "M" or "NGC" followed by digits
+        if partial_name.startswith("M") and partial_name[1:].isdigit():
+            conditions.append("objects.messier = ?")
+            parameters.append(partial_name[1:].zfill(3))
+        elif partial_name.startswith("NGC") and partial_name[3:].isdigit():
+            ngc_number = partial_name[3:].zfill(4)
+            conditions.append("objects.name LIKE ?")
+            conditions.append("objects.ngc LIKE ?")
+            parameters.extend([f"NGC{ngc_number}%", f"{ngc_number}%"])
+
+        query = (
+            f"SELECT {RECORD_COLUMNS} FROM {RECORD_TABLES} "
+            f'WHERE objects.type != "Dup" AND ({" OR ".join(conditions)}) '
+            "ORDER BY objects.id"
+        )
+        if limit is not None:
+            query += " LIMIT ?"
+            parameters.append(limit)
+
+        return [record_from_row(row) for row in _fetch_all(query, parameters)]
+
+    @staticmethod
+    def get_many(names: Iterable[str]) -> dict[str, DsoRecord]:
+        """
+        Retrieves several objects by name or identifier with a single query.
+
+        Names are normalized like `Dso` does ('ngc224', 'NGC 224' and 'NGC0224' are the
+        same object), and Messier names and duplicate entries are resolved to their main
+        object.
+
+        Args:
+            names (Iterable[str]): The names or identifiers (ex.: 'NGC0224', 'PGC002557').
+
+        Returns:
+            dict[str, DsoRecord]: The records keyed by the requested name. Names that are
+            not in the catalog are left out.
+        """
+        identifiers = {name: _catalog_identifier(name) for name in set(names)}
+        messier_numbers = {
+            name: identifier
+            for name, (catalog, identifier) in identifiers.items()
+            if catalog == "Messier"
+        }
+
+        by_identifier = _fetch_by_identifier(
+            {
+                identifier
+                for catalog, identifier in identifiers.values()
+                if catalog != "Messier"
+            }
+        )
+        records = {
+            name: by_identifier[identifier]
+            for name, (catalog, identifier) in identifiers.items()
+            if catalog != "Messier" and identifier in by_identifier
+        }
+        if messier_numbers:
+            records.update(_fetch_by_messier(messier_numbers))
+
+        duplicates = {
+            name: record.ngc[0] if record.ngc else record.ic[0]
+            for name, record in records.items()
+            if record.type_code == "Dup" and (record.ngc or record.ic)
+        }
+        if duplicates:
+            main_records = _fetch_by_identifier(set(duplicates.values()))
+            for name, main_name in duplicates.items():
+                if main_name in main_records:
+                    records[name] = main_records[main_name]
+
+        return records
+
     @staticmethod
     def count_objects(omit_dupes: bool = True) -> int:
         """
@@ -61,6 +198,8 @@ class DsoSearcher:
             'type != "Dup"' if omit_dupes else "1 = 1"
         )  # ! We omit Duplicates if needed
 
+        from pyongc.ongc import _queryFetchOne
+
         # Use the _queryFetchOne function to execute the query
         count = _queryFetchOne(cols, tables, params)
 
@@ -78,4 +217,84 @@ class DsoSearcher:
         Returns:
             Dso: The Dso object corresponding to the given `object_id`.
         """
+        from pyongc.ongc import Dso
+
         return Dso(name=object_id).to_json()
+
+
+def _catalog_identifier(name: str) -> tuple[str, str]:
+    """
+    Normalizes a name like `Dso` does.
+
+    Returns:
+        tuple: The catalog and the identifier as stored in the database: ('Messier',
+        '031') for 'm31', ('NGC|IC', 'NGC0224') for 'ngc 224'. Names PyOngc does not
+        recognize are kept as given, with catalog None.
+    """
+    from pyongc.exceptions import UnknownIdentifier
+    from pyongc.ongc import _recognize_name
+
+    try:
+        return _recognize_name(name.strip().upper())
+    except UnknownIdentifier:
+        return None, name
+
+
+def _fetch_by_messier(numbers: dict[str, str]) -> dict[str, DsoRecord]:
+    """
+    Fetches the records of Messier numbers (ex.: '031'), keyed by the requested name.
+    """
+    placeholders = ", ".join("?" for _ in numbers)
+    query = (
+        f"SELECT {RECORD_COLUMNS} FROM {RECORD_TABLES} "
+        f'WHERE objects.messier IN ({placeholders}) AND objects.type != "Dup"'
+    )
+
+    records = [record_from_row(row) for row in _fetch_all(query, numbers.values())]
+    by_messier = {record.messier: record for record in records}
+
+    return {
+        name: by_messier[f"M{number}"]
+        for name, number in numbers.items()
+        if f"M{number}" in by_messier
+    }
+
+
+def _escape_like(text: str) -> str:
+    """
+    Escapes the LIKE wildcards of a user provided string.
+    """
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _fetch_all(query: str, parameters: Iterable) -> list[tuple]:
+    """
+    Runs a parameterized query against the read-only PyOngc database.
+    """
+    # pyongc is imported on first use: its __init__ alone pulls in pkg_resources
+    from pyongc import DBPATH
+
+    try:
+        db = sqlite3.connect(f"file:{DBPATH}?mode=ro", uri=True)
+    except sqlite3.Error:
+        raise OSError(f"There was a problem accessing database file at {DBPATH}")
+
+    with closing(db):
+        return db.execute(query, tuple(parameters)).fetchall()
+
+
+def _fetch_by_identifier(names: set[str]) -> dict[str, DsoRecord]:
+    """
+    Fetches the records whose identifiers are in names, keyed by identifier.
+    """
+    if not names:
+        return {}
+
+    placeholders = ", ".join("?" for _ in names)
+    query = (
+        f"SELECT {RECORD_COLUMNS}, objIdentifiers.identifier FROM {RECORD_TABLES} "
+        "JOIN objIdentifiers ON objects.name = objIdentifiers.name "
+        f"WHERE objIdentifiers.identifier IN ({placeholders})"
+    )
+
+    return {row[-1]: record_from_row(row[:-1]) for row in _fetch_all(query, names)}
@@ -0,0 +1,102 @@
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+# Columns needed to build a DsoRecord, in the order record_from_row expects them
+RECORD_COLUMNS = (
+    "objects.name, objects.type, objTypes.typedesc, objects.ra, objects.dec, "
+    "objects.majax, objects.minax, objects.pa, objects.messier, objects.ngc, "
+    "objects.ic, objects.commonnames"
+)
+RECORD_TABLES = "objects JOIN objTypes ON objects.type = objTypes.type"
+
+
+@dataclass(frozen=True, slots=True)
+class DsoRecord:
+    """
+    A compact, read-only view of one row of the OpenNGC objects table.
+
+    Attributes:
+        name (str): The main identifier of the object (ex.: 'NGC0224').
+        type (str): The description of the object type (ex.: 'Galaxy').
+        type_code (str): The OpenNGC type code (ex.: 'G').
+        ra_deg (float): The right ascension in degrees, or None if unknown.
+        dec_deg (float): The declination in degrees, or None if unknown.
+        major_axis (float): The major axis in arcminutes, or None if unknown.
+        minor_axis (float): The minor axis in arcminutes, or None if unknown.
+        position_angle (int): The position angle in degrees, or None if unknown.
+        messier (str): The Messier identifier (ex.: 'M031'), or None.
+        ngc (tuple[str]): The NGC cross identifiers.
+        ic (tuple[str]): The IC cross identifiers.
+        common_names (tuple[str]): The common names of the object.
+    """
+
+    name: str
+    type: str
+    type_code: str
+    ra_deg: Optional[float]
+    dec_deg: Optional[float]
+    major_axis: Optional[float]
+    minor_axis: Optional[float]
+    position_angle: Optional[int]
+    messier: Optional[str]
+    ngc: tuple
+    ic: tuple
+    common_names: tuple
+
+    @property
+    def common_name(self) -> str:
+        """
+        The first common name of the object, or an empty string if it has none.
+        """
+        return self.common_names[0] if self.common_names else ""
+
+
+def _split_identifiers(value: str, prefix: str = "") -> tuple:
+    """
+    Split a comma separated column of the objects table into a tuple of identifiers.
+    """
+    if not value:
+        return ()
+    return tuple(f"{prefix}{item.strip()}" for item in value.split(","))
+
+
+def record_from_row(row: tuple) -> DsoRecord:
+    """
+    Build a DsoRecord from a row selected with RECORD_COLUMNS.
+
+    Args:
+        row (tuple): The row as returned by sqlite3.
+
+    Returns:
+        DsoRecord: The record for the row.
+    """
+    (
+        name,
+        type_code,
+        type_description,
+        ra,
+        dec,
+        major_axis,
+        minor_axis,
+        position_angle,
+        messier,
+        ngc,
+        ic,
+        common_names,
+    ) = row
+
+    return DsoRecord(
+        name=name,
+        type=type_description,
+        type_code=type_code,
+        ra_deg=math.degrees(ra) if ra is not None else None,
+        dec_deg=math.degrees(dec) if dec is not None else None,
+        major_axis=major_axis,
+        minor_axis=minor_axis,
+        position_angle=position_angle,
+        messier=f"M{messier}" if messier else None,
+        ngc=_split_identifiers(ngc, "NGC"),
+        ic=_split_identifiers(ic, "IC"),
+        common_names=_split_identifiers(common_names),
+    )
@@ -0,0 +1,417 @@
+"""
+Precomputed visibility of the whole catalog for the sites most requests come from.
+
+For every configured site, night of the coming year and altitude threshold, the table
+holds the minute of the night each object first reaches the threshold. It is built by a
+batch job, for the sites of the [SITES] section of config.ini:
+
+    PYTHONPATH=src python -m app.search.visibility_table
+
+get_alt_az_at_degrees looks objects up here before scanning the night itself.
+"""
+
+import argparse
+import os
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+import numpy as np
+
+from app.search.coordinate_table import TABLE_FORMAT_VERSION, CoordinateTable
+from app.utils.night_window import HEIGHT_STEP_METERS, LATLON_DECIMALS
+
+if TYPE_CHECKING:
+    from astropy.coordinates import EarthLocation
+    from astropy.time import Time
+
+# Bump when the arrays saved below change so stale files are ignored
+VISIBILITY_FORMAT_VERSION = 2
+
+DEFAULT_THRESHOLDS = (5, 10, 20, 30)
+DEFAULT_DAYS = 366
+
+# The minute stored for an object that never reaches a threshold during a night
+NEVER = -1
+
+
+def coordinate_table_version() -> str:
+    """
+    Returns the version of the coordinate table the rows of a visibility table refer to:
+    its format and the PyOngc database date.
+    """
+    from pyongc import DBDATE
+
+    return f"{TABLE_FORMAT_VERSION}-{DBDATE}"
+
+
+def visibility_path(directory: str, site: str) -> str:
+    """
+    Returns the path of the visibility table of a site.
+    """
+    return os.path.join(
+        directory, f"visibility-v{VISIBILITY_FORMAT_VERSION}-{site}.npz"
+    )
+
+
+class TableHit(NamedTuple):
+    """
+    A lookup answered by a visibility table.
+
+    visible_time is None when the object never reaches the threshold that night.
+    """
+
+    visible_time: Optional["Time"]
+
+
+def _site_key(latitude: float, longitude: float, height: float) -> tuple:
+    # The bucketing of night_window_key: the same key means the same night window
+    return (
+        round(latitude, LATLON_DECIMALS),
+        round(longitude, LATLON_DECIMALS),
+        int(round(height / HEIGHT_STEP_METERS) * HEIGHT_STEP_METERS),
+    )
+
+
+class VisibilityTable:
+    """
+    The first visible minute of every catalog object, per night and threshold, at a site.
+
+    Attributes:
+        site (str): The name of the site.
+        location (tuple): Its latitude and longitude in degrees and height in meters.
+        coordinate_table_version (str): The coordinate_table_version the columns refer
+            to.
+        dates (np.ndarray): The observation dates (datetime64[D]), one per night.
+        night_start (np.ndarray): The start of each night in Unix seconds, NaN if none.
+        night_end (np.ndarray): The end of each night in Unix seconds, NaN if none.
+        first_minute (dict): Per threshold in degrees, an int16 (nights x catalog rows)
+            array with the minute after night_start each object first reaches it, or
+            NEVER.
+    """
+
+    def __init__(
+        self,
+        site: str,
+        location: tuple,
+        coordinate_table_version: str,
+        dates: np.ndarray,
+        night_start: np.ndarray,
+        night_end: np.ndarray,
+        first_minute: dict,
+    ) -> None:
+        self.site = site
+        self.location = tuple(float(value) for value in location)
+        self.coordinate_table_version = coordinate_table_version
+        self.dates = dates
+        self.night_start = night_start
+        self.night_end = night_end
+        self.first_minute = first_minute
+        self._site_key = _site_key(*self.location)
+
+    @classmethod
+    def load(cls, path: str) -> "VisibilityTable":
+        """
+        Reads a table written by save, decompressing it in memory.
+        """
+        with np.load(path) as data:
+            return cls(
+                site=str(data["site"]),
+                location=tuple(data["location"]),
+                coordinate_table_version=str(data["coordinate_table_version"]),
+                dates=data["dates"],
+                night_start=data["night_start"],
+                night_end=data["night_end"],
+                first_minute={
+                    int(threshold): data[f"first_minute_{threshold}"]
+                    for threshold in data["thresholds"]
+                },
+            )
+
+    def save(self, path: str) -> None:
+        """
+        Writes the table as a compressed .npz file, one array per column.
+
+        The file is written under a temporary name and renamed, so workers never read a
+        partial file.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as f:
+            np.savez_compressed(
+                f,
+                site=np.array(self.site),
+                location=np.array(self.location),
+                coordinate_table_version=np.array(self.coordinate_table_version),
+                dates=self.dates,
+                night_start=self.night_start,
+                night_end=self.night_end,
+                thresholds=np.array(sorted(self.first_minute), dtype=np.int16),
+                **{
+                    f"first_minute_{threshold}": minutes
+                    for threshold, minutes in self.first_minute.items()
+                },
+            )
+        os.replace(temporary_path, path)
+
+    def matches(self, location: "EarthLocation") -> bool:
+        """
+        Tells whether a location falls in the site, with the bucketing of the night windows.
+        """
+        import astropy.units as u
+
+        return self._site_key == _site_key(
+            float(location.lat.degree),
+            float(location.lon.degree),
+            float(location.height.to_value(u.m)),
+        )
+
+    def night(self, observation_date: np.datetime64) -> Optional[int]:
+        """
+        Returns the index of the night of an observation date, or None if not covered.
+        """
+        index = int((observation_date - self.dates[0]).astype(int))
+        if 0 <= index < len(self.dates):
+            return index
+        return None
+
+
+def _unix_time(seconds: float) -> "Time":
+    from astropy.time import Time
+
+    return Time(seconds, format="unix", scale="utc")
+
+
+class SiteVisibility:
+    """
+    The visibility tables loaded by the application, consulted before computing live.
+
+    The application attaches the tables of load_visibility_tables as .tables (empty: every
+    lookup misses).
+    """
+
+    def __init__(self) -> None:
+        self.tables: list[VisibilityTable] = []
+
+    def lookup(
+        self,
+        location: "EarthLocation",
+        observation_time: "Time",
+        min_degrees: float,
+        position: Optional[int],
+    ) -> Optional[TableHit]:
+        """
+        Looks up when an object first reaches min_degrees during a night.
+
+        Only nights searched from 00:00 UTC, like the calculation form does, are covered.
+        On a hit the night window is also stored in night_window_cache, so it is not
+        solved again for the same request.
+
+        Args:
+            location (EarthLocation): The observer's location.
+            observation_time (Time): The date of the observation, at 00:00 UTC.
+            min_degrees (float): The minimum altitude over the horizon in degrees.
+            position (int): The row of the object in the coordinate table.
+
+        Returns:
+            TableHit: The answer of a table, or None if no table covers the request.
+        """
+        if not self.tables or position is None or min_degrees != int(min_degrees):
+            return None
+
+        isot = observation_time.utc.isot
+        if not isot.endswith("T00:00:00.000"):
+            return None
+        observation_date = np.datetime64(isot[:10], "D")
+
+        for table in self.tables:
+            minutes = table.first_minute.get(int(min_degrees))
+            if minutes is None or not table.matches(location):
+                continue
+            night = table.night(observation_date)
+            if night is None or position >= minutes.shape[1]:
+                continue
+
+            night_start = table.night_start[night]
+            if not np.isfinite(night_start):
+                return TableHit(None)
+
+            self._remember_night_window(table, night, location, observation_time)
+
+            minute = int(minutes[night, position])
+            if minute == NEVER:
+                return TableHit(None)
+
+            return TableHit(_unix_time(night_start + minute * 60.0))
+
+        return None
+
+    @staticmethod
+    def _remember_night_window(table, night, location, observation_time) -> None:
+        from app.utils.night_window import night_window_cache, night_window_key
+
+        key = night_window_key(location, observation_time)
+        if night_window_cache.local.get(key) is None:
+            night_window_cache.local.set(
+                key,
+                (
+                    _unix_time(table.night_start[night]),
+                    _unix_time(table.night_end[night]),
+                ),
+            )
+
+
+site_visibility = SiteVisibility()
+
+
+def load_visibility_tables(directory: Optional[str]) -> list[VisibilityTable]:
+    """
+    Loads the visibility tables of a directory built for the installed catalog.
+
+    Args:
+        directory (str): The directory written by build_visibility_tables, or None.
+
+    Returns:
+        list[VisibilityTable]: The tables; files for another coordinate table version are
+        skipped.
+    """
+    if not directory or not os.path.isdir(directory):
+        return []
+
+    prefix = f"visibility-v{VISIBILITY_FORMAT_VERSION}-"
+    version = coordinate_table_version()
+    tables = []
+    for filename in sorted(os.listdir(directory)):
+        if filename.startswith(prefix) and filename.endswith(".npz"):
+            table = VisibilityTable.load(os.path.join(directory, filename))
+            if table.coordinate_table_version == version:
+                tables.append(table)
+    return tables
+
+
+def build_visibility_table(
+    site: str,
+    latitude: float,
+    longitude: float,
+    height: float,
+    start_date: date,
+    days: int = DEFAULT_DAYS,
+    thresholds=DEFAULT_THRESHOLDS,
+    table: Optional[CoordinateTable] = None,
+) -> VisibilityTable:
+    """
+    Computes the visibility table of a site, one batched pass over the catalog per night.
+
+    Nights are solved exactly as a live calculation solves them: the night window comes
+    from get_night_window and the minutes from the same one-minute grid (see
+    app.utils.tonight.first_visible_samples).
+
+    Args:
+        site (str): The name of the site.
+        latitude (float): The latitude in degrees.
+        longitude (float): The longitude in degrees.
+        height (float): The height in meters.
+        start_date (date): The first observation date.
+        days (int, optional): The number of nights.
+        thresholds (list[int], optional): The altitudes in degrees.
+        table (CoordinateTable, optional): The catalog. Defaults to get_coordinate_table().
+
+    Returns:
+        VisibilityTable: The table.
+    """
+    import astropy.units as u
+    from astropy.coordinates import EarthLocation
+    from astropy.time import Time
+
+    from app.search.coordinate_table import get_coordinate_table
+    from app.utils.night_window import get_night_window
+    from app.utils.tonight import first_visible_samples
+
+    table = table if table is not None else get_coordinate_table()
+    location = EarthLocation(
+        lat=latitude * u.deg, lon=longitude * u.deg, height=height * u.m
+    )
+
+    dates = np.datetime64(start_date, "D") + np.arange(days)
+    night_start = np.full(days, np.nan)
+    night_end = np.full(days, np.nan)
+    first_minute = np.full((len(thresholds), days, len(table)), NEVER, dtype=np.int16)
+
+    for night, observation_date in enumerate(dates.astype(datetime)):
+        observation_time = Time(
+            datetime.combine(observation_date, datetime.min.time()), scale="utc"
+        )
+        start_time, dawn_time = get_night_window(location, observation_time)
+        if start_time.masked or dawn_time.masked:
+            continue
+
+        night_start[night] = start_time.unix
+        night_end[night] = dawn_time.unix
+
+        samples = first_visible_samples(
+            table, location, start_time, dawn_time, thresholds
+        )
+        # One sample per minute, so the sample index is the minute of the night
+        first_minute[:, night, samples["position"]] = samples["first_visible"]
+
+    return VisibilityTable(
+        site=site,
+        location=(latitude, longitude, height),
+        coordinate_table_version=coordinate_table_version(),
+        dates=dates,
+        night_start=night_start,
+        night_end=night_end,
+        first_minute={
+            int(threshold): first_minute[index]
+            for index, threshold in enumerate(thresholds)
+        },
+    )
+
+
+def main():
+    from app.utils.iers_data import configure_iers
+    from app.utils.settings import load_config
+
+    config = load_config()
+    settings = config["VISIBILITY"]
+    # Solve the nights with the same Earth orientation data as the application
+    configure_iers(config["IERS"]["mode"], config["IERS"]["data_dir"])
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--start",
+        type=date.fromisoformat,
+        default=date.today(),
+        help="first night, YYYY-MM-DD (default: today)",
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=settings["days"],
+        help="nights per site (default: %(default)s)",
+    )
+    parser.add_argument("--site", action="append", help="only build these sites")
+    args = parser.parse_args()
+
+    if not settings["directory"]:
+        parser.error("DIRECTORY is not set in the [VISIBILITY] section of config.ini")
+
+    for site, (latitude, longitude, height) in settings["sites"].items():
+        if args.site and site not in args.site:
+            continue
+        table = build_visibility_table(
+            site,
+            latitude,
+            longitude,
+            height,
+            args.start,
+            args.days,
+            settings["thresholds"],
+        )
+        path = visibility_path(settings["directory"], site)
+        table.save(path)
+        end = args.start + timedelta(days=args.days - 1)
+        print(f"Wrote {site} ({args.start} to {end}) to {os.path.normpath(path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,12 @@
-import json
 from datetime import datetime, timedelta
 
-import astropy.units as u
-import pytz
-from astroplan import Observer
-from astropy.coordinates import AltAz, SkyCoord
-from astropy.time import Time, TimeDelta
+import numpy as np
 
+from app.search.coordinate_table import get_coordinate_table
 from app.search.dsosearcher import DsoSearcher
+from app.search.visibility_table import site_visibility
+from app.utils.metrics import metrics
+from app.utils.night_window import get_night_window
 
 
 def get_alt_az_at_degrees(
@@ -16,10 +15,36 @@ def get_alt_az_at_degrees(
     dec: object,
     observation_datetime: object,
     min_degrees: object,
+    refine: bool = False,
+    object_id: str = None,
 ) -> object:
-    # Initialize the observer
+    """
+    Find the first moment of the astronomical night when an object reaches a given altitude.
+
+    The whole night is sampled on a one-minute grid which is transformed to AltAz in a
+    single vectorized call, so the cost no longer grows with the number of steps.
+
+    Parameters:
+    - location (EarthLocation): The observer's location.
+    - ra (float): The right ascension of the object in degrees.
+    - dec (float): The declination of the object in degrees.
+    - observation_datetime (datetime | Time): The date of the observation.
+    - min_degrees (float): The minimum altitude over the horizon in degrees.
+    - refine (bool, optional): If True, interpolate the crossing between the two grid samples
+      that bracket it instead of returning the first grid sample. Default is False.
+    - object_id (str, optional): The ID of the object. When given, the precomputed visibility
+      tables (see app.search.visibility_table) are consulted before scanning the night.
 
-    observer = Observer(location=location)
+    Returns:
+    - altaz (AltAz): The altitude and azimuth of the object when it becomes visible, or None.
+    - error_message (str): An error message if the object never reaches min_degrees, or None.
+    - visible_time (datetime): The UTC time when the object becomes visible, or None.
+    """
+    # astropy is imported on first use (see warm_up)
+    import astropy.units as u
+    import pytz
+    from astropy.coordinates import AltAz, SkyCoord
+    from astropy.time import Time
 
     if isinstance(observation_datetime, datetime):
         observation_datetime.replace(tzinfo=pytz.UTC)
@@ -27,31 +52,66 @@ def get_alt_az_at_degrees(
     # Convert observation_datetime to Time object
     observation_time = Time(observation_datetime)
 
-    # Get astronomical night start and end times
-    start_time = observer.twilight_evening_astronomical(observation_time, which="next")
-    next_day = observation_time + TimeDelta(1, format="jd")
-    dawn_time = observer.twilight_morning_astronomical(next_day, which="nearest")
-
     # Target object (RA is already in degrees, so we directly use it)
     target = SkyCoord(ra=ra * u.deg, dec=dec * u.deg)
 
-    # Initialize time_step and current_time
-    time_step = TimeDelta(60, format="sec")  # 1-minute time step
-    current_time = start_time
-
-    observation_date_str = None
-
-    while current_time < dawn_time:
-        # Transform target to AltAz coordinates
-        target_altaz: AltAz = target.transform_to(
-            AltAz(obstime=current_time, location=location)
+    hit = None
+    if object_id is not None and not refine and site_visibility.tables:
+        hit = site_visibility.lookup(
+            location, observation_time, min_degrees, _table_position(object_id)
+        )
+        metrics.inc(
+            "astro_visibility_table_lookups_total",
+            result="miss" if hit is None else "hit",
         )
 
-        if target_altaz.alt >= min_degrees * u.deg:
-            return target_altaz, None, current_time.datetime
+    if hit is not None:
+        if hit.visible_time is not None:
+            metrics.inc("astro_transforms_total")
+            metrics.inc("astro_transform_samples_total")
+            target_altaz = target.transform_to(
+                AltAz(obstime=hit.visible_time, location=location)
+            )
+            return target_altaz, None, hit.visible_time.datetime
+        time_grid = []
+    else:
+        # Get astronomical night start and end times (cached per site and date)
+        start_time, dawn_time = get_night_window(location, observation_time)
+
+        # Build the whole night as one-minute samples and transform them at once
+        time_grid = night_time_grid(start_time, dawn_time)
+
+    if len(time_grid) > 0:
+        metrics.inc("astro_transforms_total")
+        metrics.inc("astro_transform_samples_total", len(time_grid))
+        metrics.inc("astro_scan_samples_total", len(time_grid))
+        grid_altaz: AltAz = target.transform_to(
+            AltAz(obstime=time_grid, location=location)
+        )
+        altitudes = grid_altaz.alt.degree
+        above = np.flatnonzero(altitudes >= min_degrees)
+
+        if above.size > 0:
+            index = above[0]
+
+            if refine and index > 0:
+                visible_time = refine_crossing_time(
+                    time_grid[index - 1],
+                    time_grid[index],
+                    altitudes[index - 1],
+                    altitudes[index],
+                    min_degrees,
+                )
+                metrics.inc("astro_transforms_total")
+                metrics.inc("astro_transform_samples_total")
+                target_altaz = target.transform_to(
+                    AltAz(obstime=visible_time, location=location)
+                )
+                return target_altaz, None, visible_time.datetime
+
+            return grid_altaz[index], None, time_grid[index].datetime
 
-        # Increment time
-        current_time += time_step
+    observation_date_str = None
 
     # If observation_datetime is a Python datetime object
     if isinstance(observation_datetime, datetime):
@@ -68,8 +128,93 @@ def get_alt_az_at_degrees(
     )
 
 
-def count_dso():
-    return DsoSearcher.count_objects()
+def night_time_grid(start_time, end_time, step_seconds=60):
+    """
+    Build the sampling grid used to scan a night for visibility.
+
+    Parameters:
+    - start_time (Time): The first sample of the grid.
+    - end_time (Time): The end of the night; samples at or after it are excluded.
+    - step_seconds (float, optional): The distance between samples in seconds. Default is 60.
+
+    Returns:
+    - time_grid (Time): An array Time with the samples, empty if there is no astronomical
+      night (masked start or end, as astroplan returns them in polar summer) or it has
+      no length.
+    """
+    from astropy.time import Time, TimeDelta
+
+    # Subtracting masked times raises, so a missing night is caught before
+    if start_time.masked or end_time.masked:
+        return Time(np.empty(0), format="jd", scale="utc")
+
+    night_seconds = (end_time - start_time).sec
+
+    if not np.isfinite(night_seconds) or night_seconds <= 0:
+        return start_time + TimeDelta(np.empty(0), format="sec")
+
+    offsets = np.arange(0, night_seconds, step_seconds)
+
+    return start_time + TimeDelta(offsets, format="sec")
+
+
+def refine_crossing_time(before_time, after_time, before_alt, after_alt, min_degrees):
+    """
+    Linearly interpolate the time when the altitude crosses min_degrees between two samples.
+
+    Parameters:
+    - before_time (Time): The last sample below min_degrees.
+    - after_time (Time): The first sample at or above min_degrees.
+    - before_alt (float): The altitude in degrees at before_time.
+    - after_alt (float): The altitude in degrees at after_time.
+    - min_degrees (float): The altitude to cross in degrees.
+
+    Returns:
+    - crossing_time (Time): The interpolated crossing time.
+    """
+    altitude_change = after_alt - before_alt
+
+    if altitude_change <= 0:
+        return after_time
+
+    fraction = (min_degrees - before_alt) / altitude_change
+
+    return before_time + (after_time - before_time) * float(np.clip(fraction, 0, 1))
+
+
+def _table_position(object_id):
+    """
+    Find the row of an object in the coordinate table, resolving names like get_object_data.
+    """
+    coordinate_table = get_coordinate_table()
+    position = coordinate_table.position(object_id)
+
+    if position is None:
+        resolved = DsoSearcher.get_many([object_id]).get(object_id)
+        if resolved is not None:
+            position = coordinate_table.position(resolved.name)
+
+    return position
+
+
+def warm_up():
+    """
+    Do once, at boot, the work the first calculation would otherwise pay for.
+
+    Imports astropy and astroplan, loads the Earth orientation (IERS) and leap second
+    tables and runs one AltAz transform and one twilight search. Called before gunicorn
+    forks its workers (see create_app), so they all share the result.
+    """
+    import astropy.units as u
+    from astropy.coordinates import EarthLocation
+    from astropy.time import Time
+    from astropy.utils import iers
+
+    iers.earth_orientation_table.get()
+
+    location = EarthLocation(lat=0 * u.deg, lon=0 * u.deg)
+    observation_time = Time.now()
+    get_alt_az_at_degrees(location, 0.0, 0.0, observation_time, 0)
 
 
 def get_object_data(object_id):
@@ -88,35 +233,40 @@ def get_object_data(object_id):
     - pa (float): The position angle of the object.
     - error_message (str): An error message if the object ID is not found or if size data is missing.
     """
-    result_json = DsoSearcher.get(object_id)
-
-    if result_json is None:
-        return None, None, None, None, None, None, f"Object {object_id} not found"
-
-    # Parsing the JSON string into a dictionary
-    result = json.loads(result_json)
+    coordinate_table = get_coordinate_table()
+    record = coordinate_table.get(object_id)
 
-    ra_hms = result["coordinates"]["right ascension"]
-    dec_dms = result["coordinates"]["declination"]
+    if record is None:
+        # Not a main name (ex.: 'M31'), resolve it through the identifiers table
+        resolved = DsoSearcher.get_many([object_id]).get(object_id)
+        if resolved is not None:
+            record = coordinate_table.get(resolved.name)
 
-    # Create a SkyCoord object using the HMS and DMS values
-    coord = SkyCoord(ra=ra_hms, dec=dec_dms, unit=(u.hourangle, u.deg))
+    if record is None:
+        return None, None, None, None, None, None, f"Object {object_id} not found"
 
-    ra = coord.ra.deg
-    dec = coord.dec.deg
+    if record.ra_deg is None or record.dec_deg is None:
+        return (
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            f"Coordinates are missing for {object_id}",
+        )
 
-    # Find the common name among the identifiers
-    other_identifiers = result.get("other identifiers", {})
-    common_names = other_identifiers.get("common names", [result["type"]])
-    common_name = common_names[0] if common_names else result["type"]
+    ra = record.ra_deg
+    dec = record.dec_deg
 
-    object_name = f"{result['name']} ({common_name})"
+    # The label is the first common name, or the object type if it has none
+    object_name = f"{record.name} ({record.label})"
 
     object_id = f"{object_id}"
 
-    size_major = result["dimensions"]["major axis"]
-    size_minor = result["dimensions"]["minor axis"]
-    pa = result["dimensions"]["position angle"]
+    size_major = record.major_axis
+    size_minor = record.minor_axis
+    pa = record.position_angle
 
     if pa is None:
         pa = 0
@@ -150,6 +300,10 @@ def get_alt_az(location, ra, dec, utc_datetime=None, min_altitude=0, min_speed=0
     Returns:
     - altaz (AltAz): The altitude and azimuth of the celestial object at the specified time and location.
     """
+    import astropy.units as u
+    from astropy.coordinates import AltAz, SkyCoord
+    from astropy.time import Time
+
     if utc_datetime is None:
         utc_datetime = datetime.utcnow()
     obj = SkyCoord(ra=ra, dec=dec, unit=(u.hourangle, u.deg))
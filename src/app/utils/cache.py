@@ -0,0 +1,467 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+_MISSING = object()
+
+
+def shared_connection(
+    local: threading.local, path: str, timeout: float = 5
+) -> sqlite3.Connection:
+    """
+    Returns the connection of this process and thread to a SQLite file shared by the
+    workers, opening it in WAL mode if needed.
+
+    Connections must not cross a fork, so they are kept per process and thread in local.
+
+    Args:
+        local (threading.local): Where the connection of each thread is kept.
+        path (str): The SQLite file. Its directory is created if needed.
+        timeout (float, optional): The seconds to wait for a lock held by another worker.
+
+    Returns:
+        sqlite3.Connection: The connection.
+
+    Raises:
+        sqlite3.Error: If the file cannot be opened.
+        OSError: If its directory cannot be created.
+    """
+    connection, pid = getattr(local, "connection", (None, None))
+    if connection is None or pid != os.getpid():
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        connection = sqlite3.connect(path, timeout=timeout)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        local.connection = (connection, os.getpid())
+    return connection
+
+
+class LRUCache:
+    """
+    A thread-safe, size-bounded LRU cache with an optional time to live.
+
+    Attributes:
+        maxsize (int): The maximum number of entries kept.
+        ttl (float): The number of seconds an entry stays valid, or None to keep it until it
+            is evicted.
+        hits (int): The number of lookups answered from the cache.
+        misses (int): The number of lookups that were not in the cache or had expired.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        ttl: Optional[float] = None,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initializes an empty cache.
+
+        Args:
+            maxsize (int): The maximum number of entries kept.
+            ttl (float, optional): The number of seconds an entry stays valid.
+            timer (Callable, optional): The clock used for expiry. Defaults to time.monotonic.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._timer = timer
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Retrieves a value and marks it as recently used.
+
+        Args:
+            key (Hashable): The key to look up.
+            default (Any, optional): The value returned when the key is missing or expired.
+
+        Returns:
+            Any: The cached value, or default.
+        """
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if expires_at is None or expires_at > self._timer():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Stores a value, evicting the least recently used entries if the cache is full.
+
+        Args:
+            key (Hashable): The key to store the value under.
+            value (Any): The value to store.
+        """
+        expires_at = None if self.ttl is None else self._timer() + self.ttl
+
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Retrieves a value, computing and storing it on a miss.
+
+        The computation runs outside the lock, so two threads missing the same key at the
+        same time may both compute it.
+
+        Args:
+            key (Hashable): The key to look up.
+            compute (Callable): A function without arguments that returns the value.
+
+        Returns:
+            Any: The cached or computed value.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def clear(self) -> None:
+        """
+        Removes every entry and resets the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns the counters of the cache.
+
+        Returns:
+            dict: The hits, misses, current size and maximum size.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+
+class SQLiteCache:
+    """
+    A size-bounded LRU cache with an optional time to live, stored in a SQLite file.
+
+    Every process (gunicorn worker) that opens the same file shares the entries. Values are
+    pickled, keys are stored by their repr, so they must be built from plain values
+    (strings, numbers, None, tuples). The counters are per process.
+
+    Any SQLite or file system error (for example a lock held for too long by another
+    worker, or a read-only directory) is treated as a miss, so the cache never fails a
+    request: a cache that cannot be opened behaves as an empty one that stores nothing.
+
+    Attributes:
+        path (str): The SQLite file.
+        maxsize (int): The maximum number of entries kept.
+        ttl (float): The number of seconds an entry stays valid, or None to keep it until it
+            is evicted.
+        hits (int): The number of lookups answered from the cache.
+        misses (int): The number of lookups that were not in the cache or had expired.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        maxsize: int = 1024,
+        ttl: Optional[float] = None,
+        timer: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Initializes the cache, creating the file if needed.
+
+        Args:
+            path (str): The SQLite file.
+            maxsize (int): The maximum number of entries kept.
+            ttl (float, optional): The number of seconds an entry stays valid.
+            timer (Callable, optional): The clock used for expiry and recency. It is shared
+                by several processes, so it must be a wall clock. Defaults to time.time.
+        """
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._timer = timer
+        self._local = threading.local()
+
+        try:
+            with self._connection() as connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS entries ("
+                    "key TEXT PRIMARY KEY, value BLOB, expires_at REAL, used_at REAL)"
+                )
+                connection.execute(
+                    "CREATE INDEX IF NOT EXISTS entries_used_at ON entries (used_at)"
+                )
+        except (sqlite3.Error, OSError):
+            pass
+
+    def _connection(self) -> sqlite3.Connection:
+        return shared_connection(self._local, self.path, timeout=5)
+
+    def __len__(self) -> int:
+        try:
+            return (
+                self._connection().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            )
+        except (sqlite3.Error, OSError):
+            return 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Retrieves a value and marks it as recently used.
+
+        Args:
+            key (Hashable): The key to look up.
+            default (Any, optional): The value returned when the key is missing or expired.
+
+        Returns:
+            Any: The cached value, or default.
+        """
+        now = self._timer()
+
+        try:
+            with self._connection() as connection:
+                row = connection.execute(
+                    "SELECT value, expires_at FROM entries WHERE key = ?", (repr(key),)
+                ).fetchone()
+
+                if row is not None and (row[1] is None or row[1] > now):
+                    connection.execute(
+                        "UPDATE entries SET used_at = ? WHERE key = ?", (now, repr(key))
+                    )
+                    value = pickle.loads(row[0])
+                    self.hits += 1
+                    return value
+        except (sqlite3.Error, OSError):
+            pass
+
+        self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Stores a value, evicting the least recently used entries if the cache is full.
+
+        Args:
+            key (Hashable): The key to store the value under.
+            value (Any): The value to store. It must be picklable.
+        """
+        now = self._timer()
+        expires_at = None if self.ttl is None else now + self.ttl
+
+        try:
+            with self._connection() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, expires_at, used_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (repr(key), pickle.dumps(value), expires_at, now),
+                )
+                connection.execute(
+                    "DELETE FROM entries WHERE key IN ("
+                    "SELECT key FROM entries ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                    (self.maxsize,),
+                )
+        except (sqlite3.Error, OSError):
+            pass
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Retrieves a value, computing and storing it on a miss.
+
+        Args:
+            key (Hashable): The key to look up.
+            compute (Callable): A function without arguments that returns the value.
+
+        Returns:
+            Any: The cached or computed value.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def clear(self) -> None:
+        """
+        Removes every entry and resets the counters of this process.
+        """
+        try:
+            with self._connection() as connection:
+                connection.execute("DELETE FROM entries")
+        except (sqlite3.Error, OSError):
+            pass
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns the counters of the cache.
+
+        Returns:
+            dict: The hits and misses of this process, the current size and maximum size.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self),
+            "maxsize": self.maxsize,
+        }
+
+
+class TieredCache:
+    """
+    An in-process cache in front of an optional cache shared by every worker.
+
+    Lookups try the local cache first, then the shared one (copying hits to the local
+    cache); computed values are stored in both. The shared cache can be attached after
+    creation, once the configuration is loaded.
+
+    Attributes:
+        local (LRUCache): The in-process cache.
+        shared (SQLiteCache): The shared cache, or None to use the local cache alone.
+        namespace (str): A prefix for the keys in the shared cache, so several tiered
+            caches can use the same file.
+    """
+
+    def __init__(self, local: LRUCache, shared=None, namespace: str = "") -> None:
+        """
+        Initializes the cache.
+
+        Args:
+            local (LRUCache): The in-process cache.
+            shared (SQLiteCache, optional): The shared cache.
+            namespace (str, optional): A prefix for the keys in the shared cache.
+        """
+        self.local = local
+        self.shared = shared
+        self.namespace = namespace
+
+    def __len__(self) -> int:
+        return len(self.local)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Retrieves a value from the local cache or, failing that, from the shared cache.
+
+        Args:
+            key (Hashable): The key to look up.
+            default (Any, optional): The value returned when the key is missing or expired.
+
+        Returns:
+            Any: The cached value, or default.
+        """
+        value = self.local.get(key, _MISSING)
+        if value is _MISSING and self.shared is not None:
+            value = self.shared.get((self.namespace, key), _MISSING)
+            if value is not _MISSING:
+                self.local.set(key, value)
+        return default if value is _MISSING else value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Stores a value in both caches.
+
+        Args:
+            key (Hashable): The key to store the value under.
+            value (Any): The value to store.
+        """
+        self.local.set(key, value)
+        if self.shared is not None:
+            self.shared.set((self.namespace, key), value)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Retrieves a value, computing and storing it on a miss in both caches.
+
+        Args:
+            key (Hashable): The key to look up.
+            compute (Callable): A function without arguments that returns the value.
+
+        Returns:
+            Any: The cached or computed value.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def clear(self) -> None:
+        """
+        Removes every local entry and resets the local counters. The shared cache is left
+        alone, since other workers use it.
+        """
+        self.local.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns the counters of the local cache, and those of the shared cache under
+        "shared" when there is one.
+        """
+        stats = self.local.stats()
+        if self.shared is not None:
+            stats["shared"] = self.shared.stats()
+        return stats
+
+
+CACHE_BACKENDS = ("memory", "sqlite", "tiered")
+
+
+def create_cache(
+    backend: str = "memory",
+    maxsize: int = 128,
+    ttl: Optional[float] = None,
+    path: Optional[str] = None,
+):
+    """
+    Creates a cache for one of CACHE_BACKENDS.
+
+    Args:
+        backend (str): "memory" for a per-process LRUCache, "sqlite" for a SQLiteCache shared
+            by every process using the same path, "tiered" for an LRUCache in front of such
+            a SQLiteCache.
+        maxsize (int): The maximum number of entries kept.
+        ttl (float, optional): The number of seconds an entry stays valid.
+        path (str, optional): The SQLite file, required by the "sqlite" and "tiered"
+            backends.
+
+    Returns:
+        LRUCache | SQLiteCache | TieredCache: The cache.
+    """
+    if backend == "memory":
+        return LRUCache(maxsize=maxsize, ttl=ttl)
+    if backend in ("sqlite", "tiered"):
+        if not path:
+            raise ValueError(f"The {backend} cache backend needs a path")
+        shared = SQLiteCache(path, maxsize=maxsize, ttl=ttl)
+        if backend == "sqlite":
+            return shared
+        return TieredCache(LRUCache(maxsize=maxsize, ttl=ttl), shared)
+    raise ValueError(
+        f"Unknown cache backend {backend!r}, expected one of {CACHE_BACKENDS}"
+    )
@@ -1,13 +1,41 @@
 from datetime import datetime, date
-from typing import Any
+from typing import TYPE_CHECKING, Any, Optional
 
-import astropy.units as u
-from astropy.coordinates import Angle
-from astropy.coordinates import EarthLocation
-from astropy.time import Time
+import numpy as np
 from dateutil import tz
 
 from app.utils.astro_utils import get_alt_az_at_degrees
+from app.utils.drift import propagate_altaz
+from app.utils.metrics import metrics
+from app.utils.night_window import get_night_window
+
+if TYPE_CHECKING:
+    from astropy.coordinates import EarthLocation
+    from astropy.time import Time
+
+# Calculation cache keys: 0.0001 degrees is about 10 m, far below what changes a result
+# shown with two decimals; heights are bucketed to 10 m and other numbers to 6 decimals.
+KEY_LATLON_DECIMALS = 4
+KEY_HEIGHT_STEP_METERS = 10
+KEY_DECIMALS = 6
+
+# The form fields perform_astro_calculations depends on
+CALCULATION_KEY_FIELDS = (
+    "object_id",
+    "latitude",
+    "longitude",
+    "altitude",
+    "observation_date",
+    "sensor_width_mm",
+    "sensor_height_mm",
+    "number_of_pixels_in_width",
+    "number_of_pixels_in_height",
+    "focal_length",
+    "aperture",
+    "shoot_interval",
+    "camera_position",
+    "min_degrees",
+)
 
 
 def format_altaz_datetime(ra, dec, altaz_obj, observation_datetime) -> str:
@@ -24,6 +52,8 @@ def format_altaz_datetime(ra, dec, altaz_obj, observation_datetime) -> str:
     Returns:
         str: A formatted string containing the right ascension, declination, altitude, azimuth, and observation datetime.
     """
+    from astropy.coordinates import Angle
+
     # Convert RA from degrees to hours
     ra_hours = ra / 15
 
@@ -39,11 +69,135 @@ def format_altaz_datetime(ra, dec, altaz_obj, observation_datetime) -> str:
     alt_str = f"{alt:0.2f}"
     az_str = f"{az:0.2f}"
 
-    formatted_datetime = observation_datetime.strftime("%Y-%m-%dT%H:%M") + "Z"
+    formatted_datetime = format_utc_minutes(observation_datetime)
 
     return f"<span>RA: {ra_angle.to_string(sep=':', pad=True)} Dec: {dec_angle.to_string(sep=':', pad=True, alwayssign=True)} | Alt: {alt_str} Az: {az_str} </span><span> Visible at: {formatted_datetime}</span>"
 
 
+def build_location(form_data) -> "EarthLocation":
+    """
+    Build the observer's location from the latitude, longitude and optional altitude of a form.
+
+    Parameters:
+        form_data (dict): A dictionary containing the form data.
+
+    Returns:
+        EarthLocation: The observer's location.
+    """
+    import astropy.units as u
+    from astropy.coordinates import EarthLocation
+
+    altitude = form_data.get("altitude")
+
+    if altitude is not None:
+        return EarthLocation(
+            lat=form_data["latitude"] * u.deg,
+            lon=form_data["longitude"] * u.deg,
+            height=altitude * u.m,
+        )
+
+    return EarthLocation(
+        lat=form_data["latitude"] * u.deg, lon=form_data["longitude"] * u.deg
+    )
+
+
+def observation_time_from_date(observation_date) -> "Time":
+    """
+    Convert the observation date of a form into an astropy Time at 00:00 UTC.
+
+    Parameters:
+        observation_date (date | datetime): The observation date.
+
+    Returns:
+        Time: The observation time in UTC.
+    """
+    from astropy.time import Time
+
+    # Asegurarse de que observation_date es un objeto datetime.datetime
+    if isinstance(observation_date, date) and not isinstance(
+        observation_date, datetime
+    ):
+        observation_datetime = datetime.combine(observation_date, datetime.min.time())
+    else:
+        observation_datetime = observation_date
+
+    # Establecer la zona horaria del objeto datetime a UTC
+    utc_timezone = tz.tzutc()
+    return Time(observation_datetime.replace(tzinfo=utc_timezone))
+
+
+def format_utc_minutes(value: datetime) -> str:
+    """
+    Format a UTC datetime to the minute, like the result page does (ex.: 2023-10-15T21:04Z).
+    """
+    return value.strftime("%Y-%m-%dT%H:%M") + "Z"
+
+
+def visible_until(altaz, location, dawn_time, min_degrees, step_seconds=60):
+    """
+    Find when an object that became visible at altaz sinks back below min_degrees.
+
+    Parameters:
+        altaz (AltAz): The position of the object when it becomes visible.
+        location (EarthLocation): The observer's location.
+        dawn_time (Time): The end of the night.
+        min_degrees (float): The minimum altitude over the horizon in degrees.
+        step_seconds (float, optional): The resolution of the search in seconds.
+
+    Returns:
+        Time: The first sample below min_degrees, or dawn_time if it stays above it.
+    """
+    from astropy.time import TimeDelta
+
+    offsets = np.arange(0, (dawn_time - altaz.obstime).sec, step_seconds)
+    alt, _ = propagate_altaz(
+        altaz.alt.degree, altaz.az.degree, location.lat.degree, offsets
+    )
+    below = np.flatnonzero(alt < min_degrees)
+
+    if below.size == 0:
+        return dawn_time
+
+    return altaz.obstime + TimeDelta(offsets[below[0]], format="sec")
+
+
+def _quantize(value, decimals=KEY_DECIMALS):
+    if isinstance(value, float):
+        return round(value, decimals)
+    return value
+
+
+def calculation_cache_key(form_data) -> tuple:
+    """
+    Build the cache key of a calculation: the form fields it depends on, normalized.
+
+    Parameters:
+        form_data (dict): A dictionary containing the form data.
+
+    Returns:
+        tuple: A tuple of plain values, equal for submissions that give the same result.
+    """
+    key = []
+    for field_name in CALCULATION_KEY_FIELDS:
+        value = form_data.get(field_name)
+
+        if field_name == "object_id":
+            # Not upper-cased: get_object_data tells 'ngc0224' and 'NGC0224' apart
+            value = (value or "").strip()
+        elif field_name in ("latitude", "longitude") and value is not None:
+            value = round(float(value), KEY_LATLON_DECIMALS)
+        elif field_name == "altitude" and value is not None:
+            value = int(round(value / KEY_HEIGHT_STEP_METERS) * KEY_HEIGHT_STEP_METERS)
+        elif isinstance(value, date):
+            value = value.isoformat()
+        else:
+            value = _quantize(value)
+
+        key.append(value)
+
+    return tuple(key)
+
+
 def perform_astro_calculations(
     form_data,
     calculate_camera_fov,
@@ -51,6 +205,7 @@ def perform_astro_calculations(
     calculate_max_shooting_time,
     calculate_number_of_shoots,
     route,
+    result_cache: Optional[Any] = None,
 ) -> dict[str, Any]:
     """
     Perform astronomical calculations based on the given form data.
@@ -62,58 +217,88 @@ def perform_astro_calculations(
         calculate_max_shooting_time (function): A function for calculating the maximum shooting time.
         calculate_number_of_shoots (function): A function for calculating the number of shoots.
         route (str): The route parameter.
+        result_cache (LRUCache | SQLiteCache, optional): A cache of results keyed by
+            calculation_cache_key. Repeated submissions are answered from it; results
+            with an error are not stored.
 
     Returns:
         dict: A dictionary containing the calculated results and other relevant information.
     """
+    if result_cache is None:
+        return _calculate(
+            form_data,
+            calculate_camera_fov,
+            get_object_data,
+            calculate_max_shooting_time,
+            calculate_number_of_shoots,
+            route,
+        )
+
+    key = calculation_cache_key(form_data)
+    result = result_cache.get(key)
+    metrics.inc(
+        "astro_result_cache_lookups_total", result="miss" if result is None else "hit"
+    )
+
+    if result is None:
+        result = _calculate(
+            form_data,
+            calculate_camera_fov,
+            get_object_data,
+            calculate_max_shooting_time,
+            calculate_number_of_shoots,
+            route,
+        )
+        # Errors are not cached: a fixed catalog or form must not keep returning them
+        if not result.get("error"):
+            result_cache.set(key, result)
+
+    if result.get("error"):
+        return dict(result)
+
+    # The cached result may come from a submission with a slightly different altitude
+    return {**result, "altitude": form_data["altitude"], "route": route}
+
+
+def _visible_object(form_data, get_object_data) -> dict[str, Any]:
+    """
+    Look up the object of a form and find when it first reaches min_degrees.
+
+    Returns:
+        dict: An "error", or the object data, the location, its "altaz" and
+        "visible_time" when it becomes visible, the night ("night_start", "night_end")
+        and "min_degrees".
+    """
     object_id = form_data["object_id"]
-    ra, dec, size_major, size_minor, object_name, pa, error = get_object_data(object_id)
+    with metrics.stage("object_data"):
+        ra, dec, size_major, size_minor, object_name, pa, error = get_object_data(
+            object_id
+        )
 
     if error:
         return {"error": error}
 
-    altitude = form_data["altitude"]
-
-    if altitude is not None:
-        location = EarthLocation(
-            lat=form_data["latitude"] * u.deg,
-            lon=form_data["longitude"] * u.deg,
-            height=altitude * u.m,
-        )
-    else:
-        location = EarthLocation(
-            lat=form_data["latitude"] * u.deg, lon=form_data["longitude"] * u.deg
-        )
+    location = build_location(form_data)
 
     # Retrieve observation_date as a datetime.date object
     observation_date = form_data.get("observation_date")
     if observation_date is None:
         return {"error": "Observation date is missing from the form data."}
 
-    # Asegurarse de que observation_date es un objeto datetime.datetime
-    if isinstance(observation_date, date) and not isinstance(
-        observation_date, datetime
-    ):
-        observation_datetime = datetime.combine(observation_date, datetime.min.time())
-    else:
-        observation_datetime = observation_date
-
-    # Establecer la zona horaria del objeto datetime a UTC
-    utc_timezone = tz.tzutc()
-    observation_datetime_utc = observation_datetime.replace(tzinfo=utc_timezone)
-
     min_degrees = int(form_data.get("min_degrees", 5))  # Default to 5 if not provided
 
-    # Convertir el objeto datetime.datetime a un objeto Time de Astropy
-    observation_time_astropy = Time(observation_datetime_utc)
+    # Convertir la fecha a un objeto Time de Astropy en UTC
+    observation_time_astropy = observation_time_from_date(observation_date)
     # Pass observation_date and min_degrees to get_alt_az
-    altaz, error_message, visible_time = get_alt_az_at_degrees(
-        location,
-        ra,
-        dec,
-        observation_datetime=observation_time_astropy,
-        min_degrees=min_degrees,
-    )
+    with metrics.stage("visibility"):
+        altaz, error_message, visible_time = get_alt_az_at_degrees(
+            location,
+            ra,
+            dec,
+            observation_datetime=observation_time_astropy,
+            min_degrees=min_degrees,
+            object_id=object_id,
+        )
 
     if error_message or altaz is None:
         return {
@@ -121,7 +306,58 @@ def perform_astro_calculations(
             or f"The object will not be visible as its altitude never reaches {min_degrees} degrees during the observation period."
         }
 
-    fov_width, fov_height, pixel_width, pixel_height = calculate_camera_fov(
+    # Cached per site and night by get_alt_az_at_degrees (or its visibility table)
+    night_start, night_end = get_night_window(location, observation_time_astropy)
+
+    return {
+        "error": None,
+        "ra": ra,
+        "dec": dec,
+        "size_major": size_major,
+        "size_minor": size_minor,
+        "object_name": object_name,
+        "pa": pa,
+        "location": location,
+        "altaz": altaz,
+        "visible_time": visible_time,
+        "night_start": night_start,
+        "night_end": night_end,
+        "min_degrees": min_degrees,
+    }
+
+
+def session_timeline(
+    form_data,
+    calculate_camera_fov,
+    get_object_data,
+    calculate_max_shooting_time,
+    calculate_number_of_shoots,
+    shot_timeline,
+) -> dict[str, Any]:
+    """
+    Prepare the shot by shot timeline of the session perform_astro_calculations summarizes.
+
+    The visibility and the number of shots are solved right away, so errors are known
+    before anything is streamed; the shots themselves are computed as they are consumed.
+
+    Args:
+        form_data (dict): A dictionary containing the form data.
+        calculate_camera_fov (function): A function for calculating the camera field of view.
+        get_object_data (function): A function for retrieving object data.
+        calculate_max_shooting_time (function): A function for calculating the maximum shooting time.
+        calculate_number_of_shoots (function): A function for calculating the number of shoots.
+        shot_timeline (function): A generator function yielding the shots (see
+            app.utils.calculations.shot_timeline).
+
+    Returns:
+        dict: An "error", or the "object_name", "num_shoots", "exposure_time" and the
+        "shots" iterator.
+    """
+    visible = _visible_object(form_data, get_object_data)
+    if visible["error"]:
+        return {"error": visible["error"]}
+
+    fov_width, fov_height, _, _ = calculate_camera_fov(
         form_data["sensor_width_mm"],
         form_data["sensor_height_mm"],
         form_data["number_of_pixels_in_width"],
@@ -129,39 +365,126 @@ def perform_astro_calculations(
         form_data["focal_length"],
     )
 
-    max_shooting_time, real_max_shooting_time = calculate_max_shooting_time(
+    max_shooting_time, _ = calculate_max_shooting_time(
         form_data["aperture"],
         form_data["sensor_width_mm"],
         form_data["number_of_pixels_in_width"],
         form_data["focal_length"],
     )
 
-    (
-        num_shoots,
-        total_time_minutes,
-        total_time_seconds,
-        error,
-    ) = calculate_number_of_shoots(
-        altaz,
-        location,
-        ra,
-        dec,
+    num_shoots, _, _, error = calculate_number_of_shoots(
+        visible["altaz"],
+        visible["location"],
+        visible["ra"],
+        visible["dec"],
         fov_width,
         fov_height,
-        size_major,
-        size_minor,
+        visible["size_major"],
+        visible["size_minor"],
         max_shooting_time,
         form_data["shoot_interval"],
         form_data["camera_position"],
-        pa,
+        visible["pa"],
         form_data["min_degrees"],
     )
 
+    if num_shoots is None:
+        return {
+            "error": f"Object {visible['object_name']} number of shoots could be not calculated: {error}",
+        }
+
+    return {
+        "error": None,
+        "object_name": visible["object_name"],
+        "num_shoots": num_shoots,
+        "exposure_time": max_shooting_time,
+        "shots": shot_timeline(
+            visible["altaz"],
+            visible["location"],
+            fov_width,
+            fov_height,
+            visible["size_major"],
+            visible["size_minor"],
+            max_shooting_time,
+            form_data["shoot_interval"],
+            form_data["camera_position"],
+            visible["pa"],
+            num_shoots,
+        ),
+    }
+
+
+def _calculate(
+    form_data,
+    calculate_camera_fov,
+    get_object_data,
+    calculate_max_shooting_time,
+    calculate_number_of_shoots,
+    route,
+) -> dict[str, Any]:
+    visible = _visible_object(form_data, get_object_data)
+    if visible["error"]:
+        return {"error": visible["error"]}
+
+    ra = visible["ra"]
+    dec = visible["dec"]
+    size_major = visible["size_major"]
+    size_minor = visible["size_minor"]
+    object_name = visible["object_name"]
+    pa = visible["pa"]
+    location = visible["location"]
+    altaz = visible["altaz"]
+    visible_time = visible["visible_time"]
+    min_degrees = visible["min_degrees"]
+
+    altitude = form_data["altitude"]
+
+    with metrics.stage("fov"):
+        fov_width, fov_height, pixel_width, pixel_height = calculate_camera_fov(
+            form_data["sensor_width_mm"],
+            form_data["sensor_height_mm"],
+            form_data["number_of_pixels_in_width"],
+            form_data["number_of_pixels_in_height"],
+            form_data["focal_length"],
+        )
+
+        max_shooting_time, real_max_shooting_time = calculate_max_shooting_time(
+            form_data["aperture"],
+            form_data["sensor_width_mm"],
+            form_data["number_of_pixels_in_width"],
+            form_data["focal_length"],
+        )
+
+    with metrics.stage("shots"):
+        (
+            num_shoots,
+            total_time_minutes,
+            total_time_seconds,
+            error,
+        ) = calculate_number_of_shoots(
+            altaz,
+            location,
+            ra,
+            dec,
+            fov_width,
+            fov_height,
+            size_major,
+            size_minor,
+            max_shooting_time,
+            form_data["shoot_interval"],
+            form_data["camera_position"],
+            pa,
+            form_data["min_degrees"],
+        )
+
     if num_shoots is None:
         return {
             "error": f"Object {object_name} number of shoots could be not calculated: {error}",
         }
 
+    with metrics.stage("visible_until"):
+        until = visible_until(altaz, location, visible["night_end"], min_degrees)
+
     result = {
         "fov_width": fov_width,
         "fov_height": fov_height,
@@ -181,6 +504,10 @@ def perform_astro_calculations(
         "total_time_minutes": total_time_minutes,
         "total_time_seconds": total_time_seconds,
         "observation_data": format_altaz_datetime(ra, dec, altaz, visible_time),
+        "visible_at": format_utc_minutes(visible_time),
+        "visible_until": format_utc_minutes(until.datetime),
+        "night_start": format_utc_minutes(visible["night_start"].datetime),
+        "night_end": format_utc_minutes(visible["night_end"].datetime),
         "min_degrees": min_degrees,
         "altitude": altitude,
         "error": None,
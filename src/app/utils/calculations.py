@@ -1,10 +1,14 @@
 import math
 
-import astropy.units as u
 import numpy as np
-from astropy.time import TimeDelta
 
-from .astro_utils import get_alt_az
+from .drift import propagate_altaz, solve_number_of_shoots
+
+# Shots computed per batch by shot_timeline
+TIMELINE_CHUNK_SIZE = 512
+
+# The values of each shot yielded by shot_timeline, in order (the CSV columns)
+TIMELINE_FIELDS = ("shot", "time", "alt", "az", "drift_alt", "drift_az", "fov_used")
 
 
 def calculate_camera_fov(
@@ -93,6 +97,11 @@ def calculate_number_of_shoots(
 ):
     """
     Calculate the number of shoots required for a given set of parameters.
+
+    The drift of the object is solved in closed form from the altitude and azimuth at the
+    start (see app.utils.drift), so no further coordinate transforms are needed. The
+    propagated positions agree with astropy's AltAz transform within an arcsecond over a
+    night, which keeps the shot count identical except when it sits right on a boundary.
     """
 
     # Ensure the time is in UTC
@@ -102,66 +111,167 @@ def calculate_number_of_shoots(
     if np.ma.is_masked(size_major) or np.ma.is_masked(size_minor):
         return None, 0, 0, "Size data is missing (masked)."
 
-    # Applying rotation to FOV
-    fov_rot_h, fov_rot_v = apply_fov_rotation(
-        fov_width, fov_height, camera_position, PA
+    available_altitude, available_azimuth = available_field(
+        fov_width, fov_height, size_major, size_minor, camera_position, PA
     )
 
-    available_altitude = abs(fov_rot_h - size_major) / 2
-    available_azimuth = abs(fov_rot_v - size_minor) / 2
-    current_time = altaz.obstime
-    num_shoots = 0
-
-    while True:
-        # Ensure the time is in UTC
-        if current_time.scale != "utc":
-            raise ValueError("Time scale should be UTC.")
+    num_shoots, _ = solve_number_of_shoots(
+        altaz.alt.degree,
+        altaz.az.degree,
+        location.lat.degree,
+        available_altitude,
+        available_azimuth,
+        exposure_time,
+        shoot_interval,
+    )
 
-        # Calculate the new position of the object after shoot_interval and exposure_time
-        next_time = current_time + TimeDelta(
-            (shoot_interval + exposure_time) * u.second
+    if num_shoots == 0:
+        return (
+            None,
+            0,
+            0,
+            "The object drifts out of the field of view before a single shot is completed.",
         )
 
-        new_altaz, error = get_alt_az(
-            location,
-            ra,
-            dec,
-            next_time,
+    if not np.isfinite(num_shoots):
+        return (
+            None,
+            0,
+            0,
+            "The object does not drift, the number of shoots is unbounded.",
         )
 
-        if new_altaz is None:
-            return (None, 0, 0, error)
+    total_time_seconds = num_shoots * (exposure_time + shoot_interval)
 
-        avg_altitude_speed = (
-            abs(new_altaz.alt.degree - altaz.alt.degree) * 60 / shoot_interval
-        )
-        avg_azimuth_speed = (
-            abs(new_altaz.az.degree - altaz.az.degree) * 60 / shoot_interval
-        )
+    # Convert the total time to minutes and seconds
+    total_time_minutes = int(round(total_time_seconds // 60))
+    total_time_seconds = int(round(total_time_seconds % 60))
 
-        max_movement_altitude = available_altitude / abs(avg_altitude_speed)
-        max_movement_azimuth = available_azimuth / abs(avg_azimuth_speed)
+    return int(num_shoots), total_time_minutes, total_time_seconds, None
 
-        total_time_available = (
-            min(max_movement_altitude, max_movement_azimuth) * shoot_interval
-        )
 
-        total_time_per_shot = exposure_time + shoot_interval
-        num_shoots = max(0, total_time_available // total_time_per_shot)
+def available_field(fov_width, fov_height, size_major, size_minor, camera_position, PA):
+    """
+    Calculate how far the object can drift along each axis before it leaves the field of view.
 
-        if num_shoots > 0:
-            break
+    Parameters:
+        fov_width (float): The width of the field of view in arcminutes.
+        fov_height (float): The height of the field of view in arcminutes.
+        size_major (float): The major axis size of the object in arcminutes.
+        size_minor (float): The minor axis size of the object in arcminutes.
+        camera_position (int): The camera angle in degrees.
+        PA (float): The position angle of the object in degrees.
 
-        current_time = next_time
-        altaz = new_altaz
+    Returns:
+        tuple: The free room along the altitude and azimuth axes in arcminutes.
+    """
+    # Applying rotation to FOV
+    fov_rot_h, fov_rot_v = apply_fov_rotation(
+        fov_width, fov_height, camera_position, PA
+    )
 
-    total_time_seconds = num_shoots * (exposure_time + shoot_interval)
+    return abs(fov_rot_h - size_major) / 2, abs(fov_rot_v - size_minor) / 2
 
-    # Convert the total time to minutes and seconds
-    total_time_minutes = int(round(total_time_seconds // 60))
-    total_time_seconds = int(round(total_time_seconds % 60))
 
-    return int(num_shoots), total_time_minutes, total_time_seconds, None
+def shot_timeline(
+    altaz,
+    location,
+    fov_width,
+    fov_height,
+    size_major,
+    size_minor,
+    exposure_time,
+    shoot_interval,
+    camera_position,
+    PA,
+    num_shoots=None,
+    chunk_size=TIMELINE_CHUNK_SIZE,
+):
+    """
+    Yield the shots of a session one by one, computed chunk_size shots at a time.
+
+    The session starts at the first moment at least one shot fits, like
+    calculate_number_of_shoots. Positions are propagated in closed form from altaz for a
+    whole chunk at once (see app.utils.drift), so the cost does not depend on transforms
+    per shot and only one chunk is held in memory.
+
+    Parameters:
+        altaz (AltAz): The position of the object when it becomes visible.
+        location (EarthLocation): The observer's location.
+        fov_width (float): The width of the field of view in arcminutes.
+        fov_height (float): The height of the field of view in arcminutes.
+        size_major (float): The major axis size of the object in arcminutes.
+        size_minor (float): The minor axis size of the object in arcminutes.
+        exposure_time (float): The exposure time in seconds.
+        shoot_interval (float): The interval between shots in seconds.
+        camera_position (int): The camera angle in degrees.
+        PA (float): The position angle of the object in degrees.
+        num_shoots (int, optional): The number of shots to yield. Defaults to the number
+            that fit in the field of view.
+        chunk_size (int, optional): The number of shots computed per batch.
+
+    Yields:
+        dict: The TIMELINE_FIELDS of each shot: its number (from 1), its UTC start time in
+        ISO format, the altitude and azimuth of the object in degrees, the drift in
+        altitude and azimuth since the first shot in arcminutes, and the fraction of the
+        free room of the field of view used so far. Nothing when no shot fits or the
+        number of shots is unbounded.
+    """
+    available_altitude, available_azimuth = available_field(
+        fov_width, fov_height, size_major, size_minor, camera_position, PA
+    )
+
+    shot_time = exposure_time + shoot_interval
+    fitting_shoots, start_offset = solve_number_of_shoots(
+        altaz.alt.degree,
+        altaz.az.degree,
+        location.lat.degree,
+        available_altitude,
+        available_azimuth,
+        exposure_time,
+        shoot_interval,
+    )
+    if num_shoots is None:
+        num_shoots = fitting_shoots
+    if start_offset is None or not np.isfinite(num_shoots):
+        return
+
+    start = np.datetime64(altaz.obstime.utc.datetime, "us")
+    first_alt, first_az = propagate_altaz(
+        altaz.alt.degree, altaz.az.degree, location.lat.degree, start_offset
+    )
+
+    for chunk_start in range(0, int(num_shoots), chunk_size):
+        shots = np.arange(chunk_start, min(chunk_start + chunk_size, int(num_shoots)))
+        offsets = start_offset + shots * shot_time
+
+        alt, az = propagate_altaz(
+            altaz.alt.degree, altaz.az.degree, location.lat.degree, offsets
+        )
+        drift_alt = (alt - first_alt) * 60
+        drift_az = ((az - first_az + 180) % 360 - 180) * 60
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fov_used = np.fmax(
+                np.abs(drift_alt) / available_altitude,
+                np.abs(drift_az) / available_azimuth,
+            )
+
+        times = np.datetime_as_string(
+            start + np.round(offsets * 1e6).astype("timedelta64[us]"), unit="ms"
+        )
+
+        yield from (
+            dict(zip(TIMELINE_FIELDS, values))
+            for values in zip(
+                (shots + 1).tolist(),
+                [f"{time}Z" for time in times],
+                alt.tolist(),
+                az.tolist(),
+                drift_alt.tolist(),
+                drift_az.tolist(),
+                fov_used.tolist(),
+            )
+        )
 
 
 def apply_fov_rotation(fov_width, fov_height, camera_position, PA):
@@ -1,28 +1,40 @@
 import json
+import sys
 
 from app.db.Camera import Camera
 
 
+def _shared(value):
+    """
+    Intern a repeated string (brands, years, ISO values...) so all cameras share one copy.
+    """
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def camera_from_dict(item):
+    """
+    Create a Camera from a dictionary keyed by attribute name; missing keys become None.
+    """
+    iso = item.get("iso", None)
+    return Camera(
+        item.get("sensor_size_w", None),
+        item.get("sensor_size_h", None),
+        item.get("sensor_px_w", None),
+        item.get("sensor_px_h", None),
+        item.get("url", None),
+        item.get("image_url", None),
+        _shared(item.get("brand", None)),
+        item.get("model", None),
+        [_shared(value) for value in iso] if iso is not None else None,
+        item.get("also_known_as", None),
+        _shared(item.get("year", None)),
+        _shared(item.get("max_aperture", None)),
+        _shared(item.get("crop_factor", None)),
+    )
+
+
 def load_cameras_from_json(file_path):
-    cameras = []
     with open(file_path, "r", encoding="utf-8") as f:
         data = json.load(f)
-        for item in data:
-            camera = Camera(
-                item.get("sensor_size_w", None),
-                item.get("sensor_size_h", None),
-                item.get("sensor_px_w", None),
-                item.get("sensor_px_h", None),
-                item.get("url", None),
-                item.get("image_url", None),
-                item.get("brand", None),
-                item.get("model", None),
-                item.get("iso", None),
-                item.get("also_known_as", None),
-                item.get("year", None),
-                item.get("max_aperture", None),
-                item.get("crop_factor", None),
-            )
-            cameras.append(camera)
-
-    return cameras
+
+    return [camera_from_dict(item) for item in data]
@@ -0,0 +1,218 @@
+import numpy as np
+
+from app.utils.metrics import metrics
+
+# Earth rotation in degrees of hour angle per SI second (sidereal rate)
+SIDEREAL_RATE_DEG_PER_SEC = 360.98564736629 / 86400
+
+# How far ahead solve_number_of_shoots looks for a moment when at least one shot fits
+SEARCH_HORIZON_SECONDS = 86400
+SEARCH_MIN_STEP_SECONDS = 60
+
+
+def equatorial_from_altaz(alt_deg, az_deg, lat_deg):
+    """
+    Convert horizontal coordinates to local equatorial coordinates.
+
+    Azimuth is measured from the North towards the East, like astropy's AltAz frame.
+
+    Parameters:
+        alt_deg (float | ndarray): The altitude in degrees.
+        az_deg (float | ndarray): The azimuth in degrees.
+        lat_deg (float): The latitude of the observer in degrees.
+
+    Returns:
+        tuple: The hour angle and the declination in degrees.
+    """
+    alt = np.radians(alt_deg)
+    az = np.radians(az_deg)
+    lat = np.radians(lat_deg)
+
+    sin_dec = np.sin(lat) * np.sin(alt) + np.cos(lat) * np.cos(alt) * np.cos(az)
+    dec = np.arcsin(np.clip(sin_dec, -1, 1))
+    hour_angle = np.arctan2(
+        -np.sin(az) * np.cos(alt),
+        np.cos(lat) * np.sin(alt) - np.sin(lat) * np.cos(alt) * np.cos(az),
+    )
+
+    return np.degrees(hour_angle), np.degrees(dec)
+
+
+def altaz_from_equatorial(hour_angle_deg, dec_deg, lat_deg):
+    """
+    Convert local equatorial coordinates to horizontal coordinates.
+
+    Parameters:
+        hour_angle_deg (float | ndarray): The hour angle in degrees.
+        dec_deg (float | ndarray): The declination in degrees.
+        lat_deg (float): The latitude of the observer in degrees.
+
+    Returns:
+        tuple: The altitude and the azimuth (0-360, North through East) in degrees.
+    """
+    hour_angle = np.radians(hour_angle_deg)
+    dec = np.radians(dec_deg)
+    lat = np.radians(lat_deg)
+
+    sin_alt = np.sin(lat) * np.sin(dec) + np.cos(lat) * np.cos(dec) * np.cos(hour_angle)
+    alt = np.arcsin(np.clip(sin_alt, -1, 1))
+    az = np.arctan2(
+        -np.cos(dec) * np.sin(hour_angle),
+        np.sin(dec) * np.cos(lat) - np.cos(dec) * np.sin(lat) * np.cos(hour_angle),
+    )
+
+    return np.degrees(alt), np.mod(np.degrees(az), 360)
+
+
+def altaz_rates(hour_angle_deg, dec_deg, lat_deg):
+    """
+    Calculate the instantaneous altitude and azimuth drift rates of a fixed object.
+
+    Parameters:
+        hour_angle_deg (float | ndarray): The hour angle in degrees.
+        dec_deg (float | ndarray): The declination in degrees.
+        lat_deg (float): The latitude of the observer in degrees.
+
+    Returns:
+        tuple: The altitude and azimuth rates in degrees per second. The azimuth rate is
+        infinite for an object exactly at the zenith.
+    """
+    hour_angle = np.radians(hour_angle_deg)
+    dec = np.radians(dec_deg)
+    lat = np.radians(lat_deg)
+
+    alt_deg, _ = altaz_from_equatorial(hour_angle_deg, dec_deg, lat_deg)
+    cos_alt = np.cos(np.radians(alt_deg))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        alt_rate = -np.cos(lat) * np.cos(dec) * np.sin(hour_angle) / cos_alt
+        az_rate = (
+            np.cos(dec)
+            * (
+                np.sin(lat) * np.cos(dec)
+                - np.cos(lat) * np.sin(dec) * np.cos(hour_angle)
+            )
+            / cos_alt**2
+        )
+
+    return alt_rate * SIDEREAL_RATE_DEG_PER_SEC, az_rate * SIDEREAL_RATE_DEG_PER_SEC
+
+
+def propagate_altaz(alt_deg, az_deg, lat_deg, seconds):
+    """
+    Predict where an object seen at (alt, az) will be after some seconds.
+
+    The object's apparent hour angle advances at the sidereal rate while its declination
+    stays fixed, which ignores precession, nutation and aberration changes over the
+    interval (well under an arcsecond over a night).
+
+    Parameters:
+        alt_deg (float): The altitude at the reference time in degrees.
+        az_deg (float): The azimuth at the reference time in degrees.
+        lat_deg (float): The latitude of the observer in degrees.
+        seconds (float | ndarray): The offsets from the reference time in seconds.
+
+    Returns:
+        tuple: The altitudes and azimuths in degrees at each offset.
+    """
+    hour_angle, dec = equatorial_from_altaz(alt_deg, az_deg, lat_deg)
+
+    return altaz_from_equatorial(
+        hour_angle + np.asarray(seconds) * SIDEREAL_RATE_DEG_PER_SEC, dec, lat_deg
+    )
+
+
+def shots_per_position(
+    alt_change,
+    az_change,
+    available_altitude,
+    available_azimuth,
+    exposure_time,
+    shoot_interval,
+):
+    """
+    Count the shots that fit before the object leaves the field of view.
+
+    This is the expression the original calculate_number_of_shoots loop evaluated, with the
+    altitude and azimuth changes measured over one shot (exposure_time + shoot_interval).
+
+    Parameters:
+        alt_change (float | ndarray): The altitude change over one shot in degrees.
+        az_change (float | ndarray): The azimuth change over one shot in degrees.
+        available_altitude (float): The free room along the altitude axis in arcminutes.
+        available_azimuth (float): The free room along the azimuth axis in arcminutes.
+        exposure_time (float): The exposure time in seconds.
+        shoot_interval (float): The interval between shots in seconds.
+
+    Returns:
+        ndarray: The number of shots, infinite where the object does not drift.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg_altitude_speed = np.abs(alt_change) * 60 / shoot_interval
+        avg_azimuth_speed = np.abs(az_change) * 60 / shoot_interval
+
+        max_movement_altitude = available_altitude / avg_altitude_speed
+        max_movement_azimuth = available_azimuth / avg_azimuth_speed
+
+    total_time_available = (
+        np.fmin(max_movement_altitude, max_movement_azimuth) * shoot_interval
+    )
+    total_time_available = np.nan_to_num(total_time_available, nan=0.0, posinf=np.inf)
+
+    return np.maximum(0, total_time_available // (exposure_time + shoot_interval))
+
+
+def solve_number_of_shoots(
+    alt_deg,
+    az_deg,
+    lat_deg,
+    available_altitude,
+    available_azimuth,
+    exposure_time,
+    shoot_interval,
+):
+    """
+    Find the number of shots at the first moment when at least one shot fits.
+
+    Replaces the loop that stepped shot by shot with two astropy transforms per step: the
+    positions are propagated in closed form from the (alt, az) at the start and all the
+    candidate start times are evaluated at once.
+
+    Parameters:
+        alt_deg (float): The altitude of the object at the start in degrees.
+        az_deg (float): The azimuth of the object at the start in degrees.
+        lat_deg (float): The latitude of the observer in degrees.
+        available_altitude (float): The free room along the altitude axis in arcminutes.
+        available_azimuth (float): The free room along the azimuth axis in arcminutes.
+        exposure_time (float): The exposure time in seconds.
+        shoot_interval (float): The interval between shots in seconds.
+
+    Returns:
+        tuple: The number of shots and the offset in seconds from the start where they were
+        found, or (0, None) when no shot fits within SEARCH_HORIZON_SECONDS.
+    """
+    shot_time = exposure_time + shoot_interval
+    step = max(shot_time, SEARCH_MIN_STEP_SECONDS)
+    offsets = np.arange(0, SEARCH_HORIZON_SECONDS, step)
+    metrics.inc("astro_shot_search_steps_total", len(offsets))
+
+    alt_now, az_now = propagate_altaz(alt_deg, az_deg, lat_deg, offsets)
+    alt_next, az_next = propagate_altaz(alt_deg, az_deg, lat_deg, offsets + shot_time)
+
+    # Wrap azimuth differences so crossing North does not look like a 360 degree jump
+    az_change = (az_next - az_now + 180) % 360 - 180
+
+    shots = shots_per_position(
+        alt_next - alt_now,
+        az_change,
+        available_altitude,
+        available_azimuth,
+        exposure_time,
+        shoot_interval,
+    )
+
+    found = np.flatnonzero(shots > 0)
+    if found.size == 0:
+        return 0, None
+
+    return shots[found[0]], offsets[found[0]]
@@ -0,0 +1,164 @@
+"""
+Caching and compression of deterministic JSON responses (the autocomplete endpoints).
+
+The ETag of a response is derived from the version of the data behind it and the
+normalized query, not from its body: a browser or proxy revalidating a suggestion list
+gets its 304 without the list being computed again. Bodies are kept serialized, and
+compressed once, in an in-process LRU keyed by the same normalized query.
+"""
+
+import gzip
+import hashlib
+from typing import Any, Callable, Hashable, Optional
+
+from flask import Response, request
+
+from app.utils.cache import LRUCache
+from app.utils.metrics import metrics
+
+try:
+    import brotli
+except ImportError:  # Optional: without it responses are only gzipped
+    brotli = None
+
+# Bump when the JSON of a cached endpoint changes for the same data, so clients holding
+# the previous bodies stop getting 304s
+RESPONSE_FORMAT_VERSION = 1
+
+DEFAULT_MAX_AGE = 3600
+DEFAULT_MAXSIZE = 2048
+# Smaller bodies fit in one packet anyway; compressing them only costs CPU
+DEFAULT_MIN_COMPRESS_BYTES = 1024
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def entity_tag(version: str, key: Hashable) -> str:
+    """
+    Returns the strong ETag (unquoted) of the response to key for a version of the data.
+    """
+    content = f"{RESPONSE_FORMAT_VERSION}|{version}|{key!r}"
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()[:20]
+
+
+def _compress(body: bytes) -> dict[str, bytes]:
+    encoded = {"gzip": gzip.compress(body, GZIP_LEVEL, mtime=0)}
+    if brotli is not None:
+        encoded["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+    # Keep only the encodings that make the body smaller
+    return {name: data for name, data in encoded.items() if len(data) < len(body)}
+
+
+class ResponseCache:
+    """
+    Answers the requests of deterministic JSON endpoints from serialized bodies.
+
+    Attributes:
+        max_age (int): The seconds clients and proxies may reuse a response without
+            revalidating it (Cache-Control).
+        min_compress_bytes (int): The size from which bodies are compressed.
+        compress (bool): Whether to compress bodies (gzip, and brotli when installed).
+        entries (LRUCache): The serialized bodies by endpoint and normalized query.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_MAXSIZE,
+        max_age: int = DEFAULT_MAX_AGE,
+        compress: bool = True,
+        min_compress_bytes: int = DEFAULT_MIN_COMPRESS_BYTES,
+    ) -> None:
+        self.max_age = max_age
+        self.compress = compress
+        self.min_compress_bytes = min_compress_bytes
+        self.entries = LRUCache(maxsize=maxsize)
+
+    def _entry(self, build: Callable[[], Any]) -> dict[str, Any]:
+        body = build()
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+
+        encoded = {}
+        if self.compress and len(body) >= self.min_compress_bytes:
+            encoded = _compress(body)
+
+        return {"body": body, "encoded": encoded}
+
+    def _headers(self, etag: str, encoding: Optional[str] = None) -> dict[str, str]:
+        # Each coding of a body is a different representation, with its own strong tag
+        tag = f"{etag}-{encoding}" if encoding else etag
+        return {
+            "ETag": f'"{tag}"',
+            "Cache-Control": f"public, max-age={self.max_age}",
+            "Vary": "Accept-Encoding",
+        }
+
+    def respond(
+        self,
+        endpoint: str,
+        version: str,
+        key: Hashable,
+        build: Callable[[], Any],
+    ) -> Response:
+        """
+        Returns the response to a request, building its body only if it is not cached.
+
+        Args:
+            endpoint (str): The name of the endpoint, part of the cache key.
+            version (str): The version of the data the body is built from.
+            key (Hashable): The normalized query: requests with the same key get the same
+                body.
+            build (Callable): Returns the JSON body (str or bytes).
+
+        Returns:
+            Response: 304 with the matched tag if the client's If-None-Match holds the
+            current tag of any coding, else the body, compressed if the client accepts
+            it.
+        """
+        etag = entity_tag(version, (endpoint, key))
+
+        # If-None-Match uses the weak comparison, and any coding of the body matches.
+        # The 304 carries the tag of the matched coding, the negotiated ones first
+        accepted = [name for name in ("br", "gzip") if request.accept_encodings[name]]
+        codings = (
+            accepted
+            + [None]
+            + [name for name in ("br", "gzip") if name not in accepted]
+        )
+        for encoding in codings:
+            tag = f"{etag}-{encoding}" if encoding else etag
+            if request.if_none_match.contains_weak(tag):
+                metrics.inc(
+                    "http_cache_lookups_total",
+                    endpoint=endpoint,
+                    result="not_modified",
+                )
+                return Response(status=304, headers=self._headers(etag, encoding))
+
+        computed = []
+
+        def compute():
+            computed.append(True)
+            return self._entry(build)
+
+        entry = self.entries.get_or_compute((endpoint, version, key), compute)
+        metrics.inc(
+            "http_cache_lookups_total",
+            endpoint=endpoint,
+            result="miss" if computed else "hit",
+        )
+
+        for encoding in ("br", "gzip"):
+            if encoding in entry["encoded"] and request.accept_encodings[encoding]:
+                response = Response(
+                    entry["encoded"][encoding],
+                    mimetype="application/json",
+                    headers=self._headers(etag, encoding),
+                )
+                response.headers["Content-Encoding"] = encoding
+                return response
+
+        return Response(
+            entry["body"], mimetype="application/json", headers=self._headers(etag)
+        )
@@ -0,0 +1,202 @@
+"""
+Earth orientation (IERS) and leap second data used by the astropy transforms.
+
+By default astropy downloads a fresh IERS-A table when the one it has is older than a
+month, on whatever call needs it first: on a host without internet access that is a
+request waiting for a network timeout. In offline mode the tables are read from a local
+directory staged ahead of time, and downloads are disabled:
+
+    PYTHONPATH=src python -m app.utils.iers_data data/iers
+
+Without staged files astropy falls back on the tables bundled with it, which are accurate
+enough for altitudes shown with two decimals but get older with every release; iers_status
+reports how old they are (see the /health route).
+"""
+
+import hashlib
+import json
+import os
+import sys
+import warnings
+from datetime import datetime, timezone
+from typing import Optional
+
+IERS_MODES = ("offline", "online")
+
+IERS_A_FILENAME = "finals2000A.all"
+LEAP_SECOND_FILENAME = "Leap_Second.dat"
+MANIFEST_FILENAME = "manifest.json"
+
+# Staged data older than this is reported as stale
+DEFAULT_MAX_AGE_DAYS = 30
+
+# The mode and directory set by configure_iers, reported by iers_status
+_state = {"mode": "online", "data_dir": None, "source": "astropy"}
+
+
+def _staged_path(data_dir: Optional[str], filename: str) -> Optional[str]:
+    if not data_dir:
+        return None
+    path = os.path.join(data_dir, filename)
+    return path if os.path.exists(path) else None
+
+
+def configure_iers(mode: str = "offline", data_dir: Optional[str] = None) -> None:
+    """
+    Set where astropy reads its Earth orientation and leap second tables from.
+
+    Must run before the first transform (create_app calls it before warm_up).
+
+    Args:
+        mode (str): "offline" never downloads: the staged files of data_dir are used, or
+            the tables bundled with astropy. "online" keeps astropy's auto-download.
+        data_dir (str, optional): The directory written by stage_iers_data.
+    """
+    from astropy.time import update_leap_seconds
+    from astropy.utils import iers
+
+    if mode not in IERS_MODES:
+        raise ValueError(f"Unknown IERS mode {mode!r}, expected one of {IERS_MODES}")
+
+    _state.update(mode=mode, data_dir=data_dir, source="astropy")
+
+    if mode == "online":
+        return
+
+    iers.conf.auto_download = False
+    # Dates past the end of the table get the last known values instead of an error
+    iers.conf.iers_degraded_accuracy = "warn"
+
+    iers_a_path = _staged_path(data_dir, IERS_A_FILENAME)
+    if iers_a_path:
+        iers.earth_orientation_table.set(iers.IERS_A.open(iers_a_path))
+        _state["source"] = "staged"
+
+    leap_second_path = _staged_path(data_dir, LEAP_SECOND_FILENAME)
+    if leap_second_path:
+        iers.conf.system_leap_second_file = leap_second_path
+        update_leap_seconds([leap_second_path])
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def stage_iers_data(data_dir: str, timeout: float = 60) -> dict:
+    """
+    Download the IERS-A table and the leap second file into data_dir.
+
+    Each file is checked by parsing it before it replaces the previous one, so a failed
+    or partial download never leaves the directory unusable.
+
+    Args:
+        data_dir (str): The destination directory, created if missing.
+        timeout (float, optional): The timeout of each download in seconds.
+
+    Returns:
+        dict: The manifest written next to the files: when they were staged, and the URL
+        and sha256 of each one.
+    """
+    from astropy.utils import iers
+    from astropy.utils.data import download_file
+
+    os.makedirs(data_dir, exist_ok=True)
+
+    sources = (
+        (IERS_A_FILENAME, iers.IERS_A_URL, iers.IERS_A.open),
+        (LEAP_SECOND_FILENAME, iers.IERS_LEAP_SECOND_URL, iers.LeapSeconds.open),
+    )
+
+    files = {}
+    for filename, url, parse in sources:
+        downloaded = download_file(url, cache=False, timeout=timeout)
+        try:
+            parse(downloaded)
+            path = os.path.join(data_dir, filename)
+            temporary_path = f"{path}.{os.getpid()}.tmp"
+            with open(downloaded, "rb") as source, open(temporary_path, "wb") as target:
+                target.write(source.read())
+            os.replace(temporary_path, path)
+        finally:
+            os.remove(downloaded)
+        files[filename] = {"url": url, "sha256": _file_digest(path)}
+
+    manifest = {
+        "staged_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "files": files,
+    }
+    with open(os.path.join(data_dir, MANIFEST_FILENAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+def _staged_at(data_dir: Optional[str]) -> Optional[datetime]:
+    path = _staged_path(data_dir, MANIFEST_FILENAME)
+    if not path:
+        return None
+    with open(path, encoding="utf-8") as f:
+        return datetime.fromisoformat(json.load(f)["staged_at"])
+
+
+def iers_status(max_age_days: float = DEFAULT_MAX_AGE_DAYS) -> dict:
+    """
+    Report the Earth orientation and leap second data in use and whether it is stale.
+
+    Reads only the tables already loaded or local files, never the network in offline
+    mode.
+
+    Args:
+        max_age_days (float, optional): The age after which staged data is stale.
+
+    Returns:
+        dict: The "mode" and "source" of the data, the last date the Earth orientation
+        table covers ("table_ends"), when the leap second file expires
+        ("leap_seconds_expire"), when the data was staged ("staged_at", "age_days"),
+        "stale" and the "reasons" it is stale.
+    """
+    from astropy.time import Time
+    from astropy.utils import iers
+
+    now = Time.now()
+    table = iers.earth_orientation_table.get()
+    table_ends = Time(table["MJD"][-1], format="mjd")
+    with warnings.catch_warnings():
+        # Staleness is reported below rather than warned about on every call
+        warnings.simplefilter("ignore", iers.IERSStaleWarning)
+        leap_seconds_expire = iers.LeapSeconds.auto_open().expires
+
+    reasons = []
+    if table_ends < now:
+        reasons.append("the Earth orientation table ends before today")
+    if leap_seconds_expire < now:
+        reasons.append("the leap second file has expired")
+
+    staged_at = _staged_at(_state["data_dir"])
+    age_days = None
+    if staged_at is not None:
+        age_days = (datetime.now(timezone.utc) - staged_at).total_seconds() / 86400
+        if age_days > max_age_days:
+            reasons.append(f"the staged data is older than {max_age_days:g} days")
+
+    return {
+        "mode": _state["mode"],
+        "source": _state["source"],
+        "table": type(table).__name__,
+        "table_ends": table_ends.iso[:10],
+        "leap_seconds_expire": leap_seconds_expire.iso[:10],
+        "staged_at": staged_at.isoformat() if staged_at is not None else None,
+        "age_days": round(age_days, 1) if age_days is not None else None,
+        "stale": bool(reasons),
+        "reasons": reasons,
+    }
+
+
+if __name__ == "__main__":
+    destination = sys.argv[1] if len(sys.argv) > 1 else os.path.join("data", "iers")
+    staged = stage_iers_data(destination)
+    print(f"Staged {', '.join(staged['files'])} in {os.path.normpath(destination)}")
@@ -1,26 +1,57 @@
 # initialize.py
-import logging
-from logging.handlers import RotatingFileHandler
+import time
+from typing import Optional
 
-from flask import Flask
+from flask import Flask, g, request
 from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
 from flask_talisman import Talisman
 from flask_wtf.csrf import CSRFProtect
 
-
-def init_logging(app: Flask):
+from app.utils.logger import (
+    DEFAULT_BACKUP_COUNT,
+    DEFAULT_LOG_PATH,
+    DEFAULT_MAX_BYTES,
+    log_pipeline,
+)
+from app.utils.metrics import (
+    MetricsStore,
+    metrics,
+    request_timings,
+    server_timing_header,
+    start_request_timings,
+)
+from app.utils.recording import RequestRecorder
+
+
+def init_logging(
+    app: Flask,
+    path: str = DEFAULT_LOG_PATH,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    backup_count: int = DEFAULT_BACKUP_COUNT,
+    level: str = "INFO",
+):
     """
     Initializes logging for the application.
 
+    Every logger, the application's included, writes through the queue of log_pipeline:
+    requests never wait for the disk, and records are written as JSON lines to a file
+    rotated at max_bytes.
+
     Args:
         app (Flask): The Flask application object.
+        path (str, optional): The log file.
+        max_bytes (int, optional): The size at which the log file is rotated.
+        backup_count (int, optional): The number of rotated files kept.
+        level (str, optional): The lowest level written.
 
     Returns:
-        None
+        LogPipeline: The pipeline.
     """
-    handler = RotatingFileHandler("app.log", maxBytes=10000, backupCount=3)
-    handler.setLevel(logging.ERROR)
-    app.logger.addHandler(handler)
+    log_pipeline.configure(path, max_bytes, backup_count, level)
+    # Records propagate to the pipeline on the root logger
+    app.logger.setLevel(level)
+    return log_pipeline
 
 
 def init_limiter(app):
@@ -33,7 +64,12 @@ def init_limiter(app):
     Returns:
         Limiter: A new `Limiter` object with the default limits set.
     """
-    return Limiter(app, default_limits=["10000 per day", "2000 per hour"])
+    return Limiter(
+        get_remote_address,
+        app=app,
+        default_limits=["10000 per day", "2000 per hour"],
+        storage_uri=app.config.get("RATELIMIT_STORAGE_URI", "memory://"),
+    )
 
 
 def init_talisman(app: Flask):
@@ -76,3 +112,68 @@ def init_csrf(app: Flask):
     :rtype: CSRFProtect
     """
     return CSRFProtect(app)
+
+
+def init_metrics(
+    app: Flask, store: Optional[MetricsStore] = None, server_timing: bool = False
+):
+    """
+    Counts and times every request, and collects the stage timings of each of them.
+
+    Parameters:
+        app (Flask): The Flask application instance.
+        store (MetricsStore, optional): Where the worker publishes its metrics after a
+            request, so /metrics can add up every worker.
+        server_timing (bool, optional): Whether to send the stage timings of each request
+            in a Server-Timing header.
+
+    Returns:
+        None
+    """
+
+    @app.before_request
+    def start_timing():
+        g.request_start = time.perf_counter()
+        start_request_timings()
+
+    @app.after_request
+    def record_request(response):
+        duration = time.perf_counter() - g.pop("request_start", time.perf_counter())
+        endpoint = request.endpoint or "unmatched"
+
+        metrics.inc(
+            "http_requests_total",
+            endpoint=endpoint,
+            method=request.method,
+            status=response.status_code,
+        )
+        metrics.observe("http_request_seconds", duration, endpoint=endpoint)
+
+        if server_timing:
+            response.headers["Server-Timing"] = server_timing_header(
+                request_timings(), duration
+            )
+
+        if store is not None:
+            store.publish(metrics)
+
+        return response
+
+
+def init_recording(app: Flask, recorder: RequestRecorder):
+    """
+    Records a sample of the autocomplete, camera and calculation requests, anonymized,
+    to replay them with benchmarks.load_test.
+
+    Parameters:
+        app (Flask): The Flask application instance.
+        recorder (RequestRecorder): Writes the sampled requests.
+
+    Returns:
+        None
+    """
+
+    @app.after_request
+    def record_sample(response):
+        recorder.record(request, response.status_code)
+        return response
@@ -0,0 +1,127 @@
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.utils.cache import LRUCache
+
+DEFAULT_WORKERS = 4
+DEFAULT_QUEUE_SIZE = 32
+DEFAULT_JOB_TTL = 600
+
+JOB_STATUSES = ("pending", "done", "failed")
+
+# The state of a job whose calculation raised; the exception itself is only logged
+FAILED_JOB = {"status": "failed", "error": "The calculation failed."}
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFull(Exception):
+    """
+    Raised by JobRunner.submit when every worker is busy and the queue is full.
+    """
+
+
+class JobRunner:
+    """
+    Runs calculations on a bounded pool of threads and keeps their results by job ID.
+
+    At most workers + queue_size jobs are accepted at once; the rest are refused right
+    away (JobQueueFull) instead of piling up. Job states are kept in store: with a
+    SQLiteCache every gunicorn worker can answer the poll of a job another one runs.
+
+    The threads are started on first use in each process, so a runner created before
+    gunicorn forks its workers works in all of them.
+
+    Attributes:
+        workers (int): The number of threads running jobs.
+        queue_size (int): The number of jobs that may wait for a thread.
+        store (LRUCache | SQLiteCache): The job states by job ID.
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        store: Optional[Any] = None,
+    ) -> None:
+        """
+        Initializes the runner without starting any thread.
+
+        Args:
+            workers (int): The number of threads running jobs.
+            queue_size (int): The number of jobs that may wait for a thread.
+            store (LRUCache | SQLiteCache, optional): Where job states are kept. Defaults
+                to an in-process LRUCache whose entries expire after DEFAULT_JOB_TTL.
+        """
+        self.workers = workers
+        self.queue_size = queue_size
+        self.store = (
+            store if store is not None else LRUCache(maxsize=1024, ttl=DEFAULT_JOB_TTL)
+        )
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[threading.BoundedSemaphore] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="calculation-job"
+                )
+                self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+                self._pid = os.getpid()
+
+    @staticmethod
+    def _key(job_id: str) -> tuple:
+        return ("calculation_job", job_id)
+
+    def _run(self, job_id: str, function: Callable[[], Any]) -> Any:
+        try:
+            result = function()
+        except Exception:
+            # Nobody may be waiting on the Future, so the error is logged here
+            logger.exception("Calculation job %s failed", job_id)
+            self.store.set(self._key(job_id), dict(FAILED_JOB))
+            raise
+        finally:
+            self._slots.release()
+        self.store.set(self._key(job_id), {"status": "done", "result": result})
+        return result
+
+    def submit(self, function: Callable[[], Any]) -> tuple[str, Future]:
+        """
+        Queues a job.
+
+        Args:
+            function (Callable): A function without arguments returning the job result.
+
+        Returns:
+            tuple: The job ID and the Future of its result.
+
+        Raises:
+            JobQueueFull: If workers + queue_size jobs are already accepted.
+        """
+        self._start()
+        if not self._slots.acquire(blocking=False):
+            raise JobQueueFull("Too many calculations in progress, try again later.")
+
+        job_id = uuid.uuid4().hex
+        self.store.set(self._key(job_id), {"status": "pending"})
+        try:
+            future = self._executor.submit(self._run, job_id, function)
+        except RuntimeError:
+            self._slots.release()
+            raise
+        return job_id, future
+
+    def status(self, job_id: str) -> Optional[dict[str, Any]]:
+        """
+        Returns the state of a job: its "status" (one of JOB_STATUSES) and its "result"
+        or "error" once finished, or None if the job is unknown or has expired.
+        """
+        return self.store.get(self._key(job_id))
@@ -1,28 +1,268 @@
+import atexit
+import fcntl
+import json
 import logging
-from datetime import datetime
+import os
+import queue
+import threading
+from datetime import datetime, timezone
 from functools import wraps
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional, Union
 
-from flask import request
+from flask import has_request_context, request
+
+from app.utils.metrics import metrics
+
+DEFAULT_LOG_PATH = "app.log"
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+
+# Records waiting for the writer thread; further records are dropped, not waited for
+QUEUE_SIZE = 10000
+
+# The attributes of every LogRecord; anything else was passed as extra=
+_RECORD_ATTRIBUTES = set(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {
+    "message",
+    "asctime",
+}
+
+logger = logging.getLogger(__name__)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats a record as one JSON object per line.
+
+    Besides the time (UTC, ISO 8601), level, logger, message, process and thread, every
+    field passed with extra= is written, and the traceback if there is one.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        entry.update(
+            (name, value)
+            for name, value in record.__dict__.items()
+            if name not in _RECORD_ATTRIBUTES and not name.startswith("_")
+        )
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+
+        return json.dumps(entry, default=str)
+
+
+class SharedRotatingFileHandler(RotatingFileHandler):
+    """
+    A RotatingFileHandler that several processes can write and rotate.
+
+    Writes and rotations happen under an exclusive lock on a "<path>.lock" file, and a
+    process whose file was rotated by another one reopens it before writing, so gunicorn
+    workers sharing one log neither lose records nor rotate it once each.
+    """
+
+    def __init__(self, filename: str, *args, **kwargs) -> None:
+        super().__init__(filename, *args, **kwargs)
+        self._lock_file = open(f"{self.baseFilename}.lock", "a")
+
+    def _rotated_elsewhere(self) -> bool:
+        try:
+            return (
+                os.stat(self.baseFilename).st_ino
+                != os.fstat(self.stream.fileno()).st_ino
+            )
+        except FileNotFoundError:
+            return True
+
+    def emit(self, record: logging.LogRecord) -> None:
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        try:
+            if self.stream is not None and self._rotated_elsewhere():
+                self.stream.close()
+                self.stream = self._open()
+            super().emit(record)
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def close(self) -> None:
+        super().close()
+        self._lock_file.close()
+
+
+class _PipelineHandler(QueueHandler):
+    # Hands records to the writer thread of the current process, starting it if needed
+
+    def __init__(self, pipeline: "LogPipeline") -> None:
+        super().__init__(None)
+        self.pipeline = pipeline
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve what depends on the request thread (arguments, traceback) right away;
+        # the record is then written as is by the writer thread
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self.pipeline.enqueue(record)
+
+
+class LogPipeline:
+    """
+    Writes the application logs from a background thread, one per process.
+
+    Request threads only put records on a queue (QueueHandler); a QueueListener thread
+    formats them as JSON and writes them to a rotating file. The queue and the thread are
+    created on first use in each process, so a pipeline configured before gunicorn forks
+    its workers gives each of them its own. When the queue is full, records are dropped
+    and counted instead of blocking the request.
+
+    By default the pipeline writes every logger's records (it is installed on the root
+    logger) as JSON objects. A pipeline for one logger_name writes only that
+    logger's records, which then no longer reach the root logger.
+
+    Attributes:
+        logger_name (str): The logger the pipeline is installed on, None for the root.
+        formatter (logging.Formatter): Formats the lines written.
+        path (str): The log file.
+        max_bytes (int): The size at which the file is rotated.
+        backup_count (int): The number of rotated files kept.
+        level (int): The lowest level written.
+        dropped (int): The records dropped in this process because the queue was full.
+    """
+
+    def __init__(
+        self,
+        logger_name: Optional[str] = None,
+        formatter: Optional[logging.Formatter] = None,
+    ) -> None:
+        self.logger_name = logger_name
+        self.formatter = formatter or JsonFormatter()
+        self.path = DEFAULT_LOG_PATH
+        self.max_bytes = DEFAULT_MAX_BYTES
+        self.backup_count = DEFAULT_BACKUP_COUNT
+        self.level = logging.INFO
+        self.dropped = 0
+        self.handler = _PipelineHandler(self)
+        self._queue: Optional[queue.Queue] = None
+        self._listener: Optional[QueueListener] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        atexit.register(self.stop)
+
+    def configure(
+        self,
+        path: str = DEFAULT_LOG_PATH,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backup_count: int = DEFAULT_BACKUP_COUNT,
+        level: Union[int, str] = logging.INFO,
+    ) -> None:
+        """
+        Sets where and what the pipeline writes, and installs it on its logger.
+
+        Records already queued are written with the previous settings first.
+        """
+        self.stop()
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.level = (
+            logging.getLevelName(level.upper()) if isinstance(level, str) else level
+        )
+        self.handler.setLevel(self.level)
+
+        target = logging.getLogger(self.logger_name)
+        if self.logger_name is not None:
+            target.setLevel(self.level)
+            target.propagate = False
+        if self.handler not in target.handlers:
+            target.addHandler(self.handler)
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            file_handler = SharedRotatingFileHandler(
+                self.path, maxBytes=self.max_bytes, backupCount=self.backup_count
+            )
+            file_handler.setFormatter(self.formatter)
+
+            self._queue = queue.Queue(QUEUE_SIZE)
+            self._listener = QueueListener(self._queue, file_handler)
+            self._listener.start()
+            self._pid = os.getpid()
+            self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """
+        Queues a record for the writer thread of this process, without waiting.
+        """
+        if self._pid != os.getpid():
+            self._start()
+        records = self._queue
+        try:
+            if records is not None:
+                records.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            metrics.inc("log_records_dropped_total")
+
+    def stop(self) -> None:
+        """
+        Writes the queued records and stops the writer thread of this process.
+        """
+        with self._lock:
+            if self._pid != os.getpid() or self._listener is None:
+                return
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+            self._listener = None
+            self._queue = None
+            self._pid = None
+
+    def remove(self) -> None:
+        """
+        Stops the pipeline and takes it off its logger.
+        """
+        self.stop()
+        logging.getLogger(self.logger_name).removeHandler(self.handler)
+
+
+log_pipeline = LogPipeline()
 
 
 def log_exceptions(app):
     """
     Decorator function that logs exceptions that occur within the decorated function.
 
+    Apply it below the route decorator, so the function Flask registers is the wrapped one.
+    Each exception is logged once, with its traceback and the details of the request.
+
     Parameters:
     - app: The Flask application object.
 
     Returns:
     - decorator: The decorator function that logs exceptions and returns an error message if an exception occurs.
     """
-    logger = logging.getLogger(__name__)
-    logger.setLevel(logging.INFO)
-
-    formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-
-    handler = logging.FileHandler("app.log")
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
 
     def decorator(f):
         @wraps(f)
@@ -30,16 +270,16 @@ def log_exceptions(app):
             try:
                 return f(*args, **kwargs)
             except Exception as e:
-                now = datetime.utcnow()
-                logger.exception("An error occurred at %s: %s", now, str(e))
-
-                if request:
-                    client_details = {
-                        "User-Agent": request.headers.get("User-Agent"),
-                        "Remote-Addr": request.remote_addr,
-                        # Add more details as needed
+                details = {}
+                if has_request_context():
+                    details = {
+                        "endpoint": request.endpoint,
+                        "method": request.method,
+                        "path": request.path,
+                        "user_agent": request.headers.get("User-Agent"),
+                        "remote_addr": request.remote_addr,
                     }
-                    logger.info("Client Details: %s", client_details)
+                logger.exception("An error occurred: %s", str(e), extra=details)
 
                 return (
                     "An error occurred. Please check the logs for more information.",
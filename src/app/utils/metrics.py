@@ -0,0 +1,346 @@
+"""
+Counters and timings of the calculation hot path, exposed in the Prometheus text format.
+
+Code reports to the process-wide `metrics` registry:
+
+    with metrics.stage("visibility"):
+        ...
+    metrics.inc("astro_transforms_total")
+
+Each stage duration is observed in the astro_stage_seconds histogram and, during a
+request, kept for its Server-Timing header. Every gunicorn worker has its own registry;
+with a MetricsStore they publish snapshots to one SQLite file and /metrics adds them up.
+"""
+
+import math
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from app.utils.cache import shared_connection
+
+# Upper bounds in seconds of the histogram buckets, +Inf is implicit
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Seconds between two snapshots published by a worker
+PUBLISH_INTERVAL = 1.0
+
+# name: (type, help) of every metric reported by the application
+METRIC_DESCRIPTIONS = {
+    "astro_stage_seconds": (
+        "histogram",
+        "Duration of each stage of a calculation.",
+    ),
+    "astro_transforms_total": (
+        "counter",
+        "Calls to astropy's transform_to.",
+    ),
+    "astro_transform_samples_total": (
+        "counter",
+        "Coordinates transformed by transform_to (array elements).",
+    ),
+    "astro_scan_samples_total": (
+        "counter",
+        "Night samples scanned for visibility (objects x minutes).",
+    ),
+    "astro_shot_search_steps_total": (
+        "counter",
+        "Start times evaluated when solving the number of shots.",
+    ),
+    "astro_twilight_solves_total": (
+        "counter",
+        "Night windows solved with astroplan (night window cache misses).",
+    ),
+    "astro_visibility_table_lookups_total": (
+        "counter",
+        "Lookups in the precomputed visibility tables, by result.",
+    ),
+    "astro_result_cache_lookups_total": (
+        "counter",
+        "Lookups in the calculation result cache, by result.",
+    ),
+    "log_records_dropped_total": (
+        "counter",
+        "Log records dropped because the queue of the log writer was full.",
+    ),
+    "http_cache_lookups_total": (
+        "counter",
+        "Responses of the cached JSON endpoints, by endpoint and result.",
+    ),
+    "http_requests_total": (
+        "counter",
+        "Requests served, by endpoint and status code.",
+    ),
+    "http_request_seconds": (
+        "histogram",
+        "Duration of the requests, by endpoint.",
+    ),
+}
+
+# The stage timings of the current request, or None outside of a request
+_request_timings: ContextVar[Optional[dict]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def _labels_key(labels: dict) -> tuple:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class MetricsRegistry:
+    """
+    Thread-safe counters and histograms of one process.
+
+    Attributes:
+        buckets (tuple): The upper bounds of the histogram buckets in seconds.
+    """
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self._counters: dict = defaultdict(float)
+        self._histograms: dict = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        """
+        Adds amount to a counter.
+        """
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._counters[key] += amount
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """
+        Records a value in a histogram.
+        """
+        key = (name, _labels_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram[index] += 1
+            # The last two slots hold the sum and the count (the +Inf bucket)
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Times a block as one stage of a calculation.
+
+        The duration goes to astro_stage_seconds and, during a request, to its
+        Server-Timing header (stages repeated in a request add up).
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            self.observe("astro_stage_seconds", duration, stage=name)
+            timings = _request_timings.get()
+            if timings is not None:
+                timings[name] = timings.get(name, 0.0) + duration
+
+    def snapshot(self) -> dict:
+        """
+        Returns a copy of every counter and histogram, to publish or render.
+        """
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "histograms": {
+                    key: list(values) for key, values in self._histograms.items()
+                },
+            }
+
+    def clear(self) -> None:
+        """
+        Resets every counter and histogram.
+        """
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+metrics = MetricsRegistry()
+
+
+def start_request_timings() -> None:
+    """
+    Starts collecting the stage timings of the current request (see stage).
+    """
+    _request_timings.set({})
+
+
+def request_timings() -> dict:
+    """
+    Returns the stage timings of the current request in seconds, by stage.
+    """
+    return _request_timings.get() or {}
+
+
+def server_timing_header(timings: dict, total: Optional[float] = None) -> str:
+    """
+    Formats stage timings as a Server-Timing header value (durations in milliseconds).
+
+    Args:
+        timings (dict): Seconds by stage.
+        total (float, optional): The duration of the whole request in seconds.
+
+    Returns:
+        str: The header value, for example "visibility;dur=31.2, total;dur=40.5".
+    """
+    entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items()]
+    if total is not None:
+        entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def merge_snapshots(snapshots) -> dict:
+    """
+    Adds up the snapshots of several processes.
+    """
+    merged = {"counters": defaultdict(float), "histograms": {}}
+    for snapshot in snapshots:
+        for key, value in snapshot["counters"].items():
+            merged["counters"][key] += value
+        for key, values in snapshot["histograms"].items():
+            total = merged["histograms"].setdefault(key, [0] * len(values))
+            for index, value in enumerate(values):
+                total[index] += value
+    return merged
+
+
+def _format_labels(labels: tuple, extra: tuple = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def render_metrics(snapshot: dict, buckets: tuple = DEFAULT_BUCKETS) -> str:
+    """
+    Renders a snapshot in the Prometheus text exposition format (version 0.0.4).
+    """
+    families = defaultdict(list)
+    for (name, labels), value in sorted(snapshot["counters"].items()):
+        families[name].append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    for (name, labels), values in sorted(snapshot["histograms"].items()):
+        for bound, count in zip(buckets, values):
+            families[name].append(
+                f"{name}_bucket{_format_labels(labels, (('le', str(bound)),))} {count}"
+            )
+        families[name].append(
+            f"{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {values[-1]}"
+        )
+        families[name].append(
+            f"{name}_sum{_format_labels(labels)} {_format_value(values[-2])}"
+        )
+        families[name].append(f"{name}_count{_format_labels(labels)} {values[-1]}")
+
+    lines = []
+    for name, samples in families.items():
+        kind, description = METRIC_DESCRIPTIONS.get(name, ("untyped", name))
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+
+class MetricsStore:
+    """
+    The latest snapshot of every worker, in a SQLite file they all share.
+
+    Workers publish at most every PUBLISH_INTERVAL seconds; collect adds up the snapshots
+    of the processes still alive. Like SQLiteCache, any SQLite or file system error is
+    ignored, so metrics never fail a request.
+    """
+
+    def __init__(self, path: str, interval: float = PUBLISH_INTERVAL) -> None:
+        self.path = path
+        self.interval = interval
+        self._local = threading.local()
+        self._published_at = 0.0
+
+        try:
+            with self._connection() as connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS snapshots ("
+                    "pid INTEGER PRIMARY KEY, snapshot BLOB, updated_at REAL)"
+                )
+        except (sqlite3.Error, OSError):
+            pass
+
+    def _connection(self) -> sqlite3.Connection:
+        return shared_connection(self._local, self.path, timeout=1)
+
+    def publish(self, registry: MetricsRegistry, force: bool = False) -> None:
+        """
+        Stores the snapshot of this process, unless one was stored less than interval
+        seconds ago.
+        """
+        now = time.monotonic()
+        if not force and now - self._published_at < self.interval:
+            return
+        self._published_at = now
+        try:
+            with self._connection() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?)",
+                    (os.getpid(), pickle.dumps(registry.snapshot()), time.time()),
+                )
+        except (sqlite3.Error, OSError):
+            pass
+
+    def collect(self, registry: MetricsRegistry) -> dict:
+        """
+        Returns the sum of the snapshots of every live worker, this one up to date.
+        """
+        self.publish(registry, force=True)
+        try:
+            rows = self._connection().execute("SELECT pid, snapshot FROM snapshots")
+            snapshots = {pid: pickle.loads(snapshot) for pid, snapshot in rows}
+        except (sqlite3.Error, OSError):
+            return registry.snapshot()
+
+        for pid in list(snapshots):
+            if pid != os.getpid() and not _process_alive(pid):
+                del snapshots[pid]
+                try:
+                    with self._connection() as connection:
+                        connection.execute(
+                            "DELETE FROM snapshots WHERE pid = ?", (pid,)
+                        )
+                except (sqlite3.Error, OSError):
+                    pass
+
+        return merge_snapshots(snapshots.values())
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -0,0 +1,88 @@
+from typing import TYPE_CHECKING
+
+from app.utils.cache import LRUCache, TieredCache
+from app.utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from astropy.coordinates import EarthLocation
+    from astropy.time import Time
+
+# Sites are bucketed before solving twilight: 0.01 degrees is about 1 km and shifts the
+# twilight times by a few seconds at most, 100 m of height by well under a second.
+LATLON_DECIMALS = 2
+HEIGHT_STEP_METERS = 100
+
+# The application attaches the cache shared by all workers as night_window_cache.shared
+night_window_cache = TieredCache(
+    LRUCache(maxsize=2048, ttl=7 * 24 * 3600), namespace="night_window"
+)
+
+
+def night_window_key(location: "EarthLocation", observation_time: "Time") -> tuple:
+    """
+    Build the cache key of a night window: the rounded site and the observation time.
+
+    Parameters:
+    - location (EarthLocation): The observer's location.
+    - observation_time (Time): The moment the night is searched from.
+
+    Returns:
+    - key (tuple): (latitude, longitude, height, observation time to the minute).
+    """
+    import astropy.units as u
+
+    height = location.height.to_value(u.m)
+
+    return (
+        round(float(location.lat.degree), LATLON_DECIMALS),
+        round(float(location.lon.degree), LATLON_DECIMALS),
+        int(round(height / HEIGHT_STEP_METERS) * HEIGHT_STEP_METERS),
+        observation_time.utc.isot[:16],
+    )
+
+
+def _solve_night_window(key: tuple) -> tuple:
+    # astroplan is the slowest import of the stack; only twilight searches need it
+    import astropy.units as u
+    from astroplan import Observer
+    from astropy.coordinates import EarthLocation
+    from astropy.time import Time, TimeDelta
+
+    latitude, longitude, height, observation_time = key
+
+    observer = Observer(
+        location=EarthLocation(
+            lat=latitude * u.deg, lon=longitude * u.deg, height=height * u.m
+        )
+    )
+    observation_time = Time(observation_time, scale="utc")
+
+    metrics.inc("astro_twilight_solves_total")
+    with metrics.stage("twilight"):
+        start_time = observer.twilight_evening_astronomical(
+            observation_time, which="next"
+        )
+        next_day = observation_time + TimeDelta(1, format="jd")
+        dawn_time = observer.twilight_morning_astronomical(next_day, which="nearest")
+
+    return start_time, dawn_time
+
+
+def get_night_window(location: "EarthLocation", observation_time: "Time") -> tuple:
+    """
+    Get the astronomical night following an observation time, solving it only once per site.
+
+    Twilight is solved for the rounded site of night_window_key, so every request that shares
+    a cache entry gets exactly the same times.
+
+    Parameters:
+    - location (EarthLocation): The observer's location.
+    - observation_time (Time): The moment the night is searched from.
+
+    Returns:
+    - start_time (Time): The end of the evening astronomical twilight.
+    - dawn_time (Time): The start of the morning astronomical twilight.
+    """
+    key = night_window_key(location, observation_time)
+
+    return night_window_cache.get_or_compute(key, lambda: _solve_night_window(key))
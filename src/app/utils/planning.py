@@ -0,0 +1,297 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+
+from app.utils.calculation_service import (
+    calculation_cache_key,
+    perform_astro_calculations,
+)
+
+DEFAULT_WORKERS = 2
+DEFAULT_TIMEOUT = 30
+MAX_NIGHTS = 31
+
+# The error of the nights whose worker was stopped before they finished
+INTERRUPTED_ERROR = "The calculation was interrupted, try again."
+
+# The fields of a calculation result reported for each night
+NIGHT_FIELDS = (
+    "night_start",
+    "night_end",
+    "visible_at",
+    "visible_until",
+    "num_shoots",
+    "total_time_minutes",
+    "total_time_seconds",
+)
+
+# Imported once by the fork server, so each pool worker starts with them loaded
+PRELOADED_MODULES = ["app.utils.calculation_service", "app.utils.astro_utils"]
+
+# One pool per process, created on first use so none is inherited through a fork
+_executor = {"pool": None, "pid": None, "workers": None, "initargs": ()}
+_executor_lock = threading.Lock()
+
+
+def init_planning_worker(
+    iers_mode: str = "offline",
+    iers_data_dir: Optional[str] = None,
+    shared_cache: Optional[dict] = None,
+    warmup: bool = False,
+) -> None:
+    """
+    Prepare a pool worker process the way create_app prepares a web worker.
+
+    Pool workers are started by a fork server, not forked from the web worker, so they do
+    not inherit its IERS configuration or its caches.
+
+    Args:
+        iers_mode (str, optional): The IERS mode (see configure_iers).
+        iers_data_dir (str, optional): The directory of the staged IERS tables.
+        shared_cache (dict, optional): The SQLiteCache arguments of the cache the web
+            workers share night windows through, if any.
+        warmup (bool, optional): Whether to run warm_up before the first night.
+    """
+    from app.utils.astro_utils import warm_up
+    from app.utils.cache import SQLiteCache
+    from app.utils.iers_data import configure_iers
+    from app.utils.night_window import night_window_cache
+
+    configure_iers(iers_mode, iers_data_dir)
+    if shared_cache and shared_cache.get("path"):
+        night_window_cache.shared = SQLiteCache(**shared_cache)
+    if warmup:
+        warm_up()
+
+
+def configure_planning_workers(
+    iers_mode: str = "offline",
+    iers_data_dir: Optional[str] = None,
+    shared_cache: Optional[dict] = None,
+    warmup: bool = False,
+) -> None:
+    """
+    Set the arguments of init_planning_worker for the pools created from now on.
+
+    Called by create_app with its own configuration; pools already running keep theirs.
+    """
+    with _executor_lock:
+        _executor["initargs"] = (iers_mode, iers_data_dir, shared_cache, warmup)
+
+
+def get_planning_executor(workers: int) -> ProcessPoolExecutor:
+    """
+    Return the process pool of the current process, creating it on first use.
+
+    The workers are started by a fork server instead of being forked from the web
+    worker: the web worker runs threads (the log listener, the job runner), and forking a
+    process while another of its threads holds a lock can leave the child deadlocked. The
+    fork server has preloaded PRELOADED_MODULES, and each worker runs
+    init_planning_worker with the arguments given to configure_planning_workers.
+
+    Args:
+        workers (int): The number of worker processes.
+
+    Returns:
+        ProcessPoolExecutor: The pool.
+    """
+    with _executor_lock:
+        if _executor["pid"] != os.getpid() or _executor["workers"] != workers:
+            if _executor["pid"] == os.getpid():
+                _executor["pool"].shutdown(wait=False, cancel_futures=True)
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload(PRELOADED_MODULES)
+            _executor.update(
+                pool=ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=context,
+                    initializer=init_planning_worker,
+                    initargs=_executor["initargs"],
+                ),
+                pid=os.getpid(),
+                workers=workers,
+            )
+        return _executor["pool"]
+
+
+def discard_planning_executor(pool: ProcessPoolExecutor) -> None:
+    """
+    Stop a pool and its worker processes; the next plan starts a new pool.
+
+    Cancelling a future does not stop a night that is already running, so the workers
+    are terminated: a plan that timed out leaves no work behind. Plans sharing the pool
+    get an error for their unfinished nights.
+
+    Args:
+        pool (ProcessPoolExecutor): The pool returned by get_planning_executor.
+    """
+    with _executor_lock:
+        if _executor["pool"] is pool:
+            _executor.update(pool=None, pid=None, workers=None)
+
+    # No public way to stop running workers before Python 3.14
+    terminate_workers = getattr(pool, "terminate_workers", None)
+    processes = list((getattr(pool, "_processes", None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    if terminate_workers is not None:
+        terminate_workers()
+    else:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+
+def night_dates(start_date, nights: int) -> list:
+    """
+    List the observation dates of a plan.
+
+    Args:
+        start_date (date): The first night.
+        nights (int): The number of consecutive nights.
+
+    Returns:
+        list[date]: The dates, in order.
+    """
+    return [start_date + timedelta(days=offset) for offset in range(nights)]
+
+
+def _night_summary(observation_date, result: dict) -> dict[str, Any]:
+    night = {"date": observation_date.isoformat(), "error": result.get("error")}
+    if not night["error"]:
+        night.update({field: result.get(field) for field in NIGHT_FIELDS})
+    return night
+
+
+def _visible_minutes(night: dict) -> int:
+    if night["error"] or not night.get("visible_at"):
+        return 0
+    visible_at, visible_until = (
+        datetime.strptime(night[field], "%Y-%m-%dT%H:%MZ")
+        for field in ("visible_at", "visible_until")
+    )
+    return int((visible_until - visible_at).total_seconds() // 60)
+
+
+def plan_nights(
+    form_data,
+    nights: int,
+    calculate_camera_fov: Callable,
+    get_object_data: Callable,
+    calculate_max_shooting_time: Callable,
+    calculate_number_of_shoots: Callable,
+    result_cache: Optional[Any] = None,
+    workers: int = DEFAULT_WORKERS,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> dict[str, Any]:
+    """
+    Run perform_astro_calculations for consecutive nights and summarize each of them.
+
+    Nights already in result_cache are answered from it; the others are spread over a
+    pool of worker processes, and their results stored back in the cache so the index
+    page finds them too.
+
+    Args:
+        form_data (dict): A dictionary containing the form data; its observation_date is
+            the first night.
+        nights (int): The number of nights, up to MAX_NIGHTS.
+        calculate_camera_fov (function): A function for calculating the camera field of view.
+        get_object_data (function): A function for retrieving object data.
+        calculate_max_shooting_time (function): A function for calculating the maximum shooting time.
+        calculate_number_of_shoots (function): A function for calculating the number of shoots.
+        result_cache (LRUCache | SQLiteCache | TieredCache, optional): The calculation
+            result cache of perform_astro_calculations.
+        workers (int, optional): The number of worker processes; 0 computes every night
+            in the calling process.
+        timeout (float, optional): The seconds to wait for the whole plan. Nights not done
+            by then are reported with an error.
+
+    Returns:
+        dict: The "nights", in date order, each with its "date", "error" and NIGHT_FIELDS,
+        and the "best" date: the one the object stays visible the longest, or None.
+    """
+    if not 1 <= nights <= MAX_NIGHTS:
+        raise ValueError(f"nights must be between 1 and {MAX_NIGHTS}")
+
+    calculators = (
+        calculate_camera_fov,
+        get_object_data,
+        calculate_max_shooting_time,
+        calculate_number_of_shoots,
+    )
+
+    results = {}
+    pending = []
+    for observation_date in night_dates(form_data["observation_date"], nights):
+        night_form = {**form_data, "observation_date": observation_date}
+        cached = (
+            result_cache.get(calculation_cache_key(night_form))
+            if result_cache is not None
+            else None
+        )
+        if cached is not None:
+            results[observation_date] = cached
+        else:
+            pending.append((observation_date, night_form))
+
+    if workers > 0 and len(pending) > 1:
+        executor = get_planning_executor(workers)
+        futures = {}
+        try:
+            for observation_date, night_form in pending:
+                future = executor.submit(
+                    perform_astro_calculations, night_form, *calculators, ""
+                )
+                futures[future] = observation_date
+        except (BrokenProcessPool, RuntimeError):
+            # Stopped by a concurrent plan (or a worker died) since it was returned
+            discard_planning_executor(executor)
+            for future in futures:
+                future.cancel()
+            futures = {}
+            for observation_date, _ in pending:
+                results[observation_date] = {"error": INTERRUPTED_ERROR}
+        done, not_done = wait(futures, timeout=timeout)
+
+        for future in not_done:
+            results[futures[future]] = {
+                "error": f"The calculation did not finish within {timeout:g} seconds."
+            }
+        if not_done:
+            # Stops the nights still running and drops the queued ones
+            discard_planning_executor(executor)
+
+        for future in done:
+            try:
+                results[futures[future]] = future.result()
+            except BrokenProcessPool:
+                # A worker died, or a concurrent plan timed out and stopped the pool
+                discard_planning_executor(executor)
+                results[futures[future]] = {"error": INTERRUPTED_ERROR}
+    else:
+        for observation_date, night_form in pending:
+            results[observation_date] = perform_astro_calculations(
+                night_form, *calculators, ""
+            )
+
+    if result_cache is not None:
+        for observation_date, night_form in pending:
+            # Errors, timed-out and interrupted nights included, are never cached
+            if not results[observation_date].get("error"):
+                result_cache.set(
+                    calculation_cache_key(night_form), results[observation_date]
+                )
+
+    summaries = [
+        _night_summary(observation_date, results[observation_date])
+        for observation_date in sorted(results)
+    ]
+    best = max(summaries, key=_visible_minutes, default=None)
+
+    return {
+        "nights": summaries,
+        "best": best["date"] if best and _visible_minutes(best) > 0 else None,
+    }
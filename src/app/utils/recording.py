@@ -0,0 +1,189 @@
+"""
+Anonymized samples of production requests, to replay them under load.
+
+With the [RECORDING] section of config.ini enabled, a share of the autocomplete, camera
+and calculation requests is written as one JSON object per line, from a background
+thread like the logs. benchmarks.load_test replays these files against a local gunicorn
+or the application in-process.
+
+Only the fields the calculations use are kept: no address, user agent, cookie or CSRF
+token. Coordinates are rounded to the buckets of the night windows (about 1 km) and
+heights to 100 m, so replays hit the night window cache as the recorded requests did,
+and observation dates are kept as days from the day of the request.
+"""
+
+import json
+import logging
+import random
+from datetime import date, timedelta
+from typing import Any, Optional
+
+from app.utils.logger import DEFAULT_BACKUP_COUNT, DEFAULT_MAX_BYTES, LogPipeline
+from app.utils.night_window import HEIGHT_STEP_METERS, LATLON_DECIMALS
+
+# Bump when the recorded entries change, so replays can tell old files apart
+RECORDING_FORMAT_VERSION = 1
+
+RECORDING_LOGGER = "app.recorded_requests"
+
+# endpoint: where its parameters are read from
+RECORDED_ENDPOINTS = {
+    "search_objects.search_objects": "args",
+    "camera.cameras_list": "args",
+    "index.index": "form",
+    "api.calculate": "json",
+}
+
+RECORDED_ARGS = ("q", "limit")
+
+# The calculation fields kept; camera and object names are public catalog data
+RECORDED_FIELDS = (
+    "latitude",
+    "longitude",
+    "altitude",
+    "sensor_height_mm",
+    "sensor_width_mm",
+    "focal_length",
+    "shoot_interval",
+    "aperture",
+    "number_of_pixels_in_width",
+    "number_of_pixels_in_height",
+    "camera_position",
+    "observation_date",
+    "min_degrees",
+    "object_name",
+    "object_id",
+    "camera",
+)
+
+
+def _rounded(value: Any, digits: int) -> Optional[float]:
+    try:
+        return round(float(value), digits)
+    except (TypeError, ValueError):
+        # Free text in a coordinate field could be anything: it is not kept
+        return None
+
+
+def anonymize_values(kind: str, values: dict, today: date) -> dict:
+    """
+    Keeps the parameters of a request worth replaying, anonymized.
+
+    Args:
+        kind (str): Where the endpoint reads them from: "args", "form" or "json".
+        values (dict): The query string, form or JSON body of the request.
+        today (date): The day of the request.
+
+    Returns:
+        dict: The parameters to record. A calculation keeps its observation date as
+        "observation_day", the days from today.
+    """
+    if kind == "args":
+        return {name: values[name] for name in RECORDED_ARGS if name in values}
+
+    recorded = {
+        name: values[name]
+        for name in RECORDED_FIELDS
+        if values.get(name) not in (None, "")
+    }
+
+    for name in ("latitude", "longitude"):
+        if name in recorded:
+            recorded[name] = _rounded(recorded[name], LATLON_DECIMALS)
+    if "altitude" in recorded:
+        altitude = _rounded(recorded["altitude"], 0)
+        recorded["altitude"] = (
+            None
+            if altitude is None
+            else int(round(altitude / HEIGHT_STEP_METERS) * HEIGHT_STEP_METERS)
+        )
+
+    observation_date = recorded.pop("observation_date", None)
+    if observation_date is not None:
+        try:
+            days = (date.fromisoformat(str(observation_date)) - today).days
+            recorded["observation_day"] = days
+        except ValueError:
+            pass
+
+    return {name: value for name, value in recorded.items() if value is not None}
+
+
+def restore_values(entry: dict, today: date) -> dict:
+    """
+    Returns the parameters of a recorded request to send it again.
+
+    Args:
+        entry (dict): A recorded request.
+        today (date): The day of the replay: observation dates keep their distance to it.
+
+    Returns:
+        dict: The query string, form or JSON body, as anonymize_values found it.
+    """
+    values = dict(entry["values"])
+    days = values.pop("observation_day", None)
+    if days is not None:
+        values["observation_date"] = (today + timedelta(days=days)).isoformat()
+    return values
+
+
+class RequestRecorder:
+    """
+    Writes a sample of the requests of the RECORDED_ENDPOINTS, anonymized.
+
+    Attributes:
+        sample_rate (float): The share of those requests recorded, from 0 to 1.
+        pipeline (LogPipeline): Writes the entries to a rotated file from a thread.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sample_rate: float = 1.0,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        backup_count: int = DEFAULT_BACKUP_COUNT,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.pipeline = LogPipeline(RECORDING_LOGGER, logging.Formatter("%(message)s"))
+        self.pipeline.configure(path, max_bytes, backup_count)
+        self._logger = logging.getLogger(RECORDING_LOGGER)
+
+    def record(self, request, status: int) -> None:
+        """
+        Records a request, if its endpoint is recorded and it falls in the sample.
+
+        Args:
+            request (Request): The Flask request.
+            status (int): The status code of its response.
+        """
+        kind = RECORDED_ENDPOINTS.get(request.endpoint)
+        if kind is None or random.random() >= self.sample_rate:
+            return
+
+        if kind == "form":
+            if request.method != "POST":
+                return
+            values = request.form
+        elif kind == "json":
+            values = request.get_json(silent=True)
+            if not isinstance(values, dict):
+                return
+        else:
+            values = request.args
+
+        entry = {
+            "version": RECORDING_FORMAT_VERSION,
+            "endpoint": request.endpoint,
+            "method": request.method,
+            "path": request.path,
+            "kind": kind,
+            "values": anonymize_values(kind, values, date.today()),
+            "status": status,
+        }
+        self._logger.info(json.dumps(entry))
+
+    def close(self) -> None:
+        """
+        Writes the queued entries and stops recording.
+        """
+        self.pipeline.remove()
@@ -8,6 +8,33 @@ ROUTE = None
 STATIC_URL_PATH = None
 SECRET_KEY = None
 DEBUG = True
+WARMUP = False
+RESULT_CACHE = None
+SHARED_CACHE = None
+IERS = None
+PLANNING = None
+API = None
+VISIBILITY = None
+METRICS = None
+LOGGING = None
+HTTP_CACHE = None
+RECORDING = None
+RATELIMIT_ENABLED = True
+
+
+def _optional_path(config, section, option, config_path):
+    """
+    Read an optional path option; relative paths are resolved from the project root.
+    """
+    path = config.get(section, option, fallback="")
+    if not path:
+        return None
+    return os.path.normpath(os.path.join(os.path.dirname(config_path), path))
+
+
+def _optional_float(config, section, option):
+    value = config.get(section, option, fallback="")
+    return float(value) if value else None
 
 
 def load_config():
@@ -17,7 +44,9 @@ def load_config():
     Returns:
         None
     """
-    global ROUTE, STATIC_URL_PATH, SECRET_KEY, DEBUG
+    global ROUTE, STATIC_URL_PATH, SECRET_KEY, DEBUG, WARMUP, RESULT_CACHE, SHARED_CACHE, IERS
+    global PLANNING, API, VISIBILITY, METRICS, LOGGING, HTTP_CACHE, RECORDING
+    global RATELIMIT_ENABLED
 
     load_dotenv()
 
@@ -30,10 +59,119 @@ def load_config():
     ROUTE = config.get("APP", "route")
     STATIC_URL_PATH = config.get("APP", "STATIC_URL_PATH")
     SECRET_KEY = os.environ.get("SECRET_KEY")
+    # Only for a local instance under load tests, where every request comes from one address
+    RATELIMIT_ENABLED = os.environ.get("RATELIMIT_ENABLED", "true").lower() not in (
+        "0",
+        "false",
+        "no",
+    )
+    WARMUP = config.getboolean("APP", "WARMUP", fallback=False)
+
+    RESULT_CACHE = {
+        "backend": config.get("CACHE", "RESULT_BACKEND", fallback="memory"),
+        "maxsize": config.getint("CACHE", "RESULT_MAXSIZE", fallback=1024),
+        "ttl": _optional_float(config, "CACHE", "RESULT_TTL"),
+        "path": _optional_path(config, "CACHE", "RESULT_PATH", config_path),
+    }
+    # Night windows and catalog visibility, shared by every worker (no path: per worker)
+    SHARED_CACHE = {
+        "path": _optional_path(config, "CACHE", "SHARED_PATH", config_path),
+        "maxsize": config.getint("CACHE", "SHARED_MAXSIZE", fallback=4096),
+        "ttl": _optional_float(config, "CACHE", "SHARED_TTL"),
+    }
+
+    # Earth orientation and leap second data (see app.utils.iers_data)
+    IERS = {
+        "mode": config.get("IERS", "MODE", fallback="offline"),
+        "data_dir": _optional_path(config, "IERS", "DATA_DIR", config_path),
+        "max_age_days": config.getfloat("IERS", "MAX_AGE_DAYS", fallback=30),
+    }
+
+    # Multi-night plans (see app.utils.planning); 0 workers computes them in the worker
+    PLANNING = {
+        "workers": config.getint("PLANNING", "WORKERS", fallback=2),
+        "timeout": config.getfloat("PLANNING", "TIMEOUT", fallback=30),
+    }
+
+    # The JSON calculation API (see app.routes.api); no job path keeps jobs per worker
+    API = {
+        "workers": config.getint("API", "WORKERS", fallback=4),
+        "queue_size": config.getint("API", "QUEUE_SIZE", fallback=32),
+        "wait_seconds": config.getfloat("API", "WAIT", fallback=5),
+        "job_path": _optional_path(config, "API", "JOB_PATH", config_path),
+        "job_ttl": config.getfloat("API", "JOB_TTL", fallback=600),
+    }
+
+    # Precomputed visibility tables (see app.search.visibility_table), one per site:
+    # name = latitude, longitude, height in meters
+    VISIBILITY = {
+        "directory": _optional_path(config, "VISIBILITY", "DIRECTORY", config_path),
+        "days": config.getint("VISIBILITY", "DAYS", fallback=366),
+        "thresholds": [
+            int(value)
+            for value in config.get(
+                "VISIBILITY", "THRESHOLDS", fallback="5, 10, 20, 30"
+            ).split(",")
+        ],
+        "sites": {
+            name: tuple(float(value) for value in coordinates.split(","))
+            for name, coordinates in (
+                config.items("SITES") if config.has_section("SITES") else []
+            )
+        },
+    }
+
+    # Calculation metrics at /metrics (see app.utils.metrics); no path reports only the
+    # worker answering the scrape
+    METRICS = {
+        "enabled": config.getboolean("METRICS", "ENABLED", fallback=True),
+        "server_timing": config.getboolean("METRICS", "SERVER_TIMING", fallback=False),
+        "path": _optional_path(config, "METRICS", "PATH", config_path),
+    }
+
+    # JSON log lines written by a background thread per worker (see app.utils.logger)
+    LOGGING = {
+        "path": _optional_path(config, "LOGGING", "PATH", config_path) or "app.log",
+        "max_bytes": config.getint("LOGGING", "MAX_BYTES", fallback=10 * 1024 * 1024),
+        "backup_count": config.getint("LOGGING", "BACKUP_COUNT", fallback=5),
+        "level": config.get("LOGGING", "LEVEL", fallback="INFO").upper(),
+    }
+
+    # Autocomplete responses (see app.utils.http_cache)
+    HTTP_CACHE = {
+        "maxsize": config.getint("HTTP_CACHE", "MAXSIZE", fallback=2048),
+        "max_age": config.getint("HTTP_CACHE", "MAX_AGE", fallback=3600),
+        "compress": config.getboolean("HTTP_CACHE", "COMPRESS", fallback=True),
+        "min_compress_bytes": config.getint(
+            "HTTP_CACHE", "MIN_COMPRESS_BYTES", fallback=1024
+        ),
+    }
+
+    # Anonymized request samples to replay under load (see app.utils.recording)
+    RECORDING = {
+        "enabled": config.getboolean("RECORDING", "ENABLED", fallback=False),
+        "path": _optional_path(config, "RECORDING", "PATH", config_path)
+        or "requests.jsonl",
+        "sample_rate": config.getfloat("RECORDING", "SAMPLE_RATE", fallback=0.1),
+        "max_bytes": config.getint("RECORDING", "MAX_BYTES", fallback=10 * 1024 * 1024),
+        "backup_count": config.getint("RECORDING", "BACKUP_COUNT", fallback=5),
+    }
 
     return {
         "route": ROUTE,
         "SECRET_KEY": SECRET_KEY,
         "STATIC_URL_PATH": STATIC_URL_PATH,
         "DEBUG": DEBUG,
+        "WARMUP": WARMUP,
+        "RESULT_CACHE": RESULT_CACHE,
+        "SHARED_CACHE": SHARED_CACHE,
+        "IERS": IERS,
+        "PLANNING": PLANNING,
+        "API": API,
+        "VISIBILITY": VISIBILITY,
+        "METRICS": METRICS,
+        "LOGGING": LOGGING,
+        "HTTP_CACHE": HTTP_CACHE,
+        "RECORDING": RECORDING,
+        "RATELIMIT_ENABLED": RATELIMIT_ENABLED,
     }
@@ -0,0 +1,407 @@
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from app.search.coordinate_table import TABLE_FORMAT_VERSION, CoordinateTable
+from app.utils.astro_utils import night_time_grid
+from app.utils.cache import LRUCache, TieredCache
+from app.utils.calculation_service import KEY_HEIGHT_STEP_METERS, KEY_LATLON_DECIMALS
+from app.utils.drift import (
+    SIDEREAL_RATE_DEG_PER_SEC,
+    altaz_from_equatorial,
+    equatorial_from_altaz,
+    shots_per_position,
+)
+from app.utils.metrics import metrics
+from app.utils.night_window import get_night_window
+
+if TYPE_CHECKING:
+    from astropy.coordinates import EarthLocation
+    from astropy.time import Time
+
+# Objects evaluated per block of the (objects x night minutes) altitude grid
+CHUNK_SIZE = 2048
+
+SORT_KEYS = ("visible_at", "num_shoots", "name")
+
+# Visibility of the whole catalog per site, night and altitude limit (a few hundred KB
+# each). The application attaches the cache shared by all workers as .shared
+visibility_cache = TieredCache(
+    LRUCache(maxsize=64, ttl=24 * 3600), namespace="catalog_visibility"
+)
+
+
+def _format_datetime(value: datetime) -> str:
+    """
+    Format a UTC datetime like the result page does.
+    """
+    return value.strftime("%Y-%m-%dT%H:%MZ")
+
+
+def _format_time(time: "Time"):
+    """
+    Format a Time like the result page does, or None if it is masked (no night).
+    """
+    if time.masked:
+        return None
+    return _format_datetime(time.to_datetime())
+
+
+def rotated_fov(fov_width, fov_height, camera_position, position_angle):
+    """
+    Vectorized apply_fov_rotation: rotate the field of view for many position angles.
+
+    Parameters:
+        fov_width (float): The width of the field of view in arcminutes.
+        fov_height (float): The height of the field of view in arcminutes.
+        camera_position (int): The camera angle in degrees.
+        position_angle (ndarray): The position angles of the objects in degrees.
+
+    Returns:
+        tuple: The rotated widths and heights of the field of view.
+    """
+    if camera_position in [0, 90, -90]:
+        fov_rot_h = fov_width if camera_position == 0 else fov_height
+        fov_rot_v = fov_height if camera_position == 0 else fov_width
+        shape = np.shape(position_angle)
+        return np.full(shape, float(fov_rot_h)), np.full(shape, float(fov_rot_v))
+
+    # Both rotations are about the same axis, so they add up
+    angle = np.radians(camera_position + position_angle)
+    fov_rot_h = fov_width * np.cos(angle) - fov_height * np.sin(angle)
+    fov_rot_v = fov_width * np.sin(angle) + fov_height * np.cos(angle)
+
+    return fov_rot_h, fov_rot_v
+
+
+def visibility_key(
+    location: "EarthLocation", observation_time: "Time", min_degrees: float
+) -> tuple:
+    """
+    Build the cache key of catalog_visibility: the quantized site, the date, the altitude
+    limit and the version of the catalog.
+    """
+    import astropy.units as u
+    from pyongc import DBDATE
+
+    return (
+        TABLE_FORMAT_VERSION,
+        DBDATE,
+        round(float(location.lat.degree), KEY_LATLON_DECIMALS),
+        round(float(location.lon.degree), KEY_LATLON_DECIMALS),
+        int(
+            round(location.height.to_value(u.m) / KEY_HEIGHT_STEP_METERS)
+            * KEY_HEIGHT_STEP_METERS
+        ),
+        observation_time.utc.isot[:16],
+        float(min_degrees),
+    )
+
+
+def first_visible_samples(
+    table: CoordinateTable,
+    location: "EarthLocation",
+    start_time: "Time",
+    dawn_time: "Time",
+    thresholds,
+) -> dict[str, Any]:
+    """
+    Find, for every catalog object, the first sample of the night above each threshold.
+
+    The catalog is transformed to AltAz once, at start_time; the rest of the night is
+    propagated in closed form (see app.utils.drift) on the one-minute grid of
+    night_time_grid, the one get_alt_az_at_degrees scans.
+
+    Parameters:
+        table (CoordinateTable): The catalog coordinates and dimensions.
+        location (EarthLocation): The observer's location.
+        start_time (Time): The start of the night.
+        dawn_time (Time): The end of the night.
+        thresholds (list[float]): The minimum altitudes over the horizon in degrees.
+
+    Returns:
+        dict: The table "position" of every object with coordinates, the "offsets" of the
+        grid in seconds after start_time, the "hour_angle" and "dec" of each object at
+        start_time in degrees, and "first_visible": for each threshold and object, the
+        index of the first grid sample at or above the threshold, or -1.
+    """
+    import astropy.units as u
+    from astropy.coordinates import AltAz, SkyCoord
+
+    time_grid = night_time_grid(start_time, dawn_time)
+    # Without an astronomical night the grid is empty and start_time may be masked
+    offsets = (time_grid - start_time).sec if len(time_grid) > 0 else np.empty(0)
+
+    data = table.data
+    positions = np.flatnonzero(
+        np.isfinite(data["ra_deg"]) & np.isfinite(data["dec_deg"])
+    )
+
+    if len(time_grid) == 0 or len(positions) == 0:
+        empty = np.empty(0)
+        return {
+            "position": empty.astype(int),
+            "offsets": offsets,
+            "hour_angle": empty,
+            "dec": empty,
+            "first_visible": np.full((len(thresholds), 0), -1),
+        }
+
+    first_visible = np.full((len(thresholds), len(positions)), -1)
+
+    latitude = location.lat.degree
+
+    metrics.inc("astro_transforms_total")
+    metrics.inc("astro_transform_samples_total", len(positions))
+    metrics.inc("astro_scan_samples_total", len(positions) * len(time_grid))
+
+    # The only astropy transform: the whole catalog at the start of the night
+    start_altaz = SkyCoord(
+        ra=data["ra_deg"][positions] * u.deg, dec=data["dec_deg"][positions] * u.deg
+    ).transform_to(AltAz(obstime=start_time, location=location))
+    hour_angle, dec = equatorial_from_altaz(
+        start_altaz.alt.degree, start_altaz.az.degree, latitude
+    )
+
+    # sin(alt) = sin(lat) sin(dec) + cos(lat) cos(dec) cos(H0 + w t), with the cosine
+    # expanded so the (objects x minutes) grid needs no trigonometric calls
+    lat_rad = np.radians(latitude)
+    dec_rad = np.radians(dec)
+    hour_angle_rad = np.radians(hour_angle)
+    constant_term = np.sin(lat_rad) * np.sin(dec_rad)
+    cos_term = np.cos(lat_rad) * np.cos(dec_rad) * np.cos(hour_angle_rad)
+    sin_term = np.cos(lat_rad) * np.cos(dec_rad) * np.sin(hour_angle_rad)
+    rotation = np.radians(offsets * SIDEREAL_RATE_DEG_PER_SEC)
+    cos_rotation = np.cos(rotation)
+    sin_rotation = np.sin(rotation)
+    min_sin_alts = np.sin(np.radians(np.asarray(thresholds, dtype=float)))
+
+    for chunk in range(0, len(positions), CHUNK_SIZE):
+        chunk_slice = slice(chunk, chunk + CHUNK_SIZE)
+        sin_altitudes = (
+            constant_term[chunk_slice, None]
+            + cos_term[chunk_slice, None] * cos_rotation[None, :]
+            - sin_term[chunk_slice, None] * sin_rotation[None, :]
+        )
+        for index, min_sin_alt in enumerate(min_sin_alts):
+            above = sin_altitudes >= min_sin_alt
+            first_visible[index, chunk_slice] = np.where(
+                above.any(axis=1), above.argmax(axis=1), -1
+            )
+
+    return {
+        "position": positions,
+        "offsets": offsets,
+        "hour_angle": hour_angle,
+        "dec": dec,
+        "first_visible": first_visible,
+    }
+
+
+def _solve_catalog_visibility(
+    table: CoordinateTable,
+    location: "EarthLocation",
+    observation_time: "Time",
+    min_degrees: float,
+) -> dict[str, Any]:
+    start_time, dawn_time = get_night_window(location, observation_time)
+    samples = first_visible_samples(
+        table, location, start_time, dawn_time, [min_degrees]
+    )
+
+    first_visible = samples["first_visible"][0]
+    visible = first_visible >= 0
+    visible_at = samples["offsets"][first_visible[visible]]
+
+    return {
+        "night_start": start_time,
+        "night_end": dawn_time,
+        "position": samples["position"][visible],
+        "visible_at": visible_at,
+        "hour_angle": samples["hour_angle"][visible]
+        + visible_at * SIDEREAL_RATE_DEG_PER_SEC,
+        "dec": samples["dec"][visible],
+    }
+
+
+def catalog_visibility(
+    table: CoordinateTable,
+    location: "EarthLocation",
+    observation_time: "Time",
+    min_degrees: float,
+) -> dict[str, Any]:
+    """
+    Find when every catalog object first rises above min_degrees during the night.
+
+    The catalog is transformed to AltAz once, at the start of the night; the rest of the
+    night is propagated in closed form (see app.utils.drift) on the same one-minute grid
+    used by get_alt_az_at_degrees. Results do not depend on the equipment, so they are
+    kept in visibility_cache and shared by every request for the same site and night.
+
+    Parameters:
+        table (CoordinateTable): The catalog coordinates and dimensions.
+        location (EarthLocation): The observer's location.
+        observation_time (Time): The date of the observation.
+        min_degrees (float): The minimum altitude over the horizon in degrees.
+
+    Returns:
+        dict: The night window ("night_start", "night_end") and, for every visible object,
+        arrays with its table "position", "visible_at" (seconds after night_start) and its
+        "hour_angle" and "dec" in degrees at that moment.
+    """
+    return visibility_cache.get_or_compute(
+        visibility_key(location, observation_time, min_degrees),
+        lambda: _solve_catalog_visibility(
+            table, location, observation_time, min_degrees
+        ),
+    )
+
+
+def evaluate_catalog(
+    table: CoordinateTable,
+    location: "EarthLocation",
+    observation_time: "Time",
+    fov_width: float,
+    fov_height: float,
+    exposure_time: float,
+    shoot_interval: float,
+    camera_position: int,
+    min_degrees: float,
+) -> dict[str, Any]:
+    """
+    Evaluate every catalog object for one night in a single batched computation.
+
+    Visibility comes from catalog_visibility; the number of shots is evaluated at the
+    moment each object becomes visible.
+
+    Parameters:
+        table (CoordinateTable): The catalog coordinates and dimensions.
+        location (EarthLocation): The observer's location.
+        observation_time (Time): The date of the observation.
+        fov_width (float): The width of the field of view in arcminutes.
+        fov_height (float): The height of the field of view in arcminutes.
+        exposure_time (float): The exposure time in seconds.
+        shoot_interval (float): The interval between shots in seconds.
+        camera_position (int): The camera angle in degrees.
+        min_degrees (float): The minimum altitude over the horizon in degrees.
+
+    Returns:
+        dict: The night window ("night_start", "night_end") and, for every visible object,
+        arrays with its table "position", "visible_at" (seconds after night_start),
+        "altitude", "azimuth" and "num_shoots" (-1 when the size is unknown).
+    """
+    visibility = catalog_visibility(table, location, observation_time, min_degrees)
+    positions = visibility["position"]
+    hour_angle = visibility["hour_angle"]
+    dec = visibility["dec"]
+    latitude = location.lat.degree
+
+    shot_time = exposure_time + shoot_interval
+    altitude, azimuth = altaz_from_equatorial(hour_angle, dec, latitude)
+    next_altitude, next_azimuth = altaz_from_equatorial(
+        hour_angle + shot_time * SIDEREAL_RATE_DEG_PER_SEC, dec, latitude
+    )
+
+    data = table.data
+    major_axis = data["major_axis"][positions]
+    minor_axis = data["minor_axis"][positions]
+    position_angle = np.nan_to_num(data["position_angle"][positions])
+    fov_rot_h, fov_rot_v = rotated_fov(
+        fov_width, fov_height, camera_position, position_angle
+    )
+
+    num_shoots = shots_per_position(
+        next_altitude - altitude,
+        (next_azimuth - azimuth + 180) % 360 - 180,
+        np.abs(fov_rot_h - major_axis) / 2,
+        np.abs(fov_rot_v - minor_axis) / 2,
+        exposure_time,
+        shoot_interval,
+    )
+    known_size = np.isfinite(major_axis) & np.isfinite(minor_axis)
+    num_shoots = np.where(known_size & np.isfinite(num_shoots), num_shoots, -1).astype(
+        int
+    )
+
+    return {
+        "night_start": visibility["night_start"],
+        "night_end": visibility["night_end"],
+        "position": positions,
+        "visible_at": visibility["visible_at"],
+        "altitude": altitude,
+        "azimuth": azimuth,
+        "num_shoots": num_shoots,
+    }
+
+
+def rank_catalog(
+    evaluation: dict[str, Any],
+    table: CoordinateTable,
+    exposure_time: float,
+    shoot_interval: float,
+    sort: str = "visible_at",
+    page: int = 1,
+    per_page: int = 50,
+) -> dict[str, Any]:
+    """
+    Sort and paginate the result of evaluate_catalog into a JSON-ready dictionary.
+
+    Parameters:
+        evaluation (dict): The result of evaluate_catalog.
+        table (CoordinateTable): The table evaluate_catalog was called with.
+        exposure_time (float): The exposure time in seconds.
+        shoot_interval (float): The interval between shots in seconds.
+        sort (str): One of SORT_KEYS. "visible_at" lists the earliest objects first,
+            "num_shoots" the objects that allow most shots first.
+        page (int): The page to return, starting at 1.
+        per_page (int): The number of objects per page.
+
+    Returns:
+        dict: The night window, the total number of visible objects and the requested page.
+    """
+    positions = evaluation["position"]
+    names = table.data["name"][positions]
+
+    if sort == "num_shoots":
+        order = np.lexsort((names, -evaluation["num_shoots"]))
+    elif sort == "name":
+        order = np.argsort(names, kind="stable")
+    else:
+        order = np.lexsort((names, evaluation["visible_at"]))
+
+    night_start = evaluation["night_start"]
+    start_datetime = None if night_start.masked else night_start.to_datetime()
+    page_order = order[(page - 1) * per_page : page * per_page]
+
+    objects = []
+    for index in page_order:
+        row = table.data[positions[index]]
+        num_shoots = int(evaluation["num_shoots"][index])
+        objects.append(
+            {
+                "name": row["name"].decode("utf-8"),
+                "label": row["label"].decode("utf-8", errors="ignore"),
+                "visible_at": _format_datetime(
+                    start_datetime
+                    + timedelta(seconds=float(evaluation["visible_at"][index]))
+                ),
+                "altitude": round(float(evaluation["altitude"][index]), 2),
+                "azimuth": round(float(evaluation["azimuth"][index]), 2),
+                "num_shoots": num_shoots if num_shoots >= 0 else None,
+                "total_time_seconds": (
+                    num_shoots * (exposure_time + shoot_interval)
+                    if num_shoots >= 0
+                    else None
+                ),
+            }
+        )
+
+    return {
+        "night_start": _format_time(night_start),
+        "night_end": _format_time(evaluation["night_end"]),
+        "total": len(positions),
+        "page": page,
+        "per_page": per_page,
+        "objects": objects,
+    }
@@ -0,0 +1,96 @@
+"""
+Compare the vectorized visibility search against the legacy minute-by-minute loop.
+
+Run it on the same host and Python environment as the gunicorn workers:
+
+    PYTHONPATH=src python -m benchmarks.bench_visibility --repeat 5
+"""
+
+import argparse
+import statistics
+import time
+
+import astropy.units as u
+from astroplan import Observer
+from astropy.coordinates import AltAz, SkyCoord
+from astropy.time import TimeDelta
+
+from app.utils.astro_utils import get_alt_az_at_degrees
+from benchmarks.hot_paths import LOCATION, OBSERVATION_TIME
+
+# A mix of early, late and never-visible targets on the pinned night of hot_paths
+CASES = {
+    "M31 over 5 degrees": (10.6848, 41.2690, 5),
+    "M42 over 30 degrees": (83.8221, -5.3911, 30),
+    "M31 over 80 degrees": (10.6848, 41.2690, 80),
+    "never rising": (200.0, -80.0, 5),
+}
+
+
+def legacy_get_alt_az_at_degrees(location, ra, dec, observation_time, min_degrees):
+    """
+    The minute-by-minute implementation that get_alt_az_at_degrees replaced, kept as reference.
+    """
+    observer = Observer(location=location)
+    start_time = observer.twilight_evening_astronomical(observation_time, which="next")
+    next_day = observation_time + TimeDelta(1, format="jd")
+    dawn_time = observer.twilight_morning_astronomical(next_day, which="nearest")
+
+    target = SkyCoord(ra=ra * u.deg, dec=dec * u.deg)
+    time_step = TimeDelta(60, format="sec")
+    current_time = start_time
+
+    while current_time < dawn_time:
+        target_altaz = target.transform_to(
+            AltAz(obstime=current_time, location=location)
+        )
+        if target_altaz.alt >= min_degrees * u.deg:
+            return target_altaz, None, current_time.datetime
+        current_time += time_step
+
+    return None, "not visible", None
+
+
+def time_call(function, repeat, *args):
+    """
+    Run a function several times and return its last result and the median duration in seconds.
+    """
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        durations.append(time.perf_counter() - start)
+    return result, statistics.median(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for name, (ra, dec, min_degrees) in CASES.items():
+        arguments = (LOCATION, ra, dec, OBSERVATION_TIME, min_degrees)
+        legacy, legacy_time = time_call(
+            legacy_get_alt_az_at_degrees, args.repeat, *arguments
+        )
+        vectorized, vectorized_time = time_call(
+            get_alt_az_at_degrees, args.repeat, *arguments
+        )
+
+        # Twilight is solved for the site rounded by the night window cache, which can
+        # move the one-minute grid by a few seconds
+        if legacy[2] is None or vectorized[2] is None:
+            matches = legacy[2] is vectorized[2]
+        else:
+            matches = abs((legacy[2] - vectorized[2]).total_seconds()) < 60
+        status = "match" if matches else "MISMATCH"
+        print(
+            f"{name:<22} legacy {legacy_time * 1000:9.1f} ms   "
+            f"vectorized {vectorized_time * 1000:8.1f} ms   "
+            f"x{legacy_time / vectorized_time:5.1f}   {status}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+"""
+Benchmark the calculation, search and route hot paths on pinned inputs.
+
+Every run measures the same cases (M31, a circumpolar and a never-rising object from
+Madrid on a fixed date), writes machine-readable results and can compare them with a
+baseline saved by an earlier run:
+
+    PYTHONPATH=src python -m benchmarks.hot_paths --json bench.json
+    PYTHONPATH=src python -m benchmarks.hot_paths --baseline bench.json
+
+The comparison exits with status 1 when a median got slower than --threshold. Compare
+results taken on the same host and Python environment only.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timezone
+
+import astropy.units as u
+from astropy.coordinates import EarthLocation
+from astropy.time import Time
+
+# Madrid, mid-October: a long night
+SITE = {"latitude": 40.4168, "longitude": -3.7038, "altitude": 650}
+OBSERVATION_DATE = date(2023, 10, 15)
+LOCATION = EarthLocation(
+    lat=SITE["latitude"] * u.deg,
+    lon=SITE["longitude"] * u.deg,
+    height=SITE["altitude"] * u.m,
+)
+OBSERVATION_TIME = Time(OBSERVATION_DATE.isoformat())
+
+# name: (object ID, minimum altitude in degrees)
+OBJECTS = {
+    "M31": ("NGC0224", 20),
+    "circumpolar": ("NGC3031", 20),  # M81, dec +69: never sets from Madrid
+    "never rising": ("NGC0292", 5),  # Small Magellanic Cloud, dec -73
+}
+
+# A Canon EOS 80D on a 400 mm f/5 lens
+SESSION = {
+    "sensor_width_mm": 22.3,
+    "sensor_height_mm": 14.9,
+    "number_of_pixels_in_width": 6000,
+    "number_of_pixels_in_height": 4000,
+    "focal_length": 400,
+    "aperture": 5,
+    "shoot_interval": 5,
+    "camera_position": 0,
+}
+
+SEARCH_QUERIES = {"short": "NGC22", "long": "Andromeda Galaxy"}
+CAMERA_QUERY = "canon"
+
+DEFAULT_REPEAT = 20
+DEFAULT_THRESHOLD = 0.25
+
+
+def measure(function, repeat, warmup=1):
+    """
+    Run a function warmup times unmeasured, then repeat times.
+
+    Returns:
+        dict: The "median", "min", "max" and "p95" durations in milliseconds and the
+        number of "runs".
+    """
+    for _ in range(warmup):
+        function()
+
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append((time.perf_counter() - start) * 1000)
+
+    durations.sort()
+    return {
+        "median": statistics.median(durations),
+        "min": durations[0],
+        "max": durations[-1],
+        "p95": durations[min(len(durations) - 1, round(0.95 * (len(durations) - 1)))],
+        "runs": repeat,
+    }
+
+
+def create_benchmark_app(visibility_tables=False):
+    """
+    Create the application as gunicorn does, with CSRF and rate limits off.
+
+    By default the precomputed visibility tables are not loaded, so the calculations
+    themselves are measured.
+    """
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    from app.application import create_app, load_shared_data
+
+    shared_data = None if visibility_tables else load_shared_data(None)
+    app = create_app(shared_data)
+    app.config["WTF_CSRF_ENABLED"] = False
+    for limiter in app.extensions.get("limiter", ()):
+        limiter.enabled = False
+    return app
+
+
+def index_form(object_id, min_degrees, latitude=SITE["latitude"]):
+    return {
+        **SESSION,
+        "object_name": object_id,
+        "object_id": object_id,
+        "latitude": latitude,
+        "longitude": SITE["longitude"],
+        "altitude": SITE["altitude"],
+        "observation_date": OBSERVATION_DATE.isoformat(),
+        "min_degrees": min_degrees,
+    }
+
+
+def benchmarks(app):
+    """
+    Build the benchmark cases.
+
+    Returns:
+        dict: A function without arguments per benchmark name.
+    """
+    from app.search.catalog_index import CatalogIndex
+    from app.search.dsosearcher import DsoSearcher
+    from app.utils.astro_utils import get_alt_az_at_degrees, get_object_data
+    from app.utils.calculations import (
+        calculate_camera_fov,
+        calculate_max_shooting_time,
+        calculate_number_of_shoots,
+    )
+
+    client = app.test_client()
+    fov_width, fov_height, _, _ = calculate_camera_fov(
+        SESSION["sensor_width_mm"],
+        SESSION["sensor_height_mm"],
+        SESSION["number_of_pixels_in_width"],
+        SESSION["number_of_pixels_in_height"],
+        SESSION["focal_length"],
+    )
+    exposure_time, _ = calculate_max_shooting_time(
+        SESSION["aperture"],
+        SESSION["sensor_width_mm"],
+        SESSION["number_of_pixels_in_width"],
+        SESSION["focal_length"],
+    )
+
+    cases = {}
+    for name, (object_id, min_degrees) in OBJECTS.items():
+        ra, dec, size_major, size_minor, _, pa, _ = get_object_data(object_id)
+
+        cases[f"get_alt_az_at_degrees[{name}]"] = (
+            lambda ra=ra, dec=dec, min_degrees=min_degrees: get_alt_az_at_degrees(
+                LOCATION, ra, dec, OBSERVATION_TIME, min_degrees
+            )
+        )
+
+        altaz, _, _ = get_alt_az_at_degrees(
+            LOCATION, ra, dec, OBSERVATION_TIME, min_degrees
+        )
+        if altaz is not None:
+            cases[f"calculate_number_of_shoots[{name}]"] = (
+                lambda altaz=altaz, ra=ra, dec=dec, size_major=size_major, size_minor=size_minor, pa=pa, min_degrees=min_degrees: calculate_number_of_shoots(
+                    altaz,
+                    LOCATION,
+                    ra,
+                    dec,
+                    fov_width,
+                    fov_height,
+                    size_major,
+                    size_minor,
+                    exposure_time,
+                    SESSION["shoot_interval"],
+                    SESSION["camera_position"],
+                    pa,
+                    min_degrees,
+                )
+            )
+
+    cases["get_object_data[NGC0224]"] = lambda: get_object_data("NGC0224")
+    # Not a main name: resolved through the identifiers table
+    cases["get_object_data[M31]"] = lambda: get_object_data("M31")
+
+    catalog_index = CatalogIndex.from_database()
+    for name, query in SEARCH_QUERIES.items():
+        cases[f"DsoSearcher.search[{name}]"] = lambda query=query: DsoSearcher.search(
+            query
+        )
+        cases[f"CatalogIndex.search[{name}]"] = (
+            lambda query=query: catalog_index.search(query)
+        )
+
+    cases["GET /cameras"] = lambda: client.get(f"/cameras?q={CAMERA_QUERY}")
+    cases["GET /search_objects"] = lambda: client.get(
+        f"/search_objects?q={SEARCH_QUERIES['short']}"
+    )
+
+    # Each POST moves the site by 0.0001 degrees (about 10 m), a new key for the result
+    # cache but the same night window: the full calculation is measured every time
+    posts = iter(range(1, 10**6))
+    for name, (object_id, min_degrees) in OBJECTS.items():
+        cases[f"POST /[{name}]"] = (
+            lambda object_id=object_id, min_degrees=min_degrees: client.post(
+                "/",
+                data=index_form(
+                    object_id,
+                    min_degrees,
+                    round(SITE["latitude"] + next(posts) * 0.0001, 4),
+                ),
+            )
+        )
+
+    return cases
+
+
+def check_responses(app):
+    """
+    Make sure the index benchmarks measure calculations, not rejected forms or errors.
+    """
+    client = app.test_client()
+    for name, (object_id, min_degrees) in OBJECTS.items():
+        response = client.post("/", data=index_form(object_id, min_degrees))
+        text = response.get_data(as_text=True)
+        if response.status_code != 200 or 'name="object_name"' in text:
+            raise RuntimeError(f"POST / for {name} did not reach the calculation")
+        if "Size data is missing" in text:
+            raise RuntimeError(f"{object_id} ({name}) has no size data")
+
+
+def environment():
+    """
+    Describe where the results were taken, to tell comparable runs apart.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "commit": commit,
+        "taken_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare the medians of two runs.
+
+    Args:
+        results (dict): The benchmark results of this run.
+        baseline (dict): The benchmark results of the baseline run.
+        threshold (float): The relative slowdown reported as a regression (0.25: 25%).
+
+    Returns:
+        list[dict]: Per benchmark in both runs, its "name", "baseline" and "current"
+        medians in milliseconds, their "change" and whether it is a "regression".
+    """
+    rows = []
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]["median"]
+        change = (current["median"] - before) / before if before else 0.0
+        rows.append(
+            {
+                "name": name,
+                "baseline": before,
+                "current": current["median"],
+                "change": change,
+                "regression": change > threshold,
+            }
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help="measured runs per benchmark (default: %(default)s)",
+    )
+    parser.add_argument("--filter", help="only run benchmarks whose name contains this")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare with the results in this file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="relative slowdown of a median reported as a regression "
+        "(default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    app = create_benchmark_app()
+    check_responses(app)
+
+    results = {}
+    for name, function in benchmarks(app).items():
+        if args.filter and args.filter not in name:
+            continue
+        results[name] = measure(function, args.repeat)
+        timing = results[name]
+        print(
+            f"{name:<48} median {timing['median']:9.2f} ms   "
+            f"p95 {timing['p95']:9.2f} ms   min {timing['min']:9.2f} ms"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+        rows = compare(results, baseline["results"], args.threshold)
+        print(
+            f"\nCompared with {args.baseline} ({baseline['environment']['taken_at']}):"
+        )
+        for row in rows:
+            flag = "REGRESSION" if row["regression"] else ""
+            print(
+                f"{row['name']:<48} {row['baseline']:9.2f} -> {row['current']:9.2f} ms"
+                f"   {row['change']:+7.1%}   {flag}"
+            )
+
+        if any(row["regression"] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
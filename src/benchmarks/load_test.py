@@ -0,0 +1,432 @@
+"""
+Replay recorded request mixes at a fixed concurrency and report latency and errors.
+
+The requests come from the files written with [RECORDING] enabled (see
+app.utils.recording), or from a built-in mix on the pinned inputs of hot_paths when no
+file is given. They are sent, in order and cycling, by --concurrency clients that each
+wait for their response before sending the next one; nothing goes over the network
+except to --url:
+
+    PYTHONPATH=src python -m benchmarks.load_test logs/requests.jsonl* --concurrency 8
+    PYTHONPATH=src python -m benchmarks.load_test --url http://127.0.0.1:8005 \\
+        --concurrency 8 --duration 60 --json load.json logs/requests.jsonl*
+
+Without --url the application is created in this process and called through WSGI.
+"""
+
+import argparse
+import glob
+import http.cookiejar
+import itertools
+import json
+import math
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter, defaultdict
+from datetime import date
+
+from app.utils.recording import RECORDING_FORMAT_VERSION, restore_values
+from benchmarks.hot_paths import (
+    CAMERA_QUERY,
+    OBJECTS,
+    SESSION,
+    SITE,
+    create_benchmark_app,
+)
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_REQUESTS = 500
+DEFAULT_WARMUP = 20
+DEFAULT_TIMEOUT = 30
+
+# Autocomplete clients ask for compressed bodies, as browsers do
+HEADERS = {"Accept-Encoding": "gzip"}
+
+_CSRF_INPUT = re.compile(r"<input[^>]*\bname=\"csrf_token\"[^>]*>")
+_INPUT_VALUE = re.compile(r"\bvalue=\"([^\"]*)\"")
+
+
+def load_mix(patterns):
+    """
+    Reads recorded requests.
+
+    Args:
+        patterns (list[str]): Recording files, or glob patterns (rotated files included).
+
+    Returns:
+        tuple: The requests (list[dict]) in file order and the number of lines skipped
+        because they were not a request of this recording format.
+    """
+    entries = []
+    skipped = 0
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        skipped += 1
+                        continue
+                    if (
+                        not isinstance(entry, dict)
+                        or entry.get("version") != RECORDING_FORMAT_VERSION
+                    ):
+                        skipped += 1
+                        continue
+                    entries.append(entry)
+    return entries, skipped
+
+
+def default_mix():
+    """
+    Returns a recorded-like mix on the pinned inputs of hot_paths: someone typing two
+    object names, looking up a camera and submitting a calculation for each object.
+    """
+
+    def entry(endpoint, method, path, kind, values):
+        return {
+            "version": RECORDING_FORMAT_VERSION,
+            "endpoint": endpoint,
+            "method": method,
+            "path": path,
+            "kind": kind,
+            "values": values,
+            "status": 200,
+        }
+
+    mix = []
+    for query in ("m", "m3", "m31", "ngc", "ngc2", "ngc22"):
+        mix.append(
+            entry(
+                "search_objects.search_objects",
+                "GET",
+                "/search_objects",
+                "args",
+                {"q": query},
+            )
+        )
+    for length in range(3, len(CAMERA_QUERY) + 1):
+        mix.append(
+            entry(
+                "camera.cameras_list",
+                "GET",
+                "/cameras",
+                "args",
+                {"q": CAMERA_QUERY[:length]},
+            )
+        )
+
+    def calculation(object_id, min_degrees):
+        return {
+            **SESSION,
+            **SITE,
+            "object_name": object_id,
+            "object_id": object_id,
+            "min_degrees": min_degrees,
+            "observation_day": 0,
+        }
+
+    for object_id, min_degrees in OBJECTS.values():
+        values = calculation(object_id, min_degrees)
+        mix.append(entry("index.index", "POST", "/", "form", values))
+    values = calculation(*OBJECTS["M31"])
+    mix.append(entry("api.calculate", "POST", "/api/calculate", "json", values))
+    return mix
+
+
+class InProcessTarget:
+    """
+    Sends the requests to the application, created in this process, through WSGI.
+    """
+
+    def __init__(self):
+        self.app = create_benchmark_app(visibility_tables=True)
+
+    def session(self):
+        """
+        Returns a function sending a request as one client: (entry, values) -> status.
+        """
+        client = self.app.test_client()
+
+        def send(entry, values):
+            options = {"method": entry["method"], "headers": HEADERS}
+            if entry["kind"] == "args":
+                options["query_string"] = values
+            elif entry["kind"] == "form":
+                options["data"] = values
+            else:
+                options["json"] = values
+            return client.open(entry["path"], **options).status_code
+
+        return send
+
+
+class HttpTarget:
+    """
+    Sends the requests to a running server, gunicorn on this host for example.
+
+    Each client keeps its cookies and fetches the CSRF token of a form before posting it,
+    like a browser. Start the server with RATELIMIT_ENABLED=false, or the requests above
+    the rate limits of one address are answered with 429.
+    """
+
+    def __init__(self, url, timeout=DEFAULT_TIMEOUT):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def session(self):
+        """
+        Returns a function sending a request as one client: (entry, values) -> status.
+        """
+        opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+        csrf_tokens = {}
+
+        def open_url(url, data=None, headers=None):
+            request = urllib.request.Request(url, data, {**HEADERS, **(headers or {})})
+            try:
+                with opener.open(request, timeout=self.timeout) as response:
+                    return response.status, response.read()
+            except urllib.error.HTTPError as error:
+                return error.code, error.read()
+
+        def csrf_token(path):
+            if path not in csrf_tokens:
+                _, body = open_url(self.url + path)
+                field = _CSRF_INPUT.search(body.decode("utf-8", "replace"))
+                value = field and _INPUT_VALUE.search(field.group(0))
+                csrf_tokens[path] = value.group(1) if value else ""
+            return csrf_tokens[path]
+
+        def send(entry, values):
+            url = self.url + entry["path"]
+            try:
+                if entry["kind"] == "args":
+                    query = urllib.parse.urlencode(values)
+                    return open_url(f"{url}?{query}" if query else url)[0]
+                if entry["kind"] == "form":
+                    form = {**values, "csrf_token": csrf_token(entry["path"])}
+                    return open_url(
+                        url,
+                        urllib.parse.urlencode(form).encode(),
+                        {"Content-Type": "application/x-www-form-urlencoded"},
+                    )[0]
+                return open_url(
+                    url,
+                    json.dumps(values).encode(),
+                    {"Content-Type": "application/json"},
+                )[0]
+            except OSError:
+                # Refused, reset or timed out: no response
+                return 0
+
+        return send
+
+
+def run_load(target, mix, concurrency, requests=None, duration=None, today=None):
+    """
+    Sends the requests of a mix, cycling through it, from concurrent clients.
+
+    Each client sends its next request when it got the response to the previous one.
+
+    Args:
+        target (InProcessTarget | HttpTarget): Where the requests are sent.
+        mix (list[dict]): The recorded requests.
+        concurrency (int): The number of clients.
+        requests (int, optional): Stop after this many requests.
+        duration (float, optional): Stop after this many seconds.
+        today (date, optional): The day observation dates are relative to (today).
+
+    Returns:
+        tuple: The samples, (endpoint, status, seconds) per request, and the seconds
+        the run took.
+    """
+    today = today or date.today()
+    prepared = itertools.cycle([(entry, restore_values(entry, today)) for entry in mix])
+    lock = threading.Lock()
+    samples = []
+    state = {"sent": 0}
+    deadline = time.monotonic() + duration if duration else None
+
+    def next_request():
+        with lock:
+            if requests is not None and state["sent"] >= requests:
+                return None
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            state["sent"] += 1
+            return next(prepared)
+
+    def client():
+        send = target.session()
+        while True:
+            request = next_request()
+            if request is None:
+                return
+            entry, values = request
+            start = time.perf_counter()
+            status = send(entry, values)
+            seconds = time.perf_counter() - start
+            with lock:
+                samples.append((entry["endpoint"], status, seconds))
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - start
+
+
+def percentile(values, fraction):
+    """
+    Returns the nearest-rank percentile of sorted values (fraction from 0 to 1).
+    """
+    if not values:
+        return None
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+def is_error(status):
+    """
+    Tells whether a status is a failure of the server: no response, 429 or 5xx.
+
+    Other 4xx answers (an invalid form, an object that is never visible) are what the
+    recorded requests got too.
+    """
+    return status == 0 or status == 429 or status >= 500
+
+
+def summarize(samples, elapsed):
+    """
+    Sums up the samples of a run, for all requests and per endpoint.
+
+    Returns:
+        dict: "total" and, per endpoint, "endpoints": the number of requests, their
+        throughput per second, status codes, errors and error rate, and the p50, p95,
+        p99 and max latencies in milliseconds.
+    """
+
+    def summary(group):
+        durations = sorted(seconds * 1000 for _, _, seconds in group)
+        statuses = Counter(status for _, status, _ in group)
+        errors = sum(count for status, count in statuses.items() if is_error(status))
+        return {
+            "requests": len(group),
+            "throughput": len(group) / elapsed if elapsed else 0.0,
+            "statuses": {
+                str(status): count for status, count in sorted(statuses.items())
+            },
+            "errors": errors,
+            "error_rate": errors / len(group) if group else 0.0,
+            "p50": percentile(durations, 0.50),
+            "p95": percentile(durations, 0.95),
+            "p99": percentile(durations, 0.99),
+            "max": durations[-1] if durations else None,
+        }
+
+    by_endpoint = defaultdict(list)
+    for sample in samples:
+        by_endpoint[sample[0]].append(sample)
+
+    return {
+        "elapsed": elapsed,
+        "total": summary(samples),
+        "endpoints": {
+            endpoint: summary(group) for endpoint, group in sorted(by_endpoint.items())
+        },
+    }
+
+
+def print_report(report):
+    print(
+        f"{'endpoint':<32} {'requests':>8} {'req/s':>8} {'errors':>7} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    )
+    rows = list(report["endpoints"].items()) + [("total", report["total"])]
+    for name, row in rows:
+        if not row["requests"]:
+            continue
+        print(
+            f"{name:<32} {row['requests']:>8} {row['throughput']:>8.1f} "
+            f"{row['error_rate']:>7.1%} {row['p50']:>9.1f} {row['p95']:>9.1f} "
+            f"{row['p99']:>9.1f}"
+        )
+    print(f"\n{report['total']['requests']} requests in {report['elapsed']:.1f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "recordings",
+        nargs="*",
+        help="recorded request files or glob patterns (default: a built-in mix)",
+    )
+    parser.add_argument(
+        "--url", help="send the requests to this server instead of in-process"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="clients sending requests at the same time (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--requests",
+        type=int,
+        help=f"requests to send (default: {DEFAULT_REQUESTS} without --duration)",
+    )
+    parser.add_argument("--duration", type=float, help="seconds to send requests for")
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=DEFAULT_WARMUP,
+        help="requests sent first and not reported (default: %(default)s)",
+    )
+    parser.add_argument("--json", help="write the report to this file")
+    args = parser.parse_args()
+
+    if args.recordings:
+        mix, skipped = load_mix(args.recordings)
+        if skipped:
+            print(f"Skipped {skipped} lines that are not recorded requests")
+    else:
+        mix = default_mix()
+    if not mix:
+        parser.error("the recordings hold no requests")
+
+    requests = args.requests
+    if requests is None and args.duration is None:
+        requests = DEFAULT_REQUESTS
+
+    target = HttpTarget(args.url) if args.url else InProcessTarget()
+    if args.warmup:
+        run_load(target, mix, args.concurrency, requests=args.warmup)
+
+    samples, elapsed = run_load(
+        target, mix, args.concurrency, requests=requests, duration=args.duration
+    )
+    report = summarize(samples, elapsed)
+    report["concurrency"] = args.concurrency
+    report["target"] = args.url or "in-process"
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.json}")
+
+    if report["total"]["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Report where the startup time of a worker goes: imports, data loading and warm-up.
+
+Every measure runs in a fresh interpreter, so nothing is cached between them:
+
+    PYTHONPATH=src python -m benchmarks.startup
+    PYTHONPATH=src python -m benchmarks.startup --json startup.json --top 30
+
+The --json report can be kept per release and compared to follow startup over time.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+# What a worker runs at boot, split in stages; each stage runs after the previous ones
+STAGES = {
+    "import routes": "import app.routes.route_initializer",
+    "import application modules": (
+        "import app.db.camera_db, app.search.catalog_index, "
+        "app.search.coordinate_table, app.utils.initialize, app.utils.settings"
+    ),
+    "open camera database": (
+        "from app.db.camera_db import open_camera_database; open_camera_database()"
+    ),
+    "load catalog index": (
+        "from app.search.catalog_index import CatalogIndex; CatalogIndex.from_database()"
+    ),
+    "load coordinate table": (
+        "from app.search.coordinate_table import get_coordinate_table; "
+        "get_coordinate_table()"
+    ),
+    "warm up astropy": "from app.utils.astro_utils import warm_up; warm_up()",
+}
+
+_TIMED_STAGES = """
+import json, sys, time
+stages = json.loads(sys.argv[1])
+timings = {}
+for name, code in stages.items():
+    start = time.perf_counter()
+    exec(code)
+    timings[name] = time.perf_counter() - start
+print(json.dumps(timings))
+"""
+
+
+def _environment():
+    environment = dict(os.environ)
+    source_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    environment["PYTHONPATH"] = os.pathsep.join(
+        path for path in (source_directory, environment.get("PYTHONPATH")) if path
+    )
+    return environment
+
+
+def stage_timings():
+    """
+    Time each of STAGES in one fresh interpreter, in order.
+
+    Returns:
+        dict: The duration of each stage in seconds.
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", _TIMED_STAGES, json.dumps(STAGES)],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=_environment(),
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def import_times(module):
+    """
+    Run `python -X importtime -c "import <module>"` and parse its report.
+
+    Args:
+        module (str): The module to import.
+
+    Returns:
+        list[dict]: One entry per imported module with its "module" name, "self" and
+        "cumulative" times in seconds, in import order.
+    """
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=_environment(),
+    )
+
+    entries = []
+    for line in output.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, cumulative, name = line[len("import time:") :].split("|")
+        entries.append(
+            {
+                "module": name.strip(),
+                "self": int(self_time) / 1e6,
+                "cumulative": int(cumulative) / 1e6,
+            }
+        )
+    return entries
+
+
+def time_per_package(entries):
+    """
+    Add up the self import time of every module by top-level package.
+
+    Args:
+        entries (list[dict]): The result of import_times.
+
+    Returns:
+        dict: Seconds per top-level package, slowest first.
+    """
+    totals = defaultdict(float)
+    for entry in entries:
+        totals[entry["module"].split(".")[0]] += entry["self"]
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--module",
+        default="app.routes.route_initializer",
+        help="module whose imports are broken down (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--top", type=int, default=15, help="packages to list (default: %(default)s)"
+    )
+    parser.add_argument("--json", help="also write the full report to this file")
+    args = parser.parse_args()
+
+    stages = stage_timings()
+    entries = import_times(args.module)
+    packages = time_per_package(entries)
+
+    print("Startup stages (fresh interpreter):")
+    for name, seconds in stages.items():
+        print(f"  {name:<28} {seconds * 1000:8.1f} ms")
+    print(f"  {'total':<28} {sum(stages.values()) * 1000:8.1f} ms")
+
+    print(f"\nImport time of {args.module} by package (self time):")
+    for package, seconds in list(packages.items())[: args.top]:
+        print(f"  {package:<28} {seconds * 1000:8.1f} ms")
+
+    if args.json:
+        report = {
+            "python": sys.version.split()[0],
+            "stages": stages,
+            "packages": packages,
+            "modules": entries,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
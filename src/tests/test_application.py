@@ -0,0 +1,117 @@
+import os
+import tempfile
+import unittest
+
+from src.app.db.camera_db import build_camera_database, open_camera_database
+from src.app.db.db_convert import DEFAULT_CSV_PATH
+from src.app.search.catalog_index import CatalogIndex
+from src.app.search.coordinate_table import get_coordinate_table
+
+
+class TestCreateApp(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        os.environ.setdefault("SECRET_KEY", "test")
+        from src.app.application import create_app, init_worker
+
+        cls.directory = tempfile.TemporaryDirectory()
+        camera_path = os.path.join(cls.directory.name, "cameras.sqlite")
+        build_camera_database(DEFAULT_CSV_PATH, camera_path)
+        cls.shared_data = {
+            "camera_database": open_camera_database(camera_path),
+            "catalog_index": CatalogIndex([]),
+            "coordinate_table": get_coordinate_table(),
+        }
+        cls.app = create_app(cls.shared_data)
+        cls.init_worker = staticmethod(init_worker)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def test_extensions_registered_once(self):
+        self.assertIn("csrf", self.app.extensions)
+        self.assertEqual(len(self.app.extensions["limiter"]), 1)
+
+    def test_routes_use_shared_data(self):
+        response = self.app.test_client().get("/cameras?q=eos 80d")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [camera["model"] for camera in response.get_json()], ["EOS 80D"]
+        )
+
+    def test_health_reports_iers_data(self):
+        response = self.app.test_client().get("/health")
+        body = response.get_json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body["status"], "stale" if body["iers"]["stale"] else "ok")
+        self.assertEqual(body["iers"]["mode"], "offline")
+
+    def test_json_api_needs_no_csrf_token(self):
+        self.app.config["WTF_CSRF_ENABLED"] = True
+        response = self.app.test_client().post(
+            "/api/calculate", json={"object_id": "NGC0224"}
+        )
+
+        # Rejected by validation, not by CSRF protection
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("latitude", response.get_json()["errors"])
+
+    def test_metrics_count_requests(self):
+        client = self.app.test_client()
+        client.get("/cameras?q=eos")
+        response = client.get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain; version=0.0.4"))
+        self.assertIn(
+            'http_requests_total{endpoint="camera.cameras_list",method="GET",status="200"}',
+            response.get_data(as_text=True),
+        )
+
+    def test_index_shows_catalog_size(self):
+        stats = self.app.test_client().get("/catalog/stats").get_json()
+        response = self.app.test_client().get("/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            f"<strong>{stats['total_without_duplicates']}</strong>",
+            response.get_data(as_text=True),
+        )
+
+    def test_catalog_stats_revalidation(self):
+        client = self.app.test_client()
+        response = client.get("/catalog/stats")
+        etag = response.headers["ETag"]
+
+        revalidated = client.get("/catalog/stats", headers={"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(etag, f'"{response.get_json()["etag"]}"')
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.get_data(), b"")
+
+    def test_search_objects_revalidation(self):
+        client = self.app.test_client()
+        response = client.get("/search_objects?q=M31")
+
+        revalidated = client.get(
+            "/search_objects?q=m 31",
+            headers={"If-None-Match": response.headers["ETag"]},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["Cache-Control"].startswith("public"))
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_init_worker(self):
+        self.init_worker(self.app)
+
+        response = self.app.test_client().get("/cameras?q=eos")
+        self.assertEqual(response.status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,17 +1,13 @@
 import unittest
 from datetime import datetime
-from unittest.mock import patch
+
+import astropy.units as u
+from astropy.coordinates import EarthLocation
 
 from src.app.utils.astro_utils import get_alt_az, get_object_data
 
 
 class TestAstroCalculations(unittest.TestCase):
-    def mock_get_alt_az(self, *args, **kwargs):
-        return (None, "Some error message")
-
-    def mock_get_object_data(self, *args, **kwargs):
-        return 10.684791666666664, 41.26905555555555, 1, 1, "NGC0224", 0, None
-
     def test_get_alt_az_with_form_data(self):
         form_data = {
             "object_id": "NGC0224",
@@ -20,26 +16,34 @@ class TestAstroCalculations(unittest.TestCase):
             "observation_date": datetime(2023, 8, 31, 19, 17, 17, 459910),
         }
 
-        with patch(
-            "src.app.utils.astro_utils.get_object_data", self.mock_get_object_data
-        ):
-            ra, dec, size_major, size_minor, object_name, pa, error = get_object_data(
-                form_data["object_id"]
-            )
-
-            self.assertEqual(ra, 10.684791666666664)
-            self.assertEqual(dec, 41.26905555555555)
-
-            altaz, error_message = get_alt_az(
-                ra,
-                dec,
-                form_data["latitude"],
-                form_data["longitude"],
-                form_data["observation_date"],
-            )
-
-            self.assertIsNotNone(altaz)
-            self.assertIsNone(error_message)
+        ra, dec, size_major, size_minor, object_name, pa, error = get_object_data(
+            form_data["object_id"]
+        )
+
+        self.assertIsNone(error)
+        self.assertAlmostEqual(ra, 10.684791666666664)
+        self.assertAlmostEqual(dec, 41.26905555555555)
+
+        location = EarthLocation(
+            lat=form_data["latitude"] * u.deg, lon=form_data["longitude"] * u.deg
+        )
+        # get_alt_az takes the right ascension in hours
+        altaz, error_message = get_alt_az(
+            location, ra / 15, dec, form_data["observation_date"]
+        )
+
+        self.assertIsNotNone(altaz)
+        self.assertIsNone(error_message)
+        self.assertGreater(altaz.alt.degree, 0)
+
+    def test_get_object_data_accepts_the_names_dso_accepts(self):
+        expected = get_object_data("NGC0224")
+
+        for object_id in ["NGC224", "ngc224", "ngc0224", "NGC 224", "M31", "m31"]:
+            with self.subTest(object_id=object_id):
+                self.assertEqual(get_object_data(object_id), expected)
+
+        self.assertEqual(get_object_data("tururu")[-1], "Object tururu not found")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,242 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+
+import astropy.units as u
+from astropy.coordinates import EarthLocation
+from astropy.time import Time
+
+from src.app.utils.cache import LRUCache, SQLiteCache, TieredCache, create_cache
+from src.app.utils.calculation_service import (
+    calculation_cache_key,
+    perform_astro_calculations,
+)
+from src.app.utils.night_window import get_night_window, night_window_cache
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_eviction_order(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_ttl(self):
+        timer = FakeTimer()
+        cache = LRUCache(maxsize=2, ttl=10, timer=timer)
+        cache.set("a", 1)
+
+        timer.now = 9
+        self.assertEqual(cache.get("a"), 1)
+        timer.now = 10
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+    def test_counters(self):
+        cache = LRUCache()
+        calls = []
+
+        for _ in range(3):
+            cache.get_or_compute("a", lambda: calls.append(1) or len(calls))
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(
+            cache.stats(), {"hits": 2, "misses": 1, "size": 1, "maxsize": 128}
+        )
+
+
+class TestSQLiteCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "cache.sqlite")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_shared_between_instances(self):
+        SQLiteCache(self.path).set(("NGC0224", 40.4), {"num_shoots": 12})
+
+        self.assertEqual(
+            SQLiteCache(self.path).get(("NGC0224", 40.4)), {"num_shoots": 12}
+        )
+        self.assertIsNone(SQLiteCache(self.path).get(("NGC0224", 40.5)))
+
+    def test_eviction_order(self):
+        timer = FakeTimer()
+        cache = SQLiteCache(self.path, maxsize=2, timer=timer)
+        cache.set("a", 1)
+        timer.now = 1
+        cache.set("b", 2)
+        timer.now = 2
+        cache.get("a")
+        timer.now = 3
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_ttl(self):
+        timer = FakeTimer()
+        cache = SQLiteCache(self.path, ttl=10, timer=timer)
+        cache.set("a", 1)
+
+        timer.now = 9
+        self.assertEqual(cache.get("a"), 1)
+        timer.now = 10
+        self.assertIsNone(cache.get("a"))
+
+    def test_tiered_cache_shares_through_the_file(self):
+        first_worker = TieredCache(LRUCache(), SQLiteCache(self.path), namespace="x")
+        second_worker = TieredCache(LRUCache(), SQLiteCache(self.path), namespace="x")
+        other_namespace = TieredCache(LRUCache(), SQLiteCache(self.path), namespace="y")
+        calls = []
+
+        first_worker.get_or_compute("a", lambda: calls.append(1) or "value")
+
+        self.assertEqual(
+            second_worker.get_or_compute("a", lambda: calls.append(1)), "value"
+        )
+        self.assertEqual(second_worker.stats()["hits"], 0)
+        self.assertEqual(second_worker.get("a"), "value")
+        self.assertEqual(second_worker.stats()["hits"], 1)
+        self.assertIsNone(other_namespace.get("a"))
+        self.assertEqual(calls, [1])
+
+    def test_unusable_file_falls_back_to_the_local_cache(self):
+        # A file where the cache directory should be: neither makedirs nor connect work
+        blocker = os.path.join(self.directory.name, "cache")
+        open(blocker, "w").close()
+        shared = SQLiteCache(os.path.join(blocker, "cache.sqlite"))
+        cache = TieredCache(LRUCache(), shared)
+
+        shared.set("a", 1)
+        shared.clear()
+        self.assertIsNone(shared.get("a"))
+        self.assertEqual(len(shared), 0)
+        self.assertEqual(cache.get_or_compute("b", lambda: 2), 2)
+        self.assertEqual(cache.get("b"), 2)
+
+    def test_create_cache(self):
+        self.assertIsInstance(create_cache("memory"), LRUCache)
+        self.assertIsInstance(create_cache("sqlite", path=self.path), SQLiteCache)
+        self.assertIsInstance(create_cache("tiered", path=self.path), TieredCache)
+        with self.assertRaises(ValueError):
+            create_cache("redis")
+
+
+class TestCalculationCache(unittest.TestCase):
+    form_data = {
+        "object_id": "NGC0224",
+        "latitude": 40.41680001,
+        "longitude": -3.7038,
+        "altitude": 652,
+        "observation_date": date(2023, 10, 15),
+        "sensor_width_mm": 23.5,
+        "sensor_height_mm": 15.6,
+        "number_of_pixels_in_width": 6000,
+        "number_of_pixels_in_height": 4000,
+        "focal_length": 400.0,
+        "aperture": 80.0,
+        "shoot_interval": 1.0,
+        "camera_position": 0,
+        "min_degrees": 30,
+    }
+
+    def test_key_is_normalized(self):
+        other = {
+            **self.form_data,
+            "object_id": " NGC0224 ",
+            "latitude": 40.4168,
+            "altitude": 648,
+        }
+
+        self.assertEqual(
+            calculation_cache_key(self.form_data), calculation_cache_key(other)
+        )
+        self.assertNotEqual(
+            calculation_cache_key(self.form_data),
+            calculation_cache_key({**self.form_data, "min_degrees": 20}),
+        )
+
+    def test_key_keeps_the_case_of_the_object(self):
+        self.assertNotEqual(
+            calculation_cache_key(self.form_data),
+            calculation_cache_key({**self.form_data, "object_id": "ngc0224"}),
+        )
+
+    def test_repeated_submission_skips_the_calculation(self):
+        cache = LRUCache()
+        cache.set(calculation_cache_key(self.form_data), {"number_of_shoots": 12})
+
+        def get_object_data(object_id):
+            raise AssertionError("The cached result should have been used")
+
+        result = perform_astro_calculations(
+            {**self.form_data, "altitude": 648},
+            None,
+            get_object_data,
+            None,
+            None,
+            "/",
+            cache,
+        )
+
+        self.assertEqual(
+            result, {"number_of_shoots": 12, "altitude": 648, "route": "/"}
+        )
+
+    def test_errors_are_not_cached(self):
+        calls = []
+
+        def get_object_data(object_id):
+            calls.append(object_id)
+            return None, None, None, None, None, None, f"Object {object_id} not found"
+
+        cache = LRUCache()
+        for _ in range(2):
+            result = perform_astro_calculations(
+                self.form_data, None, get_object_data, None, None, "/", cache
+            )
+
+        self.assertEqual(result, {"error": "Object NGC0224 not found"})
+        self.assertEqual(calls, ["NGC0224", "NGC0224"])
+        self.assertEqual(len(cache), 0)
+
+
+class TestNightWindowCache(unittest.TestCase):
+    def test_nearby_sites_share_the_window(self):
+        night_window_cache.clear()
+        observation_time = Time("2023-10-15 00:00:00")
+
+        first = get_night_window(
+            EarthLocation(lat=40.4168 * u.deg, lon=-3.7038 * u.deg, height=650 * u.m),
+            observation_time,
+        )
+        second = get_night_window(
+            EarthLocation(lat=40.4201 * u.deg, lon=-3.7012 * u.deg, height=640 * u.m),
+            observation_time,
+        )
+
+        self.assertIs(first, second)
+        self.assertLess(first[0], first[1])
+        self.assertEqual(night_window_cache.stats()["hits"], 1)
+        self.assertEqual(night_window_cache.stats()["misses"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
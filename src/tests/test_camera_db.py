@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src.app.db.camera_db import (
+    build_camera_database,
+    camera_sort_key,
+    open_camera_database,
+)
+from src.app.db.db_convert import DEFAULT_CSV_PATH, read_cameras_csv
+
+
+class TestCameraDatabase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, "cameras.sqlite")
+        cls.count = build_camera_database(DEFAULT_CSV_PATH, cls.path)
+        cls.database = open_camera_database(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def test_all_cameras_compiled(self):
+        self.assertEqual(self.count, len(read_cameras_csv(DEFAULT_CSV_PATH)))
+        self.assertEqual(len(self.database), self.count)
+        self.assertEqual(len(self.database.all()), self.count)
+
+    def test_get(self):
+        camera = self.database.get("eos 6d")
+
+        self.assertEqual(camera.brand, "Canon")
+        self.assertEqual(camera.model, "EOS 6D")
+        self.assertEqual((camera.sensor_px_w, camera.sensor_px_h), (5505, 3670))
+        self.assertIsInstance(camera.iso, list)
+        self.assertTrue(camera.url.startswith("https://"))
+
+    def test_get_missing(self):
+        self.assertIsNone(self.database.get("tururu"))
+
+    def test_sorted_by_brand_model_year(self):
+        cameras = self.database.all()
+        keys = [(camera.brand, camera.model, camera.year) for camera in cameras]
+        self.assertEqual(keys, sorted(keys))
+
+    def models(self, query, **kwargs):
+        return [
+            camera["model"]
+            for camera in json.loads(self.database.search_json(query, **kwargs))
+        ]
+
+    def linear_models(self, query):
+        query = query.lower()
+        matches = [
+            camera
+            for camera in self.database.all()
+            if query in (camera.brand or "").lower()
+            or query in (camera.model or "").lower()
+            or query in (camera.also_known_as or "").lower()
+        ]
+        return [camera.model for camera in sorted(matches, key=camera_sort_key)]
+
+    def test_search_json_matches_linear_scan(self):
+        for query in ["canon", "eos 6", "d80", "ilce", "tururu", 'a"b', "III"]:
+            with self.subTest(query=query):
+                self.assertEqual(
+                    self.models(query, limit=10**6), self.linear_models(query)
+                )
+
+    def test_search_json_short_query_and_limit(self):
+        self.assertEqual(self.database.search_json("ca"), "[]")
+        self.assertEqual(self.database.search_json("a\x00b"), "[]")
+        self.assertEqual(self.models("canon", limit=3), self.linear_models("canon")[:3])
+        self.assertIn('"value":"EOS 6D"', self.database.search_json("eos 6d"))
+
+    def test_search_does_not_cross_fields(self):
+        # "Canon" followed by "EOS": only a match if brand and model were one text
+        self.assertEqual(self.models("noneos"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from src.app.search.catalog_index import CatalogIndex, normalize
+
+
+class TestCatalogIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.index = CatalogIndex.from_database()
+
+    def names(self, query, **kwargs):
+        return [record.name for record in self.index.search(query, **kwargs)]
+
+    def test_normalize(self):
+        self.assertEqual(normalize(" ngc 0224 "), "NGC224")
+        self.assertEqual(normalize("M031"), "M31")
+        self.assertEqual(normalize("orion"), "ORION")
+
+    def test_index_size(self):
+        self.assertEqual(len(self.index), 13340)
+
+    def test_search_common_name(self):
+        self.assertEqual(self.names("orion"), ["IC0434", "NGC1976"])
+
+    def test_search_catalog_identifiers(self):
+        self.assertEqual(self.names("m31"), ["NGC0224"])
+        self.assertEqual(self.names("NGC224")[0], "NGC0224")
+        self.assertEqual(self.names("M4")[0], "NGC6121")
+
+    def test_search_limit(self):
+        self.assertEqual(len(self.names("NGC1", limit=10)), 10)
+        self.assertEqual(self.names("NGC1", limit=3), ["NGC0001", "NGC0010", "NGC0011"])
+
+    def test_search_no_match(self):
+        self.assertEqual(self.names("tururu"), [])
+        self.assertEqual(self.names(""), [])
+
+    def test_get(self):
+        record = self.index.get("NGC0224")
+
+        self.assertEqual(record.type, "Galaxy")
+        self.assertEqual(record.common_name, "Andromeda Galaxy")
+        self.assertAlmostEqual(record.ra_deg, 10.684791666666664, places=6)
+        self.assertAlmostEqual(record.dec_deg, 41.26905555555555, places=6)
+        self.assertIs(self.index.get("M31"), record)
+        self.assertIsNone(self.index.get("tururu"))
+
+
+if __name__ == "__main__":
+    unittest.main()
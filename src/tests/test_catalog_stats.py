@@ -0,0 +1,47 @@
+import unittest
+
+from src.app.search.catalog_stats import CatalogStats
+from src.app.search.dsosearcher import DsoSearcher
+
+
+class TestCatalogStats(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.stats = CatalogStats.from_database()
+
+    def test_totals_match_the_database(self):
+        self.assertEqual(
+            self.stats.total_without_duplicates, DsoSearcher.count_objects()
+        )
+        self.assertEqual(self.stats.total, DsoSearcher.count_objects(omit_dupes=False))
+        self.assertEqual(self.stats.duplicates, self.stats.by_type["Dup"])
+
+    def test_types_are_described(self):
+        self.assertEqual(self.stats.type_names["G"], "Galaxy")
+        self.assertGreater(self.stats.by_type["G"], 0)
+
+    def test_etag_follows_version_and_counts(self):
+        same = CatalogStats(self.stats.version, dict(self.stats.by_type))
+        other_version = CatalogStats("other", dict(self.stats.by_type))
+        other_counts = CatalogStats(self.stats.version, {**self.stats.by_type, "G": 0})
+
+        self.assertEqual(same.etag, self.stats.etag)
+        self.assertNotEqual(other_version.etag, self.stats.etag)
+        self.assertNotEqual(other_counts.etag, self.stats.etag)
+
+    def test_to_dict(self):
+        data = self.stats.to_dict()
+
+        self.assertEqual(
+            data["total"], sum(entry["count"] for entry in data["by_type"])
+        )
+        self.assertEqual(data["etag"], self.stats.etag)
+        # Another snapshot of the same catalog, as after a restart: same tag, same body
+        self.assertEqual(CatalogStats.from_database().to_dict(), data)
+        self.assertIn(
+            {"type": "G", "description": "Galaxy", "count": 10484}, data["by_type"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+
+from src.app.search.coordinate_table import load_coordinate_table
+from src.app.search.dsosearcher import DsoSearcher
+
+
+class TestCoordinateTable(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.table = load_coordinate_table(
+            os.path.join(cls.directory.name, "catalog.npy")
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        del cls.table
+        cls.directory.cleanup()
+
+    def test_table_size(self):
+        self.assertEqual(len(self.table), DsoSearcher.count_objects())
+
+    def test_matches_database(self):
+        record = DsoSearcher.get_many(["NGC0224"])["NGC0224"]
+        row = self.table.get("NGC0224")
+
+        self.assertEqual(row.label, "Andromeda Galaxy")
+        self.assertAlmostEqual(row.ra_deg, record.ra_deg, places=10)
+        self.assertAlmostEqual(row.dec_deg, record.dec_deg, places=10)
+        self.assertEqual(row.major_axis, 177.83)
+        self.assertEqual(row.minor_axis, 69.66)
+        self.assertEqual(row.position_angle, 35)
+
+    def test_missing_values(self):
+        # IC0434 has no position angle and its label falls back to the common name
+        row = self.table.get("IC0434")
+        self.assertIsNone(row.position_angle)
+        self.assertEqual(row.label, "Flame Nebula")
+
+    def test_unknown_object(self):
+        self.assertIsNone(self.table.get("tururu"))
+        self.assertIsNone(self.table.get("ZZZ9999"))
+
+
+if __name__ == "__main__":
+    unittest.main()
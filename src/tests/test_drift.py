@@ -0,0 +1,92 @@
+import unittest
+
+import astropy.units as u
+import numpy as np
+from astropy.coordinates import AltAz, EarthLocation, SkyCoord
+from astropy.time import Time, TimeDelta
+
+from src.app.utils.calculations import calculate_number_of_shoots
+from src.app.utils.drift import (
+    altaz_rates,
+    equatorial_from_altaz,
+    propagate_altaz,
+    shots_per_position,
+)
+
+
+class TestDrift(unittest.TestCase):
+    location = EarthLocation(lat=40.4168 * u.deg, lon=-3.7038 * u.deg, height=650 * u.m)
+    start_time = Time("2023-10-15 21:00:00", scale="utc")
+    offsets = np.array([0, 30, 600, 3600, 4 * 3600])
+
+    def transform(self, ra, dec, offsets):
+        return SkyCoord(ra=ra * u.deg, dec=dec * u.deg).transform_to(
+            AltAz(
+                obstime=self.start_time + TimeDelta(offsets, format="sec"),
+                location=self.location,
+            )
+        )
+
+    def test_propagation_matches_astropy(self):
+        for ra, dec in [(10.6848, 41.2690), (83.8221, -5.3911), (37.95, 89.26)]:
+            altaz = self.transform(ra, dec, self.offsets)
+            alt, az = propagate_altaz(
+                altaz.alt.degree[0], altaz.az.degree[0], 40.4168, self.offsets
+            )
+
+            az_error = (az - altaz.az.degree + 180) % 360 - 180
+            np.testing.assert_allclose(alt, altaz.alt.degree, atol=1 / 3600)
+            np.testing.assert_allclose(
+                az_error * np.cos(np.radians(alt)), 0, atol=1 / 3600
+            )
+
+    def test_rates_match_finite_differences(self):
+        altaz = self.transform(10.6848, 41.2690, np.array([0, 30]))
+        hour_angle, dec = equatorial_from_altaz(
+            altaz.alt.degree[0], altaz.az.degree[0], 40.4168
+        )
+        alt_rate, az_rate = altaz_rates(hour_angle, dec, 40.4168)
+
+        self.assertAlmostEqual(
+            alt_rate, (altaz.alt.degree[1] - altaz.alt.degree[0]) / 30, places=5
+        )
+        self.assertAlmostEqual(
+            az_rate, (altaz.az.degree[1] - altaz.az.degree[0]) / 30, places=5
+        )
+
+    def test_number_of_shoots_matches_transform_reference(self):
+        exposure_time, shoot_interval = 2, 3
+        altaz = self.transform(10.6848, 41.2690, np.array([0, 5]))
+
+        num_shoots, minutes, seconds, error = calculate_number_of_shoots(
+            altaz[0],
+            self.location,
+            10.6848,
+            41.2690,
+            120,
+            80,
+            10,
+            5,
+            exposure_time,
+            shoot_interval,
+            0,
+            35,
+            5,
+        )
+
+        expected = shots_per_position(
+            altaz.alt.degree[1] - altaz.alt.degree[0],
+            altaz.az.degree[1] - altaz.az.degree[0],
+            (120 - 10) / 2,
+            (80 - 5) / 2,
+            exposure_time,
+            shoot_interval,
+        )
+
+        self.assertIsNone(error)
+        self.assertEqual(num_shoots, int(expected))
+        self.assertEqual(minutes * 60 + seconds, num_shoots * 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
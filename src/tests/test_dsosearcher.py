@@ -1,3 +1,4 @@
+import json
 import unittest
 
 from pyongc.ongc import Dso
@@ -24,6 +25,41 @@ class TestSearch(unittest.TestCase):
         expected_results = [Dso(name="NGC1976").to_json()]
         self.assertEqual(DsoSearcher.search(partial_name), expected_results)
 
+    def test_search_records_matches_search(self):
+        # Test that the batch API finds the same objects as search
+        for partial_name in ["orion", "M42", "NGC1976", "tururu"]:
+            expected_names = [
+                json.loads(result)["name"]
+                for result in DsoSearcher.search(partial_name)
+            ]
+            records = DsoSearcher.search_records(partial_name)
+            self.assertEqual([record.name for record in records], expected_names)
+
+    def test_search_records_limit_and_wildcards(self):
+        # Test that the limit is applied and LIKE wildcards are matched literally
+        self.assertEqual(len(DsoSearcher.search_records("NGC1", limit=5)), 5)
+        self.assertEqual(DsoSearcher.search_records("%"), [])
+
+    def test_get_many(self):
+        # Test fetching several objects, including a duplicate and an unknown name
+        records = DsoSearcher.get_many(
+            ["NGC0224", "IC0011", "PGC002557", "M42", "tururu"]
+        )
+        self.assertEqual(records["NGC0224"].common_name, "Andromeda Galaxy")
+        self.assertEqual(records["IC0011"].name, "NGC0281")
+        self.assertEqual(records["PGC002557"].name, "NGC0224")
+        self.assertEqual(records["M42"].name, "NGC1976")
+        self.assertNotIn("tururu", records)
+
+    def test_get_many_normalizes_names(self):
+        # Test that names are matched like Dso matches them: case, zero-padding, spaces
+        names = ["NGC224", "ngc224", "ngc0224", "NGC 224", "m31", "pgc2557"]
+        records = DsoSearcher.get_many(names)
+        self.assertEqual(
+            {name: records[name].name for name in names},
+            dict.fromkeys(names, "NGC0224"),
+        )
+
     def test_count_objects_any(self):
         # Test counting the number of objects in the 'objects' table
         self.assertGreater(DsoSearcher.count_objects(), 0)
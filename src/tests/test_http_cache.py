@@ -0,0 +1,101 @@
+import gzip
+import json
+import unittest
+
+from flask import Flask, request
+
+from src.app.utils.http_cache import ResponseCache, entity_tag
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.builds = []
+        self.cache = ResponseCache(maxsize=8, max_age=60, min_compress_bytes=100)
+        self.app = Flask(__name__)
+
+        @self.app.route("/items")
+        def items():
+            query = request.args["q"]
+            size = request.args.get("size", 1, type=int)
+            version = request.args.get("version", "v1")
+
+            def build():
+                self.builds.append(query)
+                return json.dumps([query] * size)
+
+            return self.cache.respond("items", version, (query.lower(), size), build)
+
+        self.client = self.app.test_client()
+
+    def test_bodies_are_built_once_per_normalized_query(self):
+        first = self.client.get("/items?q=abc")
+        second = self.client.get("/items?q=ABC")
+
+        self.assertEqual(first.get_json(), ["abc"])
+        self.assertEqual(second.get_json(), ["abc"])
+        self.assertEqual(self.builds, ["abc"])
+        self.assertEqual(first.headers["ETag"], second.headers["ETag"])
+        self.assertEqual(first.headers["Cache-Control"], "public, max-age=60")
+
+    def test_if_none_match_answers_304_without_building(self):
+        etag = f'"{entity_tag("v1", ("items", ("abc", 1)))}"'
+
+        response = self.client.get("/items?q=abc", headers={"If-None-Match": etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["ETag"], etag)
+        self.assertEqual(self.builds, [])
+
+    def test_new_data_version_changes_the_etag(self):
+        old = self.client.get("/items?q=abc").headers["ETag"]
+
+        response = self.client.get(
+            "/items?q=abc&version=v2", headers={"If-None-Match": old}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], old)
+
+    def test_large_bodies_are_gzipped_when_accepted(self):
+        response = self.client.get(
+            "/items?q=abc&size=100", headers={"Accept-Encoding": "gzip"}
+        )
+
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(response.headers["Vary"], "Accept-Encoding")
+        self.assertTrue(response.headers["ETag"].endswith('-gzip"'))
+        self.assertEqual(json.loads(gzip.decompress(response.data)), ["abc"] * 100)
+
+        # The compressed representation revalidates like the plain one
+        revalidated = self.client.get(
+            "/items?q=abc&size=100",
+            headers={"If-None-Match": response.headers["ETag"]},
+        )
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.headers["ETag"], response.headers["ETag"])
+
+    def test_304_carries_the_tag_of_the_negotiated_coding(self):
+        etag = entity_tag("v1", ("items", ("abc", 100)))
+
+        response = self.client.get(
+            "/items?q=abc&size=100",
+            headers={
+                "Accept-Encoding": "gzip",
+                "If-None-Match": f'"{etag}", "{etag}-gzip"',
+            },
+        )
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["ETag"], f'"{etag}-gzip"')
+
+    def test_small_bodies_and_other_clients_get_identity(self):
+        small = self.client.get("/items?q=abc", headers={"Accept-Encoding": "gzip"})
+        plain = self.client.get("/items?q=abc&size=100")
+
+        self.assertNotIn("Content-Encoding", small.headers)
+        self.assertNotIn("Content-Encoding", plain.headers)
+        self.assertEqual(plain.get_json(), ["abc"] * 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from astropy.utils import iers
+
+from src.app.utils.iers_data import (
+    LEAP_SECOND_FILENAME,
+    MANIFEST_FILENAME,
+    configure_iers,
+    iers_status,
+)
+
+
+class TestIersData(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.data_dir)
+        self.addCleanup(configure_iers, "offline", None)
+        self.addCleanup(setattr, iers.conf, "system_leap_second_file", "")
+
+    def test_offline_mode_disables_downloads(self):
+        configure_iers("offline", self.data_dir)
+
+        self.assertFalse(iers.conf.auto_download)
+        self.assertEqual(iers_status()["mode"], "offline")
+
+    def test_staged_data_age_is_reported(self):
+        shutil.copy(
+            iers.IERS_LEAP_SECOND_FILE,
+            os.path.join(self.data_dir, LEAP_SECOND_FILENAME),
+        )
+        with open(os.path.join(self.data_dir, MANIFEST_FILENAME), "w") as f:
+            json.dump({"staged_at": "2000-01-01T00:00:00+00:00", "files": {}}, f)
+
+        configure_iers("offline", self.data_dir)
+        status = iers_status(max_age_days=30)
+
+        self.assertEqual(
+            iers.conf.system_leap_second_file,
+            os.path.join(self.data_dir, LEAP_SECOND_FILENAME),
+        )
+        self.assertEqual(status["staged_at"], "2000-01-01T00:00:00+00:00")
+        self.assertTrue(status["stale"])
+        self.assertIn("the staged data is older than 30 days", status["reasons"])
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            configure_iers("sometimes", self.data_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
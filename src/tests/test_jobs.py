@@ -0,0 +1,110 @@
+import threading
+import unittest
+
+from flask import Flask
+
+from src.app.routes.api import create_api_blueprint
+from src.app.utils.jobs import FAILED_JOB, JobQueueFull, JobRunner
+
+CALCULATION = {
+    "latitude": 40.4168,
+    "longitude": -3.7038,
+    "altitude": 650,
+    "observation_date": "2023-10-15",
+    "object_name": "NGC0224",
+    "object_id": "NGC0224",
+    "min_degrees": 20,
+    "sensor_width_mm": 22.3,
+    "sensor_height_mm": 14.9,
+    "number_of_pixels_in_width": 6000,
+    "number_of_pixels_in_height": 4000,
+    "focal_length": 400,
+    "aperture": 5,
+    "shoot_interval": 5,
+    "camera_position": 0,
+}
+
+
+class TestJobRunner(unittest.TestCase):
+    def test_result_by_job_id(self):
+        runner = JobRunner(workers=2, queue_size=0)
+        job_id, future = runner.submit(lambda: {"num_shoots": 3})
+
+        self.assertEqual(future.result(timeout=5), {"num_shoots": 3})
+        self.assertEqual(
+            runner.status(job_id), {"status": "done", "result": {"num_shoots": 3}}
+        )
+        self.assertIsNone(runner.status("unknown"))
+
+    def test_refuses_jobs_over_the_bound(self):
+        runner = JobRunner(workers=1, queue_size=1)
+        release = threading.Event()
+
+        first_id, first = runner.submit(release.wait)
+        _, second = runner.submit(release.wait)
+        self.assertEqual(runner.status(first_id), {"status": "pending"})
+        with self.assertRaises(JobQueueFull):
+            runner.submit(release.wait)
+
+        release.set()
+        first.result(timeout=5)
+        second.result(timeout=5)
+        runner.submit(lambda: None)[1].result(timeout=5)
+
+    def test_failed_job(self):
+        runner = JobRunner(workers=1, queue_size=0)
+        job_id, future = runner.submit(lambda: 1 / 0)
+
+        with self.assertRaises(ZeroDivisionError):
+            future.result(timeout=5)
+        self.assertEqual(runner.status(job_id)["status"], "failed")
+
+
+class TestApiOutcomes(unittest.TestCase):
+    def create_client(self, get_object_data):
+        app = Flask(__name__)
+        app.register_blueprint(
+            create_api_blueprint(
+                app,
+                "",
+                None,
+                get_object_data,
+                None,
+                None,
+                JobRunner(workers=1, queue_size=0),
+            )
+        )
+        return app.test_client()
+
+    def submit_and_poll(self, client):
+        response = client.post("/api/calculate", json=CALCULATION)
+        poll = client.get(f"/api/jobs/{response.get_json()['job_id']}")
+        return response, poll
+
+    def test_sync_and_polled_failures_answer_alike(self):
+        def get_object_data(object_id):
+            raise RuntimeError("catalog unavailable")
+
+        response, poll = self.submit_and_poll(self.create_client(get_object_data))
+        body = response.get_json()
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(body, {"job_id": body["job_id"], **FAILED_JOB})
+        self.assertEqual(poll.status_code, 500)
+        self.assertEqual(poll.get_json(), body)
+
+    def test_sync_and_polled_errors_answer_alike(self):
+        def get_object_data(object_id):
+            return None, None, None, None, None, None, "Object not found."
+
+        response, poll = self.submit_and_poll(self.create_client(get_object_data))
+        body = response.get_json()
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(body["error"], "Object not found.")
+        self.assertEqual(poll.status_code, 422)
+        self.assertEqual(poll.get_json(), body)
+
+
+if __name__ == "__main__":
+    unittest.main()
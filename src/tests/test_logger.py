@@ -0,0 +1,129 @@
+import json
+import logging
+import os
+import sys
+import tempfile
+import unittest
+
+from flask import Flask
+
+from src.app.utils.logger import (
+    JsonFormatter,
+    LogPipeline,
+    SharedRotatingFileHandler,
+    log_exceptions,
+)
+
+
+def read_lines(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+class TestJsonFormatter(unittest.TestCase):
+    def test_extra_fields_and_traceback(self):
+        try:
+            raise ValueError("bad value")
+        except ValueError:
+            record = logging.getLogger("test").makeRecord(
+                "test",
+                logging.ERROR,
+                __file__,
+                1,
+                "Failed for %s",
+                ("M31",),
+                exc_info=sys.exc_info(),
+                extra={"path": "/api/calculate"},
+            )
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        self.assertEqual(entry["message"], "Failed for M31")
+        self.assertEqual(entry["level"], "ERROR")
+        self.assertEqual(entry["path"], "/api/calculate")
+        self.assertIn("ValueError: bad value", entry["exception"])
+
+
+class TestLogPipeline(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "logs", "app.log")
+        self.pipeline = LogPipeline()
+        self.pipeline.configure(self.path, level="INFO")
+        self.logger = logging.getLogger("test_logger.pipeline")
+        self.logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        self.pipeline.remove()
+        self.directory.cleanup()
+
+    def test_records_are_written_as_json_lines(self):
+        self.logger.info("Computed %d nights", 30, extra={"object_id": "M31"})
+        self.logger.debug("Below the level")
+        self.pipeline.stop()
+
+        entries = read_lines(self.path)
+
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]["message"], "Computed 30 nights")
+        self.assertEqual(entries[0]["object_id"], "M31")
+        self.assertEqual(entries[0]["logger"], "test_logger.pipeline")
+
+    def test_exceptions_keep_their_traceback(self):
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            self.logger.exception("Calculation failed")
+        self.pipeline.stop()
+
+        (entry,) = read_lines(self.path)
+
+        self.assertIn("ZeroDivisionError", entry["exception"])
+
+    def test_log_exceptions_logs_each_error_once(self):
+        app = Flask(__name__)
+
+        @app.route("/fail")
+        @log_exceptions(app)
+        def fail():
+            raise RuntimeError("boom")
+
+        response = app.test_client().get("/fail", headers={"User-Agent": "tests"})
+        self.pipeline.stop()
+
+        (entry,) = read_lines(self.path)
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(entry["message"], "An error occurred: boom")
+        self.assertEqual(entry["path"], "/fail")
+        self.assertEqual(entry["user_agent"], "tests")
+        self.assertIn("RuntimeError: boom", entry["exception"])
+
+
+class TestSharedRotatingFileHandler(unittest.TestCase):
+    def test_reopens_a_file_rotated_by_another_handler(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "app.log")
+            first = SharedRotatingFileHandler(path, maxBytes=400, backupCount=2)
+            second = SharedRotatingFileHandler(path, maxBytes=400, backupCount=2)
+            record = logging.makeLogRecord({"msg": "x" * 150})
+
+            first.emit(record)
+            second.emit(record)
+            second.emit(record)  # rotates app.log to app.log.1
+            first.emit(record)  # must write to the new app.log, not to app.log.1
+            first.close()
+            second.close()
+
+            with open(path) as f:
+                current = f.read().splitlines()
+            with open(f"{path}.1") as f:
+                rotated = f.read().splitlines()
+            self.assertFalse(os.path.exists(f"{path}.2"))
+
+        self.assertEqual(len(current), 2)
+        self.assertEqual(len(rotated), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+from src.app.utils.metrics import (
+    MetricsRegistry,
+    MetricsStore,
+    merge_snapshots,
+    render_metrics,
+    request_timings,
+    server_timing_header,
+    start_request_timings,
+)
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry(buckets=(0.1, 1))
+
+    def test_counters_are_kept_per_label_set(self):
+        self.registry.inc("astro_transforms_total")
+        self.registry.inc("astro_transforms_total", 2)
+        self.registry.inc("http_requests_total", endpoint="index", status=200)
+
+        counters = self.registry.snapshot()["counters"]
+
+        self.assertEqual(counters[("astro_transforms_total", ())], 3)
+        self.assertEqual(
+            counters[
+                ("http_requests_total", (("endpoint", "index"), ("status", "200")))
+            ],
+            1,
+        )
+
+    def test_histogram_buckets_are_cumulative(self):
+        for value in (0.05, 0.5, 5):
+            self.registry.observe("http_request_seconds", value)
+
+        text = render_metrics(self.registry.snapshot(), self.registry.buckets)
+
+        self.assertIn("# TYPE http_request_seconds histogram", text)
+        self.assertIn('http_request_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('http_request_seconds_bucket{le="1"} 2', text)
+        self.assertIn('http_request_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn("http_request_seconds_sum 5.55", text)
+        self.assertIn("http_request_seconds_count 3", text)
+
+    def test_stage_is_timed_for_the_request(self):
+        start_request_timings()
+        with self.registry.stage("shots"):
+            pass
+        with self.registry.stage("shots"):
+            pass
+
+        self.assertEqual(list(request_timings()), ["shots"])
+        histogram = self.registry.snapshot()["histograms"][
+            ("astro_stage_seconds", (("stage", "shots"),))
+        ]
+        self.assertEqual(histogram[-1], 2)
+
+    def test_server_timing_header(self):
+        self.assertEqual(
+            server_timing_header({"visibility": 0.0312}, 0.04),
+            "visibility;dur=31.2, total;dur=40.0",
+        )
+
+    def test_label_values_are_escaped(self):
+        self.registry.inc("http_requests_total", endpoint='a"b')
+
+        text = render_metrics(self.registry.snapshot())
+
+        self.assertIn('http_requests_total{endpoint="a\\"b"} 1', text)
+
+
+class TestInitMetrics(unittest.TestCase):
+    def test_server_timing_header_lists_the_stages(self):
+        from flask import Flask
+
+        from src.app.utils import initialize
+
+        app = Flask(__name__)
+        initialize.init_metrics(app, server_timing=True)
+
+        @app.route("/slow")
+        def slow():
+            # The registry init_metrics reports, whatever path the package is imported by
+            with initialize.metrics.stage("visibility"):
+                pass
+            return "ok"
+
+        header = app.test_client().get("/slow").headers["Server-Timing"]
+
+        self.assertRegex(header, r"^visibility;dur=\d+\.\d, total;dur=\d+\.\d$")
+
+
+class TestMetricsStore(unittest.TestCase):
+    def test_collect_adds_up_live_workers_and_drops_dead_ones(self):
+        registry = MetricsRegistry()
+        registry.inc("astro_transforms_total", 2)
+
+        with tempfile.TemporaryDirectory() as directory:
+            store = MetricsStore(os.path.join(directory, "metrics.sqlite"))
+            other = {"counters": {("astro_transforms_total", ()): 5}, "histograms": {}}
+            dead = {"counters": {("astro_transforms_total", ()): 7}, "histograms": {}}
+            with store._connection() as connection:
+                connection.executemany(
+                    "INSERT INTO snapshots VALUES (?, ?, 0)",
+                    [
+                        (os.getppid(), pickle.dumps(other)),
+                        (2**22 + 1, pickle.dumps(dead)),
+                    ],
+                )
+
+            snapshot = store.collect(registry)
+
+        self.assertEqual(snapshot["counters"][("astro_transforms_total", ())], 7)
+
+    def test_unusable_file_collects_this_worker_only(self):
+        registry = MetricsRegistry()
+        registry.inc("astro_transforms_total", 2)
+
+        with tempfile.TemporaryDirectory() as directory:
+            # A file where the metrics directory should be: makedirs fails
+            blocker = os.path.join(directory, "metrics")
+            open(blocker, "w").close()
+            store = MetricsStore(os.path.join(blocker, "metrics.sqlite"))
+
+            snapshot = store.collect(registry)
+
+        self.assertEqual(snapshot["counters"][("astro_transforms_total", ())], 2)
+
+    def test_merge_snapshots(self):
+        first = MetricsRegistry(buckets=(1,))
+        second = MetricsRegistry(buckets=(1,))
+        first.observe("http_request_seconds", 0.5)
+        second.observe("http_request_seconds", 2)
+
+        merged = merge_snapshots([first.snapshot(), second.snapshot()])
+
+        self.assertEqual(
+            merged["histograms"][("http_request_seconds", ())], [1, 2.5, 2]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
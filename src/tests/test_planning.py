@@ -0,0 +1,92 @@
+import unittest
+from datetime import date
+
+from src.app.utils.astro_utils import get_object_data
+from src.app.utils.cache import LRUCache
+from src.app.utils.calculations import (
+    calculate_camera_fov,
+    calculate_max_shooting_time,
+    calculate_number_of_shoots,
+)
+from src.app.utils.planning import NIGHT_FIELDS, get_planning_executor, plan_nights
+
+
+class TestPlanNights(unittest.TestCase):
+    form_data = {
+        "object_id": "NGC1976",
+        "latitude": 40.4168,
+        "longitude": -3.7038,
+        "altitude": 650,
+        "observation_date": date(2024, 1, 10),
+        "sensor_width_mm": 23.5,
+        "sensor_height_mm": 15.6,
+        "number_of_pixels_in_width": 6000,
+        "number_of_pixels_in_height": 4000,
+        "focal_length": 50,
+        "aperture": 5,
+        "shoot_interval": 1,
+        "camera_position": 0,
+        "min_degrees": 30,
+    }
+    calculators = (
+        calculate_camera_fov,
+        get_object_data,
+        calculate_max_shooting_time,
+        calculate_number_of_shoots,
+    )
+
+    def plan(self, nights=3, **kwargs):
+        return plan_nights(self.form_data, nights, *self.calculators, **kwargs)
+
+    def test_pool_matches_serial(self):
+        serial = self.plan(workers=0)
+
+        self.assertEqual(self.plan(workers=2), serial)
+        self.assertEqual(
+            [night["date"] for night in serial["nights"]],
+            ["2024-01-10", "2024-01-11", "2024-01-12"],
+        )
+        for night in serial["nights"]:
+            self.assertIsNone(night["error"])
+            self.assertEqual(set(NIGHT_FIELDS) - set(night), set())
+            self.assertLess(night["visible_at"], night["visible_until"])
+        self.assertIn(serial["best"], [night["date"] for night in serial["nights"]])
+
+    def test_nights_are_cached(self):
+        cache = LRUCache(maxsize=16)
+        first = self.plan(nights=2, workers=0, result_cache=cache)
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(self.plan(nights=2, workers=0, result_cache=cache), first)
+        self.assertEqual(cache.hits, 2)
+
+    def test_timeout(self):
+        executor = get_planning_executor(2)
+        executor.submit(abs, 0).result(timeout=30)
+        processes = list(executor._processes.values())
+
+        plan = plan_nights(
+            {**self.form_data, "observation_date": date(2024, 2, 1)},
+            2,
+            *self.calculators,
+            workers=2,
+            timeout=0,
+        )
+
+        self.assertTrue(
+            all("did not finish" in night["error"] for night in plan["nights"])
+        )
+        self.assertIsNone(plan["best"])
+        # The pool is stopped, not left computing the nights nobody waits for
+        for process in processes:
+            process.join(timeout=5)
+            self.assertFalse(process.is_alive())
+        self.assertIsNot(get_planning_executor(2), executor)
+
+    def test_night_limit(self):
+        with self.assertRaises(ValueError):
+            self.plan(nights=40)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import date
+
+from flask import Blueprint, Flask, jsonify
+
+from src.app.utils.initialize import init_recording
+from src.app.utils.recording import (
+    RECORDING_FORMAT_VERSION,
+    RequestRecorder,
+    anonymize_values,
+    restore_values,
+)
+
+TODAY = date(2023, 10, 1)
+
+
+class TestAnonymizeValues(unittest.TestCase):
+    def test_calculation_fields_are_anonymized(self):
+        values = anonymize_values(
+            "form",
+            {
+                "latitude": "40.41678",
+                "longitude": "-3.70379",
+                "altitude": "667",
+                "observation_date": "2023-10-15",
+                "object_id": "NGC0224",
+                "focal_length": "400",
+                "csrf_token": "secret",
+                "submit": "Submit",
+            },
+            TODAY,
+        )
+
+        self.assertEqual(
+            values,
+            {
+                "latitude": 40.42,
+                "longitude": -3.7,
+                "altitude": 700,
+                "observation_day": 14,
+                "object_id": "NGC0224",
+                "focal_length": "400",
+            },
+        )
+
+    def test_free_text_coordinates_are_dropped(self):
+        values = anonymize_values(
+            "json", {"latitude": "Calle Mayor 1", "longitude": 2.1}, TODAY
+        )
+
+        self.assertEqual(values, {"longitude": 2.1})
+
+    def test_only_the_autocomplete_arguments_are_kept(self):
+        values = anonymize_values("args", {"q": "m31", "limit": "5", "x": "1"}, TODAY)
+
+        self.assertEqual(values, {"q": "m31", "limit": "5"})
+
+    def test_observation_dates_keep_their_distance_on_replay(self):
+        values = anonymize_values("form", {"observation_date": "2023-10-15"}, TODAY)
+
+        restored = restore_values({"values": values}, date(2024, 3, 1))
+
+        self.assertEqual(restored, {"observation_date": "2024-03-15"})
+
+
+class TestRequestRecorder(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "requests.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def create_app(self, recorder):
+        app = Flask(__name__)
+        search_objects_bp = Blueprint("search_objects", __name__)
+
+        @search_objects_bp.route("/search_objects")
+        def search_objects():
+            return jsonify([])
+
+        @app.route("/health")
+        def health():
+            return "ok"
+
+        app.register_blueprint(search_objects_bp)
+        init_recording(app, recorder)
+        return app
+
+    def read_entries(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_recorded_endpoints_are_written(self):
+        recorder = RequestRecorder(self.path, sample_rate=1.0)
+        client = self.create_app(recorder).test_client()
+
+        client.get("/search_objects?q=m31", headers={"User-Agent": "test"})
+        client.get("/health")
+        recorder.close()
+
+        self.assertEqual(
+            self.read_entries(),
+            [
+                {
+                    "version": RECORDING_FORMAT_VERSION,
+                    "endpoint": "search_objects.search_objects",
+                    "method": "GET",
+                    "path": "/search_objects",
+                    "kind": "args",
+                    "values": {"q": "m31"},
+                    "status": 200,
+                }
+            ],
+        )
+
+    def test_nothing_is_recorded_outside_the_sample(self):
+        recorder = RequestRecorder(self.path, sample_rate=0.0)
+        client = self.create_app(recorder).test_client()
+
+        client.get("/search_objects?q=m31")
+        recorder.close()
+
+        self.assertEqual(self.read_entries(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
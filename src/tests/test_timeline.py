@@ -0,0 +1,76 @@
+import json
+import unittest
+from datetime import datetime
+
+import astropy.units as u
+import numpy as np
+from astropy.coordinates import AltAz, EarthLocation, SkyCoord
+from astropy.time import Time
+
+from src.app.routes.timeline import csv_lines, ndjson_lines
+from src.app.utils.calculations import (
+    TIMELINE_FIELDS,
+    calculate_number_of_shoots,
+    shot_timeline,
+)
+
+
+class TestShotTimeline(unittest.TestCase):
+    location = EarthLocation(lat=40.4168 * u.deg, lon=-3.7038 * u.deg, height=650 * u.m)
+    target = SkyCoord(ra=10.6848 * u.deg, dec=41.2690 * u.deg)  # M31
+    altaz = target.transform_to(
+        AltAz(obstime=Time("2023-10-15 21:00:00", scale="utc"), location=location)
+    )
+    # 50 mm on APS-C, 20 s exposures every 25 s
+    session = (1587, 1064, 190, 60, 20, 5, 0, 35)
+
+    def timeline(self, **kwargs):
+        return list(shot_timeline(self.altaz, self.location, *self.session, **kwargs))
+
+    def test_yields_the_number_of_shoots(self):
+        num_shoots, _, _, _ = calculate_number_of_shoots(
+            self.altaz, self.location, 10.6848, 41.2690, *self.session, 30
+        )
+        shots = self.timeline()
+
+        self.assertEqual(len(shots), num_shoots)
+        self.assertEqual([shot["shot"] for shot in shots[:3]], [1, 2, 3])
+        self.assertEqual(tuple(shots[0]), TIMELINE_FIELDS)
+        self.assertEqual((shots[0]["drift_alt"], shots[0]["drift_az"]), (0, 0))
+
+    def test_chunks_do_not_change_the_result(self):
+        self.assertEqual(self.timeline(chunk_size=7), self.timeline())
+
+    def test_shots_are_spaced_and_match_astropy(self):
+        shots = self.timeline(num_shoots=200)
+        times = [datetime.fromisoformat(shot["time"][:-1]) for shot in shots]
+
+        self.assertEqual((times[1] - times[0]).total_seconds(), 25)
+        self.assertEqual((times[-1] - times[0]).total_seconds(), 199 * 25)
+
+        last = self.target.transform_to(
+            AltAz(obstime=Time(times[-1], scale="utc"), location=self.location)
+        )
+        self.assertAlmostEqual(shots[-1]["alt"], last.alt.degree, delta=1 / 3600)
+
+    def test_fov_used_grows(self):
+        fov_used = [shot["fov_used"] for shot in self.timeline(num_shoots=100)]
+        self.assertTrue(np.all(np.diff(fov_used) > 0))
+
+    def test_serialization(self):
+        shots = self.timeline(num_shoots=600)
+
+        lines = "".join(ndjson_lines(iter(shots))).splitlines()
+        rows = "".join(csv_lines(iter(shots))).splitlines()
+
+        self.assertEqual(len(lines), 600)
+        self.assertEqual(json.loads(lines[-1])["shot"], 600)
+        self.assertEqual(rows[0], ",".join(TIMELINE_FIELDS))
+        self.assertEqual(len(rows), 601)
+        self.assertEqual(
+            "".join(csv_lines(iter(()))).strip(), ",".join(TIMELINE_FIELDS)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+
+import astropy.units as u
+import numpy as np
+from astropy.coordinates import EarthLocation
+from astropy.time import Time
+
+from src.app.search.coordinate_table import get_coordinate_table
+from src.app.utils.astro_utils import get_alt_az_at_degrees
+from src.app.utils.calculations import apply_fov_rotation
+from src.app.utils.tonight import evaluate_catalog, rank_catalog, rotated_fov
+
+
+class TestTonight(unittest.TestCase):
+    location = EarthLocation(lat=40.4168 * u.deg, lon=-3.7038 * u.deg, height=650 * u.m)
+    observation_time = Time("2023-10-15 00:00:00")
+
+    @classmethod
+    def setUpClass(cls):
+        cls.table = get_coordinate_table()
+        cls.evaluation = evaluate_catalog(
+            cls.table, cls.location, cls.observation_time, 1587, 1064, 4, 1, 0, 30
+        )
+
+    def test_matches_single_object_search(self):
+        for name in ["NGC0224", "NGC1976", "NGC0869"]:
+            row = self.table.get(name)
+            _, _, visible_time = get_alt_az_at_degrees(
+                self.location, row.ra_deg, row.dec_deg, self.observation_time, 30
+            )
+
+            index = np.flatnonzero(
+                self.evaluation["position"] == self.table.position(name)
+            )[0]
+            bulk_time = (
+                self.evaluation["night_start"]
+                + self.evaluation["visible_at"][index] * u.s
+            ).datetime
+            self.assertLess(abs((bulk_time - visible_time).total_seconds()), 1)
+
+    def test_never_visible_objects_are_left_out(self):
+        position = self.table.position("NGC0055")  # Dec -39, never reaches 30 degrees
+        self.assertNotIn(position, self.evaluation["position"])
+
+    def test_polar_summer_has_no_night(self):
+        # Lat 70 N at the June solstice: the Sun never gets 18 degrees below the horizon
+        location = EarthLocation(lat=70 * u.deg, lon=20 * u.deg, height=0 * u.m)
+        observation_time = Time("2023-06-21 00:00:00")
+        row = self.table.get("NGC0224")
+
+        altaz, error, visible_time = get_alt_az_at_degrees(
+            location, row.ra_deg, row.dec_deg, observation_time, 20
+        )
+        evaluation = evaluate_catalog(
+            self.table, location, observation_time, 1587, 1064, 4, 1, 0, 20
+        )
+
+        self.assertIsNone(altaz)
+        self.assertIsNone(visible_time)
+        self.assertIn("will not be visible on 2023-06-21", error)
+        self.assertEqual(len(evaluation["position"]), 0)
+
+    def test_rank_and_paginate(self):
+        first_page = rank_catalog(self.evaluation, self.table, 4, 1, per_page=10)
+        second_page = rank_catalog(
+            self.evaluation, self.table, 4, 1, page=2, per_page=10
+        )
+        by_shots = rank_catalog(
+            self.evaluation, self.table, 4, 1, sort="num_shoots", per_page=10
+        )
+
+        self.assertEqual(first_page["total"], len(self.evaluation["position"]))
+        self.assertEqual(len(first_page["objects"]), 10)
+        self.assertLessEqual(
+            first_page["objects"][-1]["visible_at"],
+            second_page["objects"][0]["visible_at"],
+        )
+        shots = [item["num_shoots"] for item in by_shots["objects"]]
+        self.assertEqual(shots, sorted(shots, reverse=True))
+
+    def test_rotated_fov_matches_apply_fov_rotation(self):
+        for camera_position in [0, 90, -45, 30]:
+            expected = apply_fov_rotation(120, 80, camera_position, 35)
+            rotated = rotated_fov(120, 80, camera_position, np.array([35]))
+            self.assertAlmostEqual(rotated[0][0], expected[0])
+            self.assertAlmostEqual(rotated[1][0], expected[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
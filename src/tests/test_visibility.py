@@ -0,0 +1,55 @@
+import unittest
+
+import astropy.units as u
+from astropy.coordinates import AltAz, EarthLocation, SkyCoord
+from astropy.time import Time, TimeDelta
+
+from src.app.utils.astro_utils import get_alt_az_at_degrees
+
+
+class TestVisibilitySearch(unittest.TestCase):
+    location = EarthLocation(lat=40.4168 * u.deg, lon=-3.7038 * u.deg, height=650 * u.m)
+    observation_time = Time("2023-10-15 00:00:00")
+
+    def test_first_sample_over_min_degrees(self):
+        altaz, error, visible_time = get_alt_az_at_degrees(
+            self.location, 10.6848, 41.2690, self.observation_time, 80
+        )
+
+        self.assertIsNone(error)
+        self.assertGreaterEqual(altaz.alt.degree, 80)
+
+        # The sample one minute earlier must still be below the threshold
+        previous = SkyCoord(ra=10.6848 * u.deg, dec=41.2690 * u.deg).transform_to(
+            AltAz(
+                obstime=Time(visible_time) - TimeDelta(60, format="sec"),
+                location=self.location,
+            )
+        )
+        self.assertLess(previous.alt.degree, 80)
+
+    def test_refined_crossing(self):
+        _, _, grid_time = get_alt_az_at_degrees(
+            self.location, 83.8221, -5.3911, self.observation_time, 30
+        )
+        altaz, error, refined_time = get_alt_az_at_degrees(
+            self.location, 83.8221, -5.3911, self.observation_time, 30, refine=True
+        )
+
+        self.assertIsNone(error)
+        self.assertAlmostEqual(altaz.alt.degree, 30, places=2)
+        self.assertLessEqual(refined_time, grid_time)
+        self.assertLess((grid_time - refined_time).total_seconds(), 60)
+
+    def test_never_visible(self):
+        altaz, error, visible_time = get_alt_az_at_degrees(
+            self.location, 200.0, -80.0, self.observation_time, 5
+        )
+
+        self.assertIsNone(altaz)
+        self.assertIsNone(visible_time)
+        self.assertIn("2023-10-15", error)
+
+
+if __name__ == "__main__":
+    unittest.main()
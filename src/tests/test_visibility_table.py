@@ -0,0 +1,100 @@
+import shutil
+import tempfile
+import unittest
+from datetime import date
+
+import astropy.units as u
+from astropy.coordinates import EarthLocation
+from astropy.time import Time
+
+from src.app.search.coordinate_table import get_coordinate_table
+from src.app.search.visibility_table import (
+    VisibilityTable,
+    build_visibility_table,
+    load_visibility_tables,
+    site_visibility,
+    visibility_path,
+)
+from src.app.utils.astro_utils import get_alt_az_at_degrees
+
+
+class TestVisibilityTable(unittest.TestCase):
+    location = EarthLocation(lat=40.4168 * u.deg, lon=-3.7038 * u.deg, height=650 * u.m)
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        table = build_visibility_table(
+            "madrid", 40.4168, -3.7038, 650, date(2023, 10, 15), 2, (10, 30)
+        )
+        table.save(visibility_path(cls.directory, "madrid"))
+        cls.table = get_coordinate_table()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+
+    def setUp(self):
+        site_visibility.tables = load_visibility_tables(self.directory)
+        self.addCleanup(setattr, site_visibility, "tables", [])
+
+    def visible_time(self, name, observation_time, min_degrees, **kwargs):
+        row = self.table.get(name)
+        return get_alt_az_at_degrees(
+            self.location,
+            row.ra_deg,
+            row.dec_deg,
+            observation_time,
+            min_degrees,
+            **kwargs,
+        )[2]
+
+    def test_round_trip(self):
+        (loaded,) = site_visibility.tables
+        self.assertIsInstance(loaded, VisibilityTable)
+        self.assertEqual(loaded.site, "madrid")
+        self.assertEqual(sorted(loaded.first_minute), [10, 30])
+        self.assertEqual(loaded.first_minute[30].shape, (2, len(self.table)))
+
+    def test_matches_live_computation(self):
+        observation_time = Time("2023-10-16 00:00:00")
+        for name, min_degrees in [("NGC0224", 30), ("NGC1976", 30), ("NGC7000", 10)]:
+            hit = site_visibility.lookup(
+                self.location,
+                observation_time,
+                min_degrees,
+                self.table.position(name),
+            )
+            live = self.visible_time(name, observation_time, min_degrees)
+
+            self.assertIsNotNone(hit)
+            self.assertLess(abs((hit.visible_time.datetime - live).total_seconds()), 1)
+            self.assertEqual(
+                self.visible_time(name, observation_time, min_degrees, object_id=name),
+                hit.visible_time.datetime,
+            )
+
+    def test_never_visible(self):
+        observation_time = Time("2023-10-15 00:00:00")
+        hit = site_visibility.lookup(
+            self.location, observation_time, 30, self.table.position("NGC0055")
+        )
+        self.assertIsNone(hit.visible_time)
+
+    def test_misses(self):
+        position = self.table.position("NGC0224")
+        other_site = EarthLocation(lat=28.3 * u.deg, lon=-16.5 * u.deg)
+
+        for location, time, min_degrees in [
+            (other_site, "2023-10-15 00:00:00", 30),
+            (self.location, "2023-10-20 00:00:00", 30),
+            (self.location, "2023-10-15 12:00:00", 30),
+            (self.location, "2023-10-15 00:00:00", 20),
+        ]:
+            self.assertIsNone(
+                site_visibility.lookup(location, Time(time), min_degrees, position)
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()